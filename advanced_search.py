@@ -6,10 +6,12 @@ Provides comprehensive similarity search capabilities with filtering, ranking, a
 from typing import List, Dict, Any, Optional, Tuple, Union
 import numpy as np
 import asyncio
-from datetime import datetime
+import time
 import logging
-from faiss_store import get_vector_store
+from faiss_store import get_vector_store, MISSING_TIMESTAMP
 from gemini_vector_embedder import generate_embeddings
+from simsimd_backend import SIMSIMD_AVAILABLE, quantize_int8, quantized_similarities, top_k_candidates, top_k_rows
+from numba_kernels import prepare_query_matrix
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -18,6 +20,8 @@ logger = logging.getLogger(__name__)
 class SearchResult:
     """Enhanced search result with additional metadata and methods"""
     
+    __slots__ = ("score", "index", "doc_id", "chunk_text", "metadata", "rank")
+    
     def __init__(self, score: float, index: int, doc_id: str, chunk_text: str, 
                  metadata: Dict[str, Any], rank: int):
         self.score = score
@@ -40,21 +44,89 @@ class SearchResult:
         }
     
     def get_relevance_category(self) -> str:
-        """Categorize relevance based on similarity score"""
-        if self.score < 0.3:
+        """Categorize relevance based on cosine similarity (higher is better)"""
+        if self.score > 0.85:
             return "high"
-        elif self.score < 0.6:
+        elif self.score > 0.7:
             return "medium"
-        elif self.score < 0.9:
+        elif self.score > 0.55:
             return "low"
         else:
             return "very_low"
     
     def get_text_snippet(self, max_length: int = 200) -> str:
         """Get a snippet of the text with ellipsis if too long"""
-        if len(self.chunk_text) <= max_length:
-            return self.chunk_text
-        return self.chunk_text[:max_length-3] + "..."
+        return _text_snippet(self.chunk_text, max_length)
+
+
+def _text_snippet(text: str, max_length: int = 200) -> str:
+    """Get a snippet of the text with ellipsis if too long"""
+    if len(text) <= max_length:
+        return text
+    return text[:max_length-3] + "..."
+
+
+# Relevance category names, indexed by len(RELEVANCE_BINS) - np.digitize(scores, RELEVANCE_BINS, right=True)
+_CATEGORY_NAMES = ("high", "medium", "low", "very_low")
+RELEVANCE_BINS = np.array([0.55, 0.7, 0.85])
+
+
+class ResultBatch:
+    """
+    Ranked search hits stored column-wise (structure of arrays)
+    
+    SearchResult objects are only created when results are emitted.
+    Rank is the position in the batch plus one.
+    """
+    
+    __slots__ = ("indices", "scores", "doc_ids", "chunk_texts", "metadata", "relevance_codes")
+    
+    def __init__(self, indices: np.ndarray, scores: np.ndarray, doc_ids: List[str],
+                 chunk_texts: List[str], metadata: List[Dict[str, Any]]):
+        self.indices = indices
+        self.scores = scores
+        self.doc_ids = doc_ids
+        self.chunk_texts = chunk_texts
+        self.metadata = metadata
+        # Relevance category code per hit, indexing _CATEGORY_NAMES
+        self.relevance_codes = (len(RELEVANCE_BINS) - np.digitize(scores, RELEVANCE_BINS, right=True)).astype(np.int8)
+    
+    def __len__(self) -> int:
+        return len(self.indices)
+    
+    def results(self) -> List[SearchResult]:
+        """Materialize SearchResult views in rank order"""
+        return [
+            SearchResult(
+                score=float(self.scores[i]),
+                index=int(self.indices[i]),
+                doc_id=self.doc_ids[i],
+                chunk_text=self.chunk_texts[i],
+                metadata=self.metadata[i],
+                rank=i + 1
+            )
+            for i in range(len(self.indices))
+        ]
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert the batch to API result dictionaries"""
+        scores = self.scores.tolist()
+        indices = self.indices.tolist()
+        codes = self.relevance_codes.tolist()
+        
+        return [
+            {
+                "score": scores[i],
+                "rank": i + 1,
+                "index": indices[i],
+                "doc_id": self.doc_ids[i],
+                "text": self.chunk_texts[i],
+                "metadata": self.metadata[i],
+                "relevance": _CATEGORY_NAMES[codes[i]],
+                "snippet": _text_snippet(self.chunk_texts[i])
+            }
+            for i in range(len(indices))
+        ]
 
 
 async def advanced_similarity_search(
@@ -76,8 +148,9 @@ async def advanced_similarity_search(
     Args:
         query: Query text string or pre-computed embedding vector
         k: Number of top results to return
-        score_threshold: Maximum similarity score (lower is better for L2 distance)
-        min_score_threshold: Minimum similarity score for inclusion
+        score_threshold: Minimum cosine similarity for a candidate to be considered
+            (scores are cosine similarities in [-1, 1], higher is better)
+        min_score_threshold: Minimum cosine similarity for inclusion after type filtering
         filter_doc_ids: List of document IDs to restrict search to
         filter_doc_types: List of document types to filter by (pdf, docx, eml)
         boost_recent: Whether to boost more recently added documents
@@ -89,20 +162,23 @@ async def advanced_similarity_search(
     Returns:
         Comprehensive search results with analytics and metadata
     """
-    start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
+    is_text = isinstance(query, str)
     
     try:
         # Get vector store
         vector_store = get_vector_store()
+        stats = vector_store.get_stats()
+        total_vectors = stats["total_vectors"]
         
-        if vector_store.get_stats()["total_vectors"] == 0:
+        if total_vectors == 0:
             return {
                 "status": "success",
                 "results": [],
                 "total_results": 0,
                 "query_info": {
-                    "query_type": "text" if isinstance(query, str) else "vector",
-                    "query_text": query if isinstance(query, str) else None,
+                    "query_type": "text" if is_text else "vector",
+                    "query_text": query if is_text else None,
                     "k": k,
                     "filters_applied": {
                         "score_threshold": score_threshold,
@@ -119,10 +195,7 @@ async def advanced_similarity_search(
             }
         
         # Convert query to embedding if it's text
-        query_embedding = None
-        query_metadata = {}
-        
-        if isinstance(query, str):
+        if is_text:
             from main import generate_query_embedding
             
             embedding_result = await generate_query_embedding(
@@ -145,78 +218,47 @@ async def advanced_similarity_search(
             query_embedding = query
             query_metadata = {"dimensions": len(query_embedding)}
         
-        # Perform initial similarity search with extra results for filtering
-        search_k = min(k * 3, vector_store.get_stats()["total_vectors"])
+        query_matrix = prepare_query_matrix(query_embedding)
         
-        raw_results = vector_store.similarity_search(
-            query_embedding=query_embedding,
-            k=search_k,
-            score_threshold=score_threshold,
-            filter_doc_ids=filter_doc_ids
-        )
+        if _is_trivial_query(stats, filter_doc_ids, filter_doc_types, min_score_threshold, boost_recent, deduplicate):
+            # Nothing can drop or reorder candidates: fetch exactly k
+            search_k = min(k, total_vectors)
+            candidate_indices, candidate_scores = _search_candidates(vector_store, query_matrix, search_k)
+        else:
+            # Perform initial similarity search with extra results for filtering
+            search_k = min(k * 3, total_vectors)
+            candidate_indices, candidate_scores = _search_candidates(vector_store, query_matrix, search_k * 2)
         
         # Apply additional filters and enhancements
-        enhanced_results = []
-        seen_doc_chunks = set() if deduplicate else None
-        
-        for idx, result in enumerate(raw_results):
-            metadata = result["metadata"]
-            
-            # Filter by document type
-            if filter_doc_types and metadata.get("file_type", "").lower() not in [t.lower() for t in filter_doc_types]:
-                continue
-            
-            # Apply minimum score threshold
-            if min_score_threshold is not None and result["score"] > min_score_threshold:
-                continue
-            
-            # Deduplicate similar chunks from same document
-            if deduplicate:
-                doc_chunk_key = f"{metadata['doc_id']}_{metadata['chunk_index']//3}"  # Group nearby chunks
-                if doc_chunk_key in seen_doc_chunks:
-                    continue
-                seen_doc_chunks.add(doc_chunk_key)
-            
-            # Create enhanced result
-            enhanced_result = SearchResult(
-                score=result["score"],
-                index=result["index"],
-                doc_id=metadata["doc_id"],
-                chunk_text=result["text"],
-                metadata=metadata if include_metadata else {},
-                rank=len(enhanced_results) + 1
-            )
-            
-            enhanced_results.append(enhanced_result)
-            
-            if len(enhanced_results) >= k:
-                break
+        indices, scores, initial_candidates = _refine_candidates(
+            vector_store,
+            candidate_indices[0],
+            candidate_scores[0],
+            k=k,
+            search_k=search_k,
+            score_threshold=score_threshold,
+            min_score_threshold=min_score_threshold,
+            filter_doc_ids=filter_doc_ids,
+            filter_doc_types=filter_doc_types,
+            boost_recent=boost_recent,
+            deduplicate=deduplicate
+        )
         
-        # Apply recency boost if requested
-        if boost_recent and enhanced_results:
-            enhanced_results = _apply_recency_boost(enhanced_results)
-            enhanced_results.sort(key=lambda x: x.score)  # Re-sort by adjusted scores
-            
-            # Update ranks
-            for i, result in enumerate(enhanced_results):
-                result.rank = i + 1
+        enhanced_results = _build_search_results(vector_store, indices, scores, include_metadata)
         
         # Calculate analytics
-        end_time = datetime.now()
-        search_time_ms = (end_time - start_time).total_seconds() * 1000
-        
-        index_stats = vector_store.get_stats()
+        search_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
         
         # Prepare final results
-        final_results = [result.to_dict() for result in enhanced_results]
+        final_results = enhanced_results.to_dicts()
         
         return {
             "status": "success",
             "results": final_results,
             "total_results": len(final_results),
             "query_info": {
-                "query_type": "text" if isinstance(query, str) else "vector",
-                "query_text": query if isinstance(query, str) else None,
+                "query_type": "text" if is_text else "vector",
+                "query_text": query if is_text else None,
                 "embedding_metadata": query_metadata,
                 "k": k,
                 "filters_applied": {
@@ -230,11 +272,11 @@ async def advanced_similarity_search(
             },
             "analytics": {
                 "search_time_ms": round(search_time_ms, 2),
-                "initial_candidates": len(raw_results),
+                "initial_candidates": initial_candidates,
                 "filtered_results": len(final_results),
-                "index_size": index_stats["total_vectors"],
-                "total_documents": index_stats["total_documents"],
-                "relevance_distribution": _calculate_relevance_distribution(enhanced_results)
+                "index_size": total_vectors,
+                "total_documents": stats["total_documents"],
+                "relevance_distribution": _calculate_relevance_distribution(enhanced_results.relevance_codes)
             }
         }
         
@@ -247,43 +289,172 @@ async def advanced_similarity_search(
         }
 
 
-def _apply_recency_boost(results: List[SearchResult]) -> List[SearchResult]:
-    """Apply recency boost to search results based on document creation time"""
+def _is_trivial_query(
+    stats: Dict[str, Any],
+    filter_doc_ids: Optional[List[str]],
+    filter_doc_types: Optional[List[str]],
+    min_score_threshold: Optional[float],
+    boost_recent: bool,
+    deduplicate: bool
+) -> bool:
+    """
+    Check whether the top k index hits are already the final results
     
-    if not results:
-        return results
+    True when no filter, deduplication or re-ranking is requested and no
+    removed document has left stale vectors in the index. A score threshold
+    only truncates the ranked list, so it does not need extra candidates.
+    """
+    return (
+        not filter_doc_ids
+        and not filter_doc_types
+        and min_score_threshold is None
+        and not boost_recent
+        and not deduplicate
+        and stats["total_chunks"] == stats["total_vectors"]
+    )
+
+
+def _search_candidates(vector_store, query_matrix: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Retrieve the n nearest candidates for every query in one batched call
     
-    # Get creation times and calculate recency scores
-    now = datetime.now()
+    Args:
+        vector_store: Vector store to search
+        query_matrix: Unit-length float32 query embeddings of shape (n_queries, dimension)
+        n: Number of candidates per query
+        
+    Returns:
+        Tuple of (indices, scores) arrays of shape (n_queries, n), highest
+        cosine similarity first
+    """
+    quantized = vector_store.quantized_vectors() if SIMSIMD_AVAILABLE else None
     
-    for result in results:
-        created_at_str = result.metadata.get("created_at", now.isoformat())
-        try:
-            created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-            days_ago = (now - created_at).days
-            
-            # Apply exponential decay: more recent = lower boost to distance
-            # This reduces the similarity score (making it better) for recent documents
-            recency_factor = np.exp(-days_ago / 30.0) * 0.1  # 30-day half-life
-            result.score = result.score * (1.0 - recency_factor)
-            
-        except (ValueError, TypeError):
-            # If we can't parse the date, don't apply boost
-            continue
+    if quantized is not None and len(quantized[0]) > 0 and n > 0:
+        # Coarse int8 inner products with SimSIMD, then exact float32 rescoring
+        # of the top 2n candidates so the returned scores match FAISS
+        corpus_codes, corpus_scales = quantized
+        query_codes, query_scales = quantize_int8(query_matrix)
+        coarse = quantized_similarities(query_codes, query_scales, corpus_codes, corpus_scales)
+        
+        candidates, _ = top_k_rows(coarse, 2 * n)
+        order, exact = top_k_rows(vector_store.rescore_candidates(query_matrix, candidates), n)
+        return np.take_along_axis(candidates, order, axis=1), exact
     
-    return results
+    return vector_store.batch_similarity_search(query_matrix, n, normalized=True)
 
 
-def _calculate_relevance_distribution(results: List[SearchResult]) -> Dict[str, int]:
-    """Calculate distribution of relevance categories in results"""
+def _refine_candidates(
+    vector_store,
+    indices: np.ndarray,
+    scores: np.ndarray,
+    k: int,
+    search_k: int,
+    score_threshold: Optional[float] = None,
+    min_score_threshold: Optional[float] = None,
+    filter_doc_ids: Optional[List[str]] = None,
+    filter_doc_types: Optional[List[str]] = None,
+    boost_recent: bool = False,
+    deduplicate: bool = True
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Filter, deduplicate and re-rank the raw candidates of a single query
     
-    distribution = {"high": 0, "medium": 0, "low": 0, "very_low": 0}
+    Returns:
+        Tuple of (indices, scores, initial_candidates) for at most k results
+    """
+    columns = vector_store.metadata_arrays()
     
-    for result in results:
-        category = result.get_relevance_category()
-        distribution[category] += 1
+    # Drop empty FAISS slots and chunks of removed documents
+    valid = indices >= 0
+    indices, scores = indices[valid], scores[valid]
+    doc_codes = columns["doc_id_codes"][indices]
+    mask = doc_codes >= 0
     
-    return distribution
+    if filter_doc_ids:
+        allowed_doc_codes = [vector_store.doc_id_to_code[d] for d in filter_doc_ids if d in vector_store.doc_id_to_code]
+        mask &= np.isin(doc_codes, allowed_doc_codes)
+    
+    if score_threshold is not None:
+        mask &= scores >= score_threshold
+    
+    indices, scores = indices[mask][:search_k], scores[mask][:search_k]
+    initial_candidates = len(indices)
+    
+    mask = np.ones(len(indices), dtype=bool)
+    
+    # Filter by document type
+    if filter_doc_types:
+        allowed_types = frozenset(t.lower() for t in filter_doc_types)
+        allowed_type_codes = [
+            code for file_type, code in vector_store.file_type_to_code.items() if file_type in allowed_types
+        ]
+        mask &= np.isin(columns["file_type_codes"][indices], allowed_type_codes)
+    
+    # Apply minimum score threshold
+    if min_score_threshold is not None:
+        mask &= scores >= min_score_threshold
+    
+    indices, scores = indices[mask], scores[mask]
+    
+    # Deduplicate similar chunks from same document, keeping the best-ranked one
+    if deduplicate and len(indices) > 0:
+        group_keys = columns["doc_id_codes"][indices].astype(np.int64) * 1_000_000 + columns["chunk_indices"][indices] // 3  # Group nearby chunks
+        _, first_seen = np.unique(group_keys, return_index=True)
+        keep = np.sort(first_seen)
+        indices, scores = indices[keep], scores[keep]
+    
+    indices, scores = indices[:k], scores[:k]
+    
+    # Apply recency boost if requested
+    if boost_recent and len(indices) > 0:
+        scores = _apply_recency_boost(scores, columns["created_at_epoch"][indices])
+        order = np.argsort(-scores, kind="stable")  # Re-sort by adjusted scores
+        indices, scores = indices[order], scores[order]
+    
+    return indices, scores, initial_candidates
+
+
+def _build_search_results(vector_store, indices: np.ndarray, scores: np.ndarray,
+                          include_metadata: bool = True) -> ResultBatch:
+    """Gather the column data of the final candidates into a ResultBatch"""
+    metadata = [vector_store.metadata_store[int(idx)] for idx in indices]
+    
+    return ResultBatch(
+        indices=indices,
+        scores=np.asarray(scores, dtype=np.float32),
+        doc_ids=[m.doc_id for m in metadata],
+        chunk_texts=[m.chunk_text for m in metadata],
+        metadata=[m.to_dict() for m in metadata] if include_metadata else [{} for _ in metadata]
+    )
+
+
+def _apply_recency_boost(scores: np.ndarray, created_at_epoch: np.ndarray) -> np.ndarray:
+    """
+    Apply recency boost to search scores based on document creation time
+    
+    Args:
+        scores: Cosine similarities of the results (higher is better)
+        created_at_epoch: Creation times of the results in epoch seconds,
+            MISSING_TIMESTAMP where unknown
+        
+    Returns:
+        Adjusted scores; results with unknown creation time are unchanged
+    """
+    known = created_at_epoch != MISSING_TIMESTAMP
+    days_ago = np.floor_divide(int(time.time()) - created_at_epoch[known], 86400).astype(np.float32)
+    
+    # Apply exponential decay: more recent = larger share of the remaining
+    # gap to a perfect score of 1.0 (up to 10% for documents created today)
+    boosted = scores.astype(np.float32, copy=True)
+    boosted[known] += np.exp(-days_ago / 30.0) * 0.1 * (1.0 - boosted[known])  # 30-day half-life
+    return boosted
+
+
+def _calculate_relevance_distribution(codes: np.ndarray) -> Dict[str, int]:
+    """Calculate distribution of relevance categories from precomputed category codes"""
+    
+    counts = np.bincount(codes, minlength=len(_CATEGORY_NAMES))
+    return dict(zip(_CATEGORY_NAMES, counts.tolist()))
 
 
 async def multi_query_search(
@@ -299,7 +470,7 @@ async def multi_query_search(
         queries: List of query strings
         k: Number of results per query
         combination_method: How to combine scores ('average', 'max', 'min', 'weighted')
-        **kwargs: Additional arguments passed to advanced_similarity_search
+        **kwargs: Additional search parameters accepted by advanced_similarity_search
         
     Returns:
         Combined search results from multiple queries
@@ -308,71 +479,99 @@ async def multi_query_search(
     if not queries:
         return {"status": "error", "error": "No queries provided", "results": []}
     
-    # Perform search for each query
-    all_results = []
-    query_results = {}
+    api_key = kwargs.pop("api_key", None)
+    embedding_model = kwargs.pop("embedding_model", "embedding-001")
+    include_metadata = kwargs.pop("include_metadata", True)
     
-    for i, query in enumerate(queries):
-        result = await advanced_similarity_search(query, k=k*2, **kwargs)  # Get extra results
-        if result["status"] == "success":
-            query_results[f"query_{i}"] = result
-            all_results.extend(result["results"])
+    vector_store = get_vector_store()
+    total_vectors = vector_store.get_stats()["total_vectors"]
     
-    if not all_results:
-        return {"status": "error", "error": "No results from any query", "results": []}
+    # Embed every query concurrently, skipping the ones that fail
+    from main import generate_query_embedding
     
-    # Combine results by document chunk
-    combined_scores = {}
+    embedding_results = await asyncio.gather(
+        *(generate_query_embedding(query_text=query, api_key=api_key, model=embedding_model) for query in queries),
+        return_exceptions=True
+    )
     
-    for result in all_results:
-        key = f"{result['doc_id']}_{result['index']}"
-        
-        if key not in combined_scores:
-            combined_scores[key] = {
-                "result": result,
-                "scores": [],
-                "queries": []
-            }
-        
-        combined_scores[key]["scores"].append(result["score"])
-        combined_scores[key]["queries"].append(len(combined_scores[key]["scores"]) - 1)
+    query_positions = []
+    query_embeddings = []
     
-    # Apply combination method
-    final_results = []
+    for i, embedding_result in enumerate(embedding_results):
+        if isinstance(embedding_result, BaseException):
+            logger.warning(f"Query {i} embedding failed: {embedding_result}")
+            continue
+        if embedding_result.get("success"):
+            query_positions.append(i)
+            query_embeddings.append(embedding_result["embedding"])
     
-    for key, data in combined_scores.items():
-        scores = data["scores"]
-        result = data["result"].copy()
-        
-        if combination_method == "average":
-            combined_score = np.mean(scores)
-        elif combination_method == "max":
-            combined_score = np.max(scores)
-        elif combination_method == "min":
-            combined_score = np.min(scores)
-        elif combination_method == "weighted":
-            # Weight by number of queries that returned this result
-            weights = [1.0 / (i + 1) for i in range(len(scores))]
-            combined_score = np.average(scores, weights=weights)
-        else:
-            combined_score = np.mean(scores)
-        
-        result["score"] = float(combined_score)
-        result["multi_query_info"] = {
-            "query_count": len(scores),
-            "individual_scores": scores,
-            "combination_method": combination_method
-        }
+    # Search all queries against the index in one batched call
+    query_batches: List[ResultBatch] = []
+    
+    if query_embeddings and total_vectors > 0:
+        per_query_k = k * 2  # Get extra results
+        search_k = min(per_query_k * 3, total_vectors)
+        query_matrix = prepare_query_matrix(query_embeddings)
+        candidate_indices, candidate_scores = _search_candidates(vector_store, query_matrix, search_k * 2)
         
-        final_results.append(result)
+        for row, position in enumerate(query_positions):
+            indices, scores, _ = _refine_candidates(
+                vector_store,
+                candidate_indices[row],
+                candidate_scores[row],
+                k=per_query_k,
+                search_k=search_k,
+                **kwargs
+            )
+            query_batches.append(_build_search_results(vector_store, indices, scores, include_metadata))
+    
+    if not any(len(batch) for batch in query_batches):
+        return {"status": "error", "error": "No results from any query", "results": []}
+    
+    # Concatenate the per-query hits column-wise
+    indices = np.concatenate([batch.indices for batch in query_batches]).astype(np.int64)
+    scores = np.concatenate([batch.scores for batch in query_batches]).astype(np.float64)
+    relevance_codes = np.concatenate([batch.relevance_codes for batch in query_batches]).tolist()
+    doc_ids = [doc_id for batch in query_batches for doc_id in batch.doc_ids]
+    chunk_texts = [text for batch in query_batches for text in batch.chunk_texts]
+    metadata = [item for batch in query_batches for item in batch.metadata]
+    
+    # Combine results by document chunk, keyed by packed (doc_id code, vector index)
+    keys = vector_store.metadata_arrays()["doc_id_codes"][indices].astype(np.int64) << 32 | indices
+    _, first_seen, inverse = np.unique(keys, return_index=True, return_inverse=True)
     
-    # Sort by combined score and limit results
-    final_results.sort(key=lambda x: x["score"])
-    final_results = final_results[:k]
+    # Group each chunk's scores together, keeping query order within a group
+    order = np.argsort(inverse, kind="stable")
+    grouped_scores = scores[order]
+    counts = np.bincount(inverse)
+    starts = np.cumsum(counts) - counts
+    combined = _combine_grouped_scores(grouped_scores, starts, counts, combination_method)
     
-    # Update ranks
-    for i, result in enumerate(final_results):
-        result["rank"] = i + 1
+    # Select the top k chunks by combined score without sorting every chunk;
+    # candidates are laid out in order of first appearance so ties keep it
+    appearance = np.argsort(first_seen, kind="stable")
+    top, _ = top_k_candidates(combined[appearance], k)
+    
+    final_results = []
+    
+    for rank, group in enumerate(appearance[top], start=1):
+        # Emit each chunk from its first hit's columns
+        hit = first_seen[group]
+        final_results.append({
+            "score": float(combined[group]),
+            "rank": rank,
+            "index": int(indices[hit]),
+            "doc_id": doc_ids[hit],
+            "text": chunk_texts[hit],
+            "metadata": metadata[hit],
+            "relevance": _CATEGORY_NAMES[relevance_codes[hit]],
+            "snippet": _text_snippet(chunk_texts[hit]),
+            "multi_query_info": {
+                "query_count": int(counts[group]),
+                "individual_scores": grouped_scores[starts[group]:starts[group] + counts[group]].tolist(),
+                "combination_method": combination_method
+            }
+        })
     
     return {
         "status": "success",
@@ -381,11 +580,36 @@ async def multi_query_search(
         "query_info": {
             "queries": queries,
             "combination_method": combination_method,
-            "individual_query_results": len(query_results)
+            "individual_query_results": len(query_batches)
         }
     }
 
 
+def _combine_grouped_scores(grouped_scores: np.ndarray, starts: np.ndarray,
+                            counts: np.ndarray, combination_method: str) -> np.ndarray:
+    """
+    Combine the per-query scores of each result chunk
+    
+    Args:
+        grouped_scores: Scores sorted so each chunk's scores are contiguous
+        starts: Offset of each chunk's first score in grouped_scores
+        counts: Number of scores per chunk
+        combination_method: 'average', 'max', 'min' or 'weighted'
+        
+    Returns:
+        Combined score per chunk
+    """
+    if combination_method == "max":
+        return np.maximum.reduceat(grouped_scores, starts)
+    if combination_method == "min":
+        return np.minimum.reduceat(grouped_scores, starts)
+    if combination_method == "weighted":
+        # Weight the n-th query that returned a chunk by 1 / n
+        weights = 1.0 / (np.arange(len(grouped_scores)) - np.repeat(starts, counts) + 1)
+        return np.add.reduceat(grouped_scores * weights, starts) / np.add.reduceat(weights, starts)
+    return np.add.reduceat(grouped_scores, starts) / counts
+
+
 async def search_with_context(
     query: str,
     context_window: int = 2,
@@ -413,30 +637,31 @@ async def search_with_context(
     
     vector_store = get_vector_store()
     enhanced_results = []
+    # Chunks and chunk texts of each matched document, fetched once per call
+    doc_chunks_cache: Dict[str, Tuple[List[Dict[str, Any]], List[str]]] = {}
     
     for result in search_result["results"]:
         doc_id = result["doc_id"]
         chunk_index = result["metadata"]["chunk_index"]
         
         # Get all chunks for this document
-        doc_chunks = vector_store.get_document_chunks(doc_id)
+        if doc_id not in doc_chunks_cache:
+            chunks = vector_store.get_document_chunks(doc_id)
+            doc_chunks_cache[doc_id] = (chunks, [chunk["text"] for chunk in chunks])
+        doc_chunks, doc_texts = doc_chunks_cache[doc_id]
         
-        # Find context chunks
-        context_chunks = []
+        # Find context chunks; copies keep the cached chunks free of per-match fields
         start_idx = max(0, chunk_index - context_window)
         end_idx = min(len(doc_chunks), chunk_index + context_window + 1)
-        
-        for i in range(start_idx, end_idx):
-            if i < len(doc_chunks):
-                context_chunk = doc_chunks[i]
-                context_chunk["is_match"] = (i == chunk_index)
-                context_chunk["context_position"] = i - chunk_index
-                context_chunks.append(context_chunk)
+        context_chunks = [
+            {**chunk, "is_match": i == chunk_index, "context_position": i - chunk_index}
+            for i, chunk in enumerate(doc_chunks[start_idx:end_idx], start=start_idx)
+        ]
         
         # Enhance result with context
         enhanced_result = result.copy()
         enhanced_result["context_chunks"] = context_chunks
-        enhanced_result["context_text"] = " ".join([chunk["text"] for chunk in context_chunks])
+        enhanced_result["context_text"] = " ".join(doc_texts[start_idx:end_idx])
         
         enhanced_results.append(enhanced_result)
     
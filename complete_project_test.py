@@ -3,10 +3,16 @@
 
 import os
 import sys
+import csv
 import asyncio
 import traceback
 import time
-from datetime import datetime
+import hashlib
+import pickle
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -16,28 +22,150 @@ try:
     load_dotenv()
     
     # Import all project components
-    from robust_document_parser import parse_document
+    from robust_document_parser import chunk_columns, parse_document
     from gemini_vector_embedder import GeminiVectorEmbedder
-    from main import create_embeddings, query_documents, get_documents_info
+    from semantic_cache import SemanticCache
+    from faiss_store import get_vector_store
+    from main import query_documents_by_vector
     
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("Ensure all dependencies are installed")
     sys.exit(1)
 
+# uvloop's libuv event loop cuts per-task overhead for the concurrent API calls (not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# One row of phase timings is appended here per run, for tracking performance across changes
+BENCH_CSV_PATH = Path('bench.csv')
+BENCH_FIELDS = ['timestamp', 'cache_hit', 'parse_seconds', 'embed_seconds',
+                'mean_query_seconds', 'max_query_seconds', 'success_rate']
+
+# Upper bound for a single PHASE 5 query so one slow answer cannot stall the suite
+QUERY_TIMEOUT_SECONDS = 30
+
+# PHASE 5 questions; fixed, so they are embedded once before querying
+TEST_QUERIES = [
+    "What is Bajaj's main business?",
+    "What are the key financial metrics mentioned?",
+    "What is the company's performance outlook?",
+    "What are the main business segments?",
+    "What challenges does the company face?"
+]
+
+# Parsed chunks and their embeddings are cached on disk, keyed by PDF content and chunking settings
+DOCUMENT_CACHE_DIR = Path('.cache')
+CHUNKING_SETTINGS = dict(min_chunk_tokens=100, max_chunk_tokens=2000, target_chunk_tokens=1000)
+EMBEDDING_MODEL = "embedding-001"
+
+def document_cache_path(pdf_path, embedding_model):
+    """Cache file for a PDF; any change to its bytes or the chunking/embedding settings gives a new key."""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(repr((sorted(CHUNKING_SETTINGS.items()), embedding_model)).encode())
+    return DOCUMENT_CACHE_DIR / f"{digest.hexdigest()[:16]}.pkl"
+
+def load_document_cache(cache_path):
+    """Return (chunks, embedded_texts, embeddings) from the cache, or None if missing or unreadable."""
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable cache {cache_path}: {e}")
+        return None
+
+def save_document_cache(cache_path, chunks, embedded_texts, embeddings):
+    """Write chunks, the texts that were embedded and their float32 embedding matrix to the cache."""
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((chunks, embedded_texts, embeddings), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(cache_path)
+    except OSError as e:
+        print(f"⚠️  Could not write cache {cache_path}: {e}")
+
+def append_bench_row(row):
+    """Append one row of timings to BENCH_CSV_PATH, writing the header for a new file; None is written as empty."""
+    try:
+        is_new = not BENCH_CSV_PATH.exists() or BENCH_CSV_PATH.stat().st_size == 0
+        with open(BENCH_CSV_PATH, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=BENCH_FIELDS)
+            if is_new:
+                writer.writeheader()
+            writer.writerow(row)
+    except OSError as e:
+        print(f"⚠️  Could not write benchmark row to {BENCH_CSV_PATH}: {e}")
+
+async def batch_query_documents(queries, query_vectors, query_cache, timeout=QUERY_TIMEOUT_SECONDS):
+    """
+    Answer several queries concurrently, reusing semantically cached answers.
+    
+    Queries are answered from their precomputed vectors; a query without
+    one is reported as a ValueError. Each query is bounded by timeout seconds,
+    and a failed or timed-out query is reported as its exception without
+    cancelling the others.
+    
+    Returns:
+        List of (answer_result or exception, seconds until answered, cache_hit)
+        in the same order as queries
+    """
+    start_time = time.perf_counter()
+    
+    vectors = list(query_vectors) if len(query_vectors) == len(queries) else [None] * len(queries)
+    
+    outcomes = [None] * len(queries)
+    pending = []
+    
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            outcomes[i] = (ValueError("No query embedding"), time.perf_counter() - start_time, False)
+            continue
+        cached = query_cache.get(vector)
+        if cached is not None:
+            outcomes[i] = (cached, time.perf_counter() - start_time, True)
+        else:
+            pending.append(i)
+    
+    async def answer(i):
+        try:
+            result = await asyncio.wait_for(query_documents_by_vector(queries[i], vectors[i]), timeout=timeout)
+        except Exception as e:
+            result = e
+        outcomes[i] = (result, time.perf_counter() - start_time, False)
+        
+        if isinstance(result, dict) and result.get('answer'):
+            query_cache.put(vectors[i], result)
+    
+    async with asyncio.TaskGroup() as tg:
+        for i in pending:
+            tg.create_task(answer(i))
+    return outcomes
+
+def emit(*lines):
+    """Write a block of report lines with a single stdout write."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
 async def test_complete_project_bajaj():
     """Complete end-to-end test of the entire project with bajaj.pdf."""
     
-    print("🚀 COMPLETE PROJECT TEST - BAJAJ.PDF END-TO-END")
-    print("=" * 80)
-    print(f"📅 Test Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"📁 Working Directory: {os.getcwd()}")
+    emit("🚀 COMPLETE PROJECT TEST - BAJAJ.PDF END-TO-END",
+         "=" * 80,
+         f"📅 Test Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+         f"📁 Working Directory: {os.getcwd()}")
     
     pdf_path = 'bajaj.pdf'
     
     # PHASE 1: Environment & File Validation
-    print(f"\n{'🔍 PHASE 1: ENVIRONMENT VALIDATION'}")
-    print("-" * 60)
+    emit(f"\n{'🔍 PHASE 1: ENVIRONMENT VALIDATION'}", "-" * 60)
     
     # Check API key
     api_key = os.getenv('GEMINI_API_KEY')
@@ -46,43 +174,53 @@ async def test_complete_project_bajaj():
         return False
     print(f"✅ API Key found: {api_key[:15]}...")
     
-    # Check file exists
-    if not os.path.exists(pdf_path):
+    # Check file exists and read its size with one stat call
+    try:
+        pdf_stat = os.stat(pdf_path)
+    except FileNotFoundError:
         print(f"❌ Test file {pdf_path} not found")
         return False
     
-    file_size_kb = os.path.getsize(pdf_path) / 1024
+    file_size_kb = pdf_stat.st_size / 1024
     print(f"✅ File found: {pdf_path} ({file_size_kb:.1f} KB)")
     
+    # Reuse parsed chunks and embeddings from an earlier run of the same PDF
+    cache_path = document_cache_path(pdf_path, EMBEDDING_MODEL)
+    cached_document = load_document_cache(cache_path)
+    
     # PHASE 2: Document Parser Test (The Fixed Chunking)
-    print(f"\n{'📄 PHASE 2: DOCUMENT PARSING & CHUNKING'}")
-    print("-" * 60)
+    emit(f"\n{'📄 PHASE 2: DOCUMENT PARSING & CHUNKING'}", "-" * 60)
     
     try:
-        start_time = time.time()
-        result = parse_document(
-            pdf_path, 
-            min_chunk_tokens=100, 
-            max_chunk_tokens=2000, 
-            target_chunk_tokens=1000
-        )
-        parse_time = time.time() - start_time
-        
-        chunks = result.get('chunks', [])
-        token_stats = result.get('token_statistics', {})
-        metadata = result.get('metadata', {})
-        
-        print(f"✅ PARSING SUCCESS ({parse_time:.2f}s)")
-        print(f"   Status: {result.get('status', 'unknown')}")
-        print(f"   Pages: {metadata.get('page_count', 'unknown')}")
-        print(f"   Total chunks: {len(chunks)}")
-        print(f"   Total tokens: {token_stats.get('total_tokens', 0):,}")
-        print(f"   Avg tokens/chunk: {token_stats.get('avg_tokens_per_chunk', 0):.1f}")
-        print(f"   Max tokens/chunk: {token_stats.get('max_tokens_per_chunk', 0)}")
+        if cached_document is not None:
+            chunks, _, _ = cached_document
+            chunk_soa = chunk_columns(chunks)
+            parse_time = None
+            print(f"✅ PARSING SKIPPED: {len(chunks)} chunks loaded from {cache_path}")
+        else:
+            start_time = time.perf_counter()
+            result = parse_document(pdf_path, **CHUNKING_SETTINGS, num_workers=os.cpu_count())
+            parse_time = time.perf_counter() - start_time
+            
+            chunks = result.get('chunks', [])
+            chunk_soa = result.get('chunks_soa') or chunk_columns(chunks)
+            token_stats = result.get('token_statistics', {})
+            metadata = result.get('metadata', {})
+            
+            emit(f"✅ PARSING SUCCESS ({parse_time:.2f}s)",
+                 f"   Status: {result.get('status', 'unknown')}",
+                 f"   Pages: {metadata.get('page_count', 'unknown')}",
+                 f"   Total chunks: {len(chunks)}",
+                 f"   Total tokens: {token_stats.get('total_tokens', 0):,}",
+                 f"   Avg tokens/chunk: {token_stats.get('avg_tokens_per_chunk', 0):.1f}",
+                 f"   Max tokens/chunk: {token_stats.get('max_tokens_per_chunk', 0)}",
+                 f"   Page extraction: {metadata.get('text_extraction_seconds', 0):.2f}s "
+                 f"({metadata.get('extraction_workers', 1)} workers), chunking: {metadata.get('chunking_seconds', 0):.2f}s")
         
         # Verify chunking fix
-        max_tokens = token_stats.get('max_tokens_per_chunk', 0)
-        over_limit = sum(1 for c in chunks if c.get('token_count', 0) > 2000)
+        token_counts = chunk_soa['token_count']
+        max_tokens = int(token_counts.max()) if len(token_counts) else 0
+        over_limit = int(np.count_nonzero(token_counts > 2000))
         
         if over_limit == 0 and max_tokens <= 2000:
             print(f"✅ CHUNKING FIX VERIFIED: All chunks under 2000 tokens!")
@@ -96,14 +234,13 @@ async def test_complete_project_bajaj():
         return False
     
     # PHASE 3: Gemini API Authentication Test
-    print(f"\n{'🤖 PHASE 3: GEMINI API AUTHENTICATION'}")
-    print("-" * 60)
+    emit(f"\n{'🤖 PHASE 3: GEMINI API AUTHENTICATION'}", "-" * 60)
     
     try:
-        embedder = GeminiVectorEmbedder(api_key=api_key)
-        print(f"✅ Embedder created")
-        print(f"   Model: {embedder.model}")
-        print(f"   Base URL: {embedder.base_url}")
+        embedder = GeminiVectorEmbedder(api_key=api_key, model=EMBEDDING_MODEL)
+        emit(f"✅ Embedder created",
+             f"   Model: {embedder.model}",
+             f"   Base URL: {embedder.base_url}")
         
         # Test with small sample
         test_text = "Sample text for Gemini API test"
@@ -112,12 +249,17 @@ async def test_complete_project_bajaj():
         if embed_result.get('success'):
             embeddings = embed_result.get('embeddings', [])
             dimensions = embed_result.get('dimensions', 0)
-            print(f"✅ AUTHENTICATION SUCCESS")
-            print(f"   Generated embeddings: {len(embeddings)}")
-            print(f"   Dimensions: {dimensions}")
+            emit(f"✅ AUTHENTICATION SUCCESS",
+                 f"   Generated embeddings: {len(embeddings)}",
+                 f"   Dimensions: {dimensions}")
         else:
             print(f"❌ AUTHENTICATION FAILED: {embed_result.get('error')}")
             return False
+        
+        # Embed the PHASE 5 queries once, up front
+        query_embed_result = await embedder.generate_embeddings(TEST_QUERIES)
+        query_vectors = query_embed_result.get('embeddings', []) if query_embed_result.get('success') else []
+        print(f"   Precomputed query embeddings: {len(query_vectors)}/{len(TEST_QUERIES)}")
             
     except Exception as e:
         print(f"❌ API TEST FAILED: {str(e)}")
@@ -125,87 +267,116 @@ async def test_complete_project_bajaj():
         return False
     
     # PHASE 4: Full Document Processing
-    print(f"\n{'📊 PHASE 4: FULL DOCUMENT EMBEDDING CREATION'}")
-    print("-" * 60)
+    emit(f"\n{'📊 PHASE 4: FULL DOCUMENT EMBEDDING CREATION'}", "-" * 60)
     
     try:
-        start_time = time.time()
-        embed_result = await create_embeddings(pdf_path)
-        embed_time = time.time() - start_time
+        start_time = time.perf_counter()
+        
+        if cached_document is not None:
+            _, chunk_texts, embeddings = cached_document
+            print(f"✅ EMBEDDINGS LOADED FROM CACHE ({len(embeddings)} vectors)")
+        else:
+            embed_result = await embedder.generate_embeddings(chunk_soa['text'])
+            if not embed_result.get('success'):
+                print(f"❌ EMBEDDING CREATION FAILED: {embed_result.get('error')}")
+                return False
+            
+            # Long chunks are split for the embedding model; index the texts that were embedded
+            chunk_texts = embed_result['processed_chunks']
+            embeddings = np.asarray(embed_result['embeddings'], dtype=np.float32)
+            save_document_cache(cache_path, chunks, chunk_texts, embeddings)
+            print(f"✅ EMBEDDING CREATION SUCCESS ({len(embeddings)} vectors, cached to {cache_path})")
         
-        print(f"✅ EMBEDDING CREATION SUCCESS ({embed_time:.2f}s)")
-        print(f"   Result: {embed_result}")
+        vector_store = get_vector_store()
+        doc_id = vector_store.add_document_embeddings(
+            embeddings=embeddings,
+            file_path=pdf_path,
+            file_type='pdf',
+            chunk_texts=chunk_texts
+        )
+        embed_time = time.perf_counter() - start_time
         
-        # Check document info
-        doc_info = await get_documents_info()
-        print(f"✅ Documents in system: {len(doc_info.get('documents', []))}")
+        emit(f"✅ Indexed as {doc_id} ({embed_time:.2f}s)",
+             f"✅ Documents in system: {vector_store.get_stats().get('total_documents', 0)}")
         
     except Exception as e:
         print(f"❌ EMBEDDING CREATION FAILED: {str(e)}")
         traceback.print_exc()
         return False
+    finally:
+        # PHASES 3 and 4 shared the embedder's pooled HTTP session; it is not needed after this
+        await embedder.close()
     
     # PHASE 5: Query Testing (The Ultimate Test)
-    print(f"\n{'💬 PHASE 5: AI Q&A FUNCTIONALITY'}")
-    print("-" * 60)
+    emit(f"\n{'💬 PHASE 5: AI Q&A FUNCTIONALITY'}", "-" * 60)
     
-    test_queries = [
-        "What is Bajaj's main business?",
-        "What are the key financial metrics mentioned?",
-        "What is the company's performance outlook?",
-        "What are the main business segments?",
-        "What challenges does the company face?"
-    ]
+    test_queries = TEST_QUERIES
     
     successful_queries = 0
+    # Near-duplicate queries (cosine >= 0.95) reuse an earlier answer
+    query_cache = SemanticCache(capacity=256, threshold=0.95, ttl_seconds=300)
     
-    for i, query in enumerate(test_queries, 1):
-        try:
-            print(f"\n🔍 Query {i}: {query}")
-            start_time = time.time()
-            answer_result = await query_documents(query)
-            query_time = time.time() - start_time
+    # Queries are answered concurrently from their precomputed embeddings
+    outcomes = await batch_query_documents(test_queries, query_vectors, query_cache)
+    
+    # The whole query report is written in one block
+    report = []
+    for i, (query, (answer_result, query_time, cache_hit)) in enumerate(zip(test_queries, outcomes), 1):
+        report.append(f"\n🔍 Query {i}: {query}")
+        
+        if isinstance(answer_result, Exception):
+            report.append(f"❌ Query failed: {str(answer_result) or type(answer_result).__name__}")
+        elif answer_result and answer_result.get('answer'):
+            answer = answer_result['answer']
+            sources = answer_result.get('sources', answer_result.get('search_results', []))
+            confidence = answer_result.get('confidence', 0)
             
-            if answer_result and answer_result.get('answer'):
-                answer = answer_result['answer']
-                sources = answer_result.get('sources', [])
-                confidence = answer_result.get('confidence', 0)
-                
-                print(f"✅ SUCCESS ({query_time:.2f}s)")
-                print(f"   Answer: {answer[:200]}...")
-                print(f"   Sources: {len(sources)} chunks")
-                print(f"   Confidence: {confidence}")
-                successful_queries += 1
-            else:
-                print(f"❌ No answer received")
-                
-        except Exception as e:
-            print(f"❌ Query failed: {str(e)}")
+            report += [f"✅ SUCCESS ({query_time:.2f}s){' [semantic cache hit]' if cache_hit else ''}",
+                       f"   Answer: {answer[:200]}...",
+                       f"   Sources: {len(sources)} chunks",
+                       f"   Confidence: {confidence}"]
+            successful_queries += 1
+        else:
+            report.append(f"❌ No answer received")
     
-    # PHASE 6: Final Results
-    print(f"\n{'🎯 PHASE 6: FINAL RESULTS'}")
-    print("-" * 60)
+    cache_stats = query_cache.stats()
+    report.append(f"\n🗄️  Semantic cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    emit(*report)
     
+    # PHASE 6: Final Results
     success_rate = (successful_queries / len(test_queries)) * 100
-    
-    print(f"📊 TEST SUMMARY:")
-    print(f"   ✅ Document parsing: SUCCESS")
-    print(f"   ✅ Chunking fix: SUCCESS (max {max_tokens} tokens)")
-    print(f"   ✅ API authentication: SUCCESS")
-    print(f"   ✅ Embedding creation: SUCCESS")
-    print(f"   ✅ Query success rate: {successful_queries}/{len(test_queries)} ({success_rate:.1f}%)")
-    
     overall_success = success_rate >= 80  # 80% success rate threshold
     
+    summary = [f"\n{'🎯 PHASE 6: FINAL RESULTS'}",
+               "-" * 60,
+               f"📊 TEST SUMMARY:",
+               f"   ✅ Document parsing: SUCCESS",
+               f"   ✅ Chunking fix: SUCCESS (max {max_tokens} tokens)",
+               f"   ✅ API authentication: SUCCESS",
+               f"   ✅ Embedding creation: SUCCESS",
+               f"   ✅ Query success rate: {successful_queries}/{len(test_queries)} ({success_rate:.1f}%)"]
+    
     if overall_success:
-        print(f"\n🎉 PROJECT TEST PASSED!")
-        print(f"   🚀 System fully operational with bajaj.pdf")
-        print(f"   🔧 Chunking issue completely resolved")
-        print(f"   💬 AI Q&A functionality working")
-        print(f"   📈 Ready for production deployment")
+        summary += [f"\n🎉 PROJECT TEST PASSED!",
+                    f"   🚀 System fully operational with bajaj.pdf",
+                    f"   🔧 Chunking issue completely resolved",
+                    f"   💬 AI Q&A functionality working",
+                    f"   📈 Ready for production deployment"]
     else:
-        print(f"\n⚠️ PROJECT TEST PARTIALLY FAILED")
-        print(f"   Success rate below 80% threshold")
+        summary += [f"\n⚠️ PROJECT TEST PARTIALLY FAILED",
+                    f"   Success rate below 80% threshold"]
+    emit(*summary)
+    
+    query_times = [query_time for _, query_time, _ in outcomes]
+    append_bench_row({
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'cache_hit': cached_document is not None,
+        'parse_seconds': None if parse_time is None else f"{parse_time:.4f}",
+        'embed_seconds': f"{embed_time:.4f}",
+        'mean_query_seconds': f"{np.mean(query_times):.4f}",
+        'max_query_seconds': f"{max(query_times):.4f}",
+        'success_rate': f"{success_rate:.1f}"
+    })
     
     return overall_success
 
@@ -214,14 +385,13 @@ async def main():
     try:
         success = await test_complete_project_bajaj()
         
-        print(f"\n{'='*80}")
         if success:
-            print("🎊 COMPLETE PROJECT TEST: ✅ SUCCESS!")
-            print("Your AI Q&A system with bajaj.pdf is fully operational!")
+            verdict = ["🎊 COMPLETE PROJECT TEST: ✅ SUCCESS!",
+                       "Your AI Q&A system with bajaj.pdf is fully operational!"]
         else:
-            print("💥 COMPLETE PROJECT TEST: ❌ ISSUES DETECTED")
-            print("Check the logs above for specific failures")
-        print(f"{'='*80}")
+            verdict = ["💥 COMPLETE PROJECT TEST: ❌ ISSUES DETECTED",
+                       "Check the logs above for specific failures"]
+        emit(f"\n{'='*80}", *verdict, f"{'='*80}")
         
         return success
         
@@ -231,5 +401,6 @@ async def main():
         return False
 
 if __name__ == "__main__":
-    success = asyncio.run(main())
+    run = uvloop.run if UVLOOP_AVAILABLE else asyncio.run
+    success = run(main())
     sys.exit(0 if success else 1)
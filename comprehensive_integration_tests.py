@@ -5,8 +5,13 @@ Tests document parsing, embedding generation, and vector search pipeline
 
 import os
 import sys
+import pickle
+import hashlib
 import pytest
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 import logging
+import numpy as np
 from pathlib import Path
 from typing import List, Dict, Any
 import tempfile
@@ -23,115 +28,176 @@ from robust_embedding_generator import RobustEmbeddingGenerator, generate_embedd
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Embeddings of the fixed test texts persist here between runs
+EMBEDDING_CACHE_DIR = Path(tempfile.gettempdir()) / "embedding_cache"
 
-class TestDocumentParser:
-    """Test the robust document parser."""
+# Parse results of the user PDFs persist here, keyed by path and modification time
+PARSE_CACHE_DIR = Path(tempfile.gettempdir()) / "parsed_pdf_cache"
+
+# Multi-paragraph text for the chunk validation test
+CHUNK_TEST_CONTENT = """
+This is a test document with multiple paragraphs.
+
+The first paragraph contains some business information about financial performance.
+We need to ensure that this content is properly chunked and validated.
+
+The second paragraph discusses market trends and analysis.
+This should create meaningful chunks that can be embedded and searched.
+
+The third paragraph covers operational efficiency and strategic planning.
+All chunks should pass validation checks for quality and length.
+"""
+
+# Uncached PDFs are parsed concurrently by at most this many threads
+MAX_PARSE_WORKERS = 5
+
+PDF_FILES = (
+    r"e:\final try\bajaj.pdf",
+    r"e:\final try\chotgdp.pdf",
+    r"e:\final try\edl.pdf",
+    r"e:\final try\hdf.pdf",
+    r"e:\final try\ici.pdf"
+)
+
+# The pipeline test embeds chunks of 2 files for speed
+PIPELINE_PDF_FILES = (
+    r"e:\final try\bajaj.pdf",
+    r"e:\final try\hdf.pdf"
+)
+
+
+def _valid_numeric(embedding) -> bool:
+    """Check in one vectorized pass that an embedding holds only finite numbers."""
+    values = np.asarray(embedding)
+    return values.dtype.kind in 'fi' and bool(np.isfinite(values).all())
+
+
+def load_parsed_pdfs(pdf_files: List[str], use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Parse each existing PDF once, reusing pickled results from earlier runs.
     
-    @pytest.fixture
-    def parser(self):
-        """Create a document parser instance."""
-        return RobustDocumentParser(min_chunk_words=50, max_chunk_words=200)
+    PDFs without a cached result are parsed concurrently in up to
+    MAX_PARSE_WORKERS threads.
     
-    def test_pdf_parsing_all_files(self, parser):
-        """Test PDF parsing with all 5 user files."""
-        pdf_files = [
-            r"e:\final try\bajaj.pdf",
-            r"e:\final try\chotgdp.pdf",
-            r"e:\final try\edl.pdf",
-            r"e:\final try\hdf.pdf",
-            r"e:\final try\ici.pdf"
-        ]
+    Args:
+        pdf_files: Paths of the PDFs to parse
+        use_cache: Read and write parse results under PARSE_CACHE_DIR
         
-        results = {}
+    Returns:
+        Dictionary mapping each existing path to its parse result, or to the
+        exception raised while parsing it
+    """
+    parsed = {}
+    cache_files = {}
+    
+    for pdf_file in pdf_files:
+        try:
+            mtime_ns = os.stat(pdf_file).st_mtime_ns
+        except FileNotFoundError:
+            logger.warning(f"PDF file not found: {pdf_file}")
+            continue
         
-        for pdf_file in pdf_files:
-            if not Path(pdf_file).exists():
-                logger.warning(f"PDF file not found: {pdf_file}")
-                continue
-            
-            logger.info(f"Testing PDF parsing for: {pdf_file}")
-            
+        key = hashlib.md5(f"{pdf_file}:{mtime_ns}".encode()).hexdigest()
+        cache_files[pdf_file] = PARSE_CACHE_DIR / f"{key}.pkl"
+        if use_cache:
             try:
-                result = parser.parse_file(pdf_file)
-                
-                # Validate result structure
-                assert isinstance(result, dict)
-                assert 'success' not in result or result['success']  # If success field exists, it should be True
-                assert 'raw_text' in result
-                assert 'chunks' in result
-                assert 'total_chunks' in result
-                assert 'metadata' in result
-                
-                # Validate content quality
-                assert len(result['raw_text'].strip()) > 100, f"Text too short: {len(result['raw_text'])}"
-                assert result['total_chunks'] > 0, "No chunks created"
-                assert len(result['chunks']) == result['total_chunks'], "Chunk count mismatch"
-                
-                # Validate chunks
-                valid_chunks = [chunk for chunk in result['chunks'] if chunk.get('is_valid', True)]
-                assert len(valid_chunks) > 0, "No valid chunks"
-                
-                # Check extraction quality
-                quality = result.get('extraction_quality', {})
-                if quality:
-                    assert quality.get('alphabetic_ratio', 0) > 0.5, f"Poor text quality: {quality.get('alphabetic_ratio')}"
-                
-                results[pdf_file] = {
-                    'status': 'success',
-                    'chunks': len(valid_chunks),
-                    'words': result.get('total_words', 0),
-                    'characters': result.get('total_characters', 0),
-                    'library': result['metadata'].get('library', 'unknown'),
-                    'quality': quality.get('alphabetic_ratio', 0)
-                }
-                
-                logger.info(f"✅ Successfully parsed {Path(pdf_file).name}: {len(valid_chunks)} chunks, {result.get('total_words', 0)} words")
-                
+                with open(cache_files[pdf_file], 'rb') as f:
+                    parsed[pdf_file] = pickle.load(f)
+            except FileNotFoundError:
+                pass
             except Exception as e:
-                logger.error(f"❌ Failed to parse {pdf_file}: {e}")
-                results[pdf_file] = {
-                    'status': 'failed',
-                    'error': str(e)
-                }
-                # Don't fail the test immediately, collect all results
-                continue
+                logger.warning(f"Failed to load cached parse of {pdf_file}: {e}")
+    
+    to_parse = [pdf_file for pdf_file in cache_files if pdf_file not in parsed]
+    if to_parse:
+        parser = RobustDocumentParser()
+        with ThreadPoolExecutor(max_workers=min(MAX_PARSE_WORKERS, len(to_parse))) as executor:
+            futures = {executor.submit(parser.parse_file, pdf_file): pdf_file for pdf_file in to_parse}
+            for future in as_completed(futures):
+                pdf_file = futures[future]
+                try:
+                    parsed[pdf_file] = future.result()
+                except Exception as e:
+                    parsed[pdf_file] = e
+                    continue
+                
+                if use_cache:
+                    try:
+                        PARSE_CACHE_DIR.mkdir(exist_ok=True)
+                        with open(cache_files[pdf_file], 'wb') as f:
+                            pickle.dump(parsed[pdf_file], f)
+                    except Exception as e:
+                        logger.warning(f"Failed to cache parse of {pdf_file}: {e}")
+    
+    return {pdf_file: parsed[pdf_file] for pdf_file in cache_files}
+
+
+def _pdf_params(pdf_files):
+    """Parametrize over PDFs, skipping at collection those that are not present."""
+    return [pytest.param(pdf_file, marks=pytest.mark.skipif(not os.path.exists(pdf_file),
+                                                             reason=f"PDF file not found: {pdf_file}"))
+            for pdf_file in pdf_files]
+
+
+@pytest.fixture(scope="session")
+def precomputed_chunks():
+    """CHUNK_TEST_CONTENT split into chunks once per session."""
+    parser = RobustDocumentParser(min_chunk_tokens=50, max_chunk_tokens=200)
+    return parser._split_into_chunks(CHUNK_TEST_CONTENT, "test_file.txt")
+
+
+@pytest.fixture(scope="session")
+def parsed_pdfs(request):
+    """User PDFs parsed once per session; the on-disk cache is disabled with --no-embed-cache."""
+    return load_parsed_pdfs(PDF_FILES, use_cache=not request.config.getoption("--no-embed-cache", default=False))
+
+
+@pytest.fixture(scope="session")
+def embedding_generator(request):
+    """Embedding generator shared by all tests; its cache is disabled with --no-embed-cache."""
+    use_cache = not request.config.getoption("--no-embed-cache", default=False)
+    return RobustEmbeddingGenerator(use_cache=use_cache, cache_dir=str(EMBEDDING_CACHE_DIR))
+
+
+class TestDocumentParser:
+    """Test the robust document parser."""
+    
+    @pytest.mark.parametrize("pdf_file", _pdf_params(PDF_FILES))
+    def test_pdf_parsing(self, pdf_file, parsed_pdfs):
+        """Test PDF parsing of one user file."""
+        logger.info(f"Testing PDF parsing for: {pdf_file}")
+        
+        result = parsed_pdfs[pdf_file]
+        if isinstance(result, Exception):
+            raise result
         
-        # Print summary
-        logger.info("PDF Parsing Test Summary:")
-        successful = sum(1 for r in results.values() if r['status'] == 'success')
-        total = len(results)
+        # Validate result structure
+        assert isinstance(result, dict)
+        assert 'success' not in result or result['success']  # If success field exists, it should be True
+        assert 'raw_text' in result
+        assert 'chunks' in result
+        assert 'total_chunks' in result
+        assert 'metadata' in result
         
-        for pdf_file, result in results.items():
-            filename = Path(pdf_file).name
-            if result['status'] == 'success':
-                logger.info(f"  ✅ {filename}: {result['chunks']} chunks, {result['words']} words, quality={result['quality']:.2f}")
-            else:
-                logger.error(f"  ❌ {filename}: {result['error']}")
+        # Validate content quality
+        assert len(result['raw_text'].strip()) > 100, f"Text too short: {len(result['raw_text'])}"
+        assert result['total_chunks'] > 0, "No chunks created"
+        assert len(result['chunks']) == result['total_chunks'], "Chunk count mismatch"
         
-        logger.info(f"Success rate: {successful}/{total} files")
+        # Validate chunks
+        valid_chunks = [chunk for chunk in result['chunks'] if chunk.get('is_valid', True)]
+        assert len(valid_chunks) > 0, "No valid chunks"
         
-        # At least one file should parse successfully
-        assert successful > 0, f"All PDF parsing failed. Results: {results}"
+        # Check extraction quality
+        quality = result.get('extraction_quality', {})
+        if quality:
+            assert quality.get('alphabetic_ratio', 0) > 0.5, f"Poor text quality: {quality.get('alphabetic_ratio')}"
         
-        return results
+        logger.info(f"✅ Successfully parsed {Path(pdf_file).name}: {len(valid_chunks)} chunks, {result.get('total_words', 0)} words")
     
-    def test_chunk_validation(self, parser):
+    def test_chunk_validation(self, precomputed_chunks):
         """Test chunk validation and quality checks."""
-        # Create a simple test PDF or text file
-        test_content = """
-        This is a test document with multiple paragraphs.
-        
-        The first paragraph contains some business information about financial performance.
-        We need to ensure that this content is properly chunked and validated.
-        
-        The second paragraph discusses market trends and analysis.
-        This should create meaningful chunks that can be embedded and searched.
-        
-        The third paragraph covers operational efficiency and strategic planning.
-        All chunks should pass validation checks for quality and length.
-        """
-        
-        chunks = parser._split_into_chunks(test_content, "test_file.txt")
+        chunks = precomputed_chunks
         
         assert len(chunks) > 0, "No chunks created"
         
@@ -152,9 +218,9 @@ class TestEmbeddingGenerator:
     """Test the robust embedding generator."""
     
     @pytest.fixture
-    def generator(self):
-        """Create an embedding generator instance."""
-        return RobustEmbeddingGenerator(use_cache=False)  # Disable cache for tests
+    def generator(self, embedding_generator):
+        """Get the shared embedding generator instance."""
+        return embedding_generator
     
     def test_embedding_providers_initialization(self, generator):
         """Test that at least one embedding provider is available."""
@@ -189,7 +255,7 @@ class TestEmbeddingGenerator:
             for i, embedding in enumerate(embeddings):
                 assert isinstance(embedding, list), f"Embedding {i} is not a list"
                 assert len(embedding) == result['embedding_dimension'], f"Embedding {i} dimension mismatch"
-                assert all(isinstance(x, (int, float)) for x in embedding), f"Embedding {i} contains non-numeric values"
+                assert _valid_numeric(embedding), f"Embedding {i} contains non-numeric values"
             
             logger.info(f"✅ Generated {len(embeddings)} embeddings with dimension {result['embedding_dimension']}")
             
@@ -212,7 +278,7 @@ class TestEmbeddingGenerator:
             embedding = result['embedding']
             assert isinstance(embedding, list), "Query embedding is not a list"
             assert len(embedding) == result['embedding_dimension'], "Query embedding dimension mismatch"
-            assert all(isinstance(x, (int, float)) for x in embedding), "Query embedding contains non-numeric values"
+            assert _valid_numeric(embedding), "Query embedding contains non-numeric values"
             
             logger.info(f"✅ Generated query embedding with dimension {result['embedding_dimension']}")
             
@@ -220,6 +286,36 @@ class TestEmbeddingGenerator:
             logger.error(f"❌ Query embedding generation failed: {e}")
             raise
     
+    def test_query_embeddings_are_memoized(self, tmp_path, monkeypatch):
+        """Test that repeated queries are answered without another provider call."""
+        calls = []
+
+        def fake_gemini_embeddings(text_chunks, model, api_key=None):
+            calls.append(list(text_chunks))
+            return {'success': True, 'embeddings': [[float(len(t)), 1.0] for t in text_chunks],
+                    'embedding_dimension': 2, 'total_embeddings': len(text_chunks)}
+
+        local_generator = RobustEmbeddingGenerator(cache_dir=str(tmp_path))
+        local_generator.initialized_providers = {'gemini': None}
+        monkeypatch.setattr(local_generator, '_generate_gemini_embeddings', fake_gemini_embeddings)
+
+        first = local_generator.generate_query_embedding("What is the revenue?")
+        first['embedding'].append(0.0)
+        again = local_generator.generate_query_embedding("What is the revenue?")
+        batch = local_generator.generate_query_embeddings(["What is the revenue?", "Who is the auditor?"])
+
+        assert calls == [["What is the revenue?"], ["Who is the auditor?"]]
+        assert again['embedding'] == [20.0, 1.0]
+        assert batch['embeddings'] == [[20.0, 1.0], [19.0, 1.0]]
+        assert local_generator.stats['cache_hits'] == 2
+        assert first['cached'] is False
+        assert again['cached'] is True and again['processing_time_seconds'] == 0.0
+        assert batch['cached'] is False
+
+        cached_batch = local_generator.generate_query_embeddings(["Who is the auditor?"])
+        assert cached_batch['cached'] is True and cached_batch['processing_time_seconds'] == 0.0
+        assert len(calls) == 2
+
     def test_embedding_with_empty_input(self, generator):
         """Test error handling with empty input."""
         with pytest.raises(ValueError, match="text_chunks cannot be empty"):
@@ -230,6 +326,9 @@ class TestEmbeddingGenerator:
         
         with pytest.raises(ValueError, match="Query text cannot be empty"):
             generator.generate_query_embedding("")
+        
+        with pytest.raises(ValueError, match="Query text cannot be empty"):
+            generator.generate_query_embeddings(["What is the revenue?", "  "])
     
     def test_embedding_text_cleaning(self, generator):
         """Test text cleaning and validation."""
@@ -260,100 +359,59 @@ class TestEmbeddingGenerator:
 class TestIntegrationPipeline:
     """Test the complete document processing pipeline."""
     
-    def test_pdf_to_embeddings_pipeline(self):
-        """Test the complete pipeline from PDF to embeddings."""
-        pdf_files = [
-            r"e:\final try\bajaj.pdf",
-            r"e:\final try\hdf.pdf"  # Test with 2 files for speed
-        ]
+    @pytest.mark.parametrize("pdf_file", _pdf_params(PIPELINE_PDF_FILES))
+    def test_pdf_to_embeddings_pipeline(self, pdf_file, parsed_pdfs, embedding_generator):
+        """Test the complete pipeline from PDF to embeddings for one user file."""
+        generator = embedding_generator
         
-        parser = RobustDocumentParser(min_chunk_words=100, max_chunk_words=300)
-        generator = RobustEmbeddingGenerator(use_cache=False)
+        logger.info(f"Testing complete pipeline for: {Path(pdf_file).name}")
         
-        pipeline_results = {}
+        # Step 1: Parse document
+        logger.info("  Step 1: Parsing document...")
+        parse_result = parsed_pdfs[pdf_file]
+        if isinstance(parse_result, Exception):
+            raise parse_result
         
-        for pdf_file in pdf_files:
-            if not Path(pdf_file).exists():
-                logger.warning(f"PDF file not found: {pdf_file}")
-                continue
-            
-            logger.info(f"Testing complete pipeline for: {Path(pdf_file).name}")
-            
-            try:
-                # Step 1: Parse document
-                logger.info("  Step 1: Parsing document...")
-                parse_result = parser.parse_file(pdf_file)
-                
-                assert parse_result['total_chunks'] > 0, "No chunks created"
-                
-                # Extract text chunks
-                text_chunks = [chunk['text'] for chunk in parse_result['chunks'] if chunk.get('is_valid', True)]
-                assert len(text_chunks) > 0, "No valid text chunks"
-                
-                logger.info(f"    ✅ Parsed into {len(text_chunks)} valid chunks")
-                
-                # Step 2: Generate embeddings
-                logger.info("  Step 2: Generating embeddings...")
-                embed_result = generator.generate_embeddings(text_chunks[:5])  # Limit to 5 chunks for testing
-                
-                assert embed_result.get('success', False), "Embedding generation failed"
-                assert len(embed_result['embeddings']) > 0, "No embeddings generated"
-                
-                logger.info(f"    ✅ Generated {len(embed_result['embeddings'])} embeddings")
-                
-                # Step 3: Validate embedding quality
-                logger.info("  Step 3: Validating embeddings...")
-                embeddings = embed_result['embeddings']
-                embedding_dim = embed_result['embedding_dimension']
-                
-                for i, embedding in enumerate(embeddings):
-                    assert len(embedding) == embedding_dim, f"Embedding {i} dimension mismatch"
-                    assert all(isinstance(x, (int, float)) for x in embedding), f"Embedding {i} contains non-numeric values"
-                    
-                    # Check for zero vectors (might indicate issues)
-                    if all(x == 0 for x in embedding):
-                        logger.warning(f"Embedding {i} is a zero vector")
-                
-                logger.info(f"    ✅ All embeddings validated (dimension: {embedding_dim})")
-                
-                pipeline_results[pdf_file] = {
-                    'status': 'success',
-                    'parse_chunks': len(text_chunks),
-                    'embeddings_generated': len(embeddings),
-                    'embedding_dimension': embedding_dim,
-                    'parse_time': parse_result.get('parse_duration_seconds', 0),
-                    'embed_time': embed_result.get('processing_time_seconds', 0)
-                }
-                
-                logger.info(f"  ✅ Pipeline complete for {Path(pdf_file).name}")
-                
-            except Exception as e:
-                logger.error(f"  ❌ Pipeline failed for {pdf_file}: {e}")
-                pipeline_results[pdf_file] = {
-                    'status': 'failed',
-                    'error': str(e)
-                }
-                continue
+        assert parse_result['total_chunks'] > 0, "No chunks created"
+        
+        # Extract text chunks
+        # Only the first valid chunks are embedded, so stop collecting texts there
+        valid_chunks = sum(1 for chunk in parse_result['chunks'] if chunk.get('is_valid', True))
+        text_chunks = list(islice(
+            (chunk['text'] for chunk in parse_result['chunks'] if chunk.get('is_valid', True)), 5))  # Limit to 5 chunks for testing
+        assert len(text_chunks) > 0, "No valid text chunks"
+        
+        logger.info(f"    ✅ Parsed into {valid_chunks} valid chunks")
         
-        # Summary
-        logger.info("Integration Pipeline Test Summary:")
-        successful = sum(1 for r in pipeline_results.values() if r['status'] == 'success')
-        total = len(pipeline_results)
+        # Step 2: Generate embeddings
+        logger.info("  Step 2: Generating embeddings...")
+        embed_result = generator.generate_embeddings(text_chunks)
         
-        for pdf_file, result in pipeline_results.items():
-            filename = Path(pdf_file).name
-            if result['status'] == 'success':
-                logger.info(f"  ✅ {filename}: {result['parse_chunks']} chunks → {result['embeddings_generated']} embeddings")
-            else:
-                logger.error(f"  ❌ {filename}: {result['error']}")
+        assert embed_result.get('success', False), "Embedding generation failed"
+        assert len(embed_result['embeddings']) > 0, "No embeddings generated"
         
-        assert successful > 0, f"All pipeline tests failed. Results: {pipeline_results}"
+        logger.info(f"    ✅ Generated {len(embed_result['embeddings'])} embeddings")
         
-        return pipeline_results
+        # Step 3: Validate embedding quality
+        logger.info("  Step 3: Validating embeddings...")
+        embeddings = embed_result['embeddings']
+        embedding_dim = embed_result['embedding_dimension']
+        
+        for i, embedding in enumerate(embeddings):
+            assert len(embedding) == embedding_dim, f"Embedding {i} dimension mismatch"
+            values = np.asarray(embedding)  # converted once for both checks
+            assert _valid_numeric(values), f"Embedding {i} contains non-numeric values"
+            
+            # Check for zero vectors (might indicate issues)
+            if not values.any():
+                logger.warning(f"Embedding {i} is a zero vector")
+        
+        logger.info(f"    ✅ All embeddings validated (dimension: {embedding_dim})")
+        logger.info(f"  ✅ Pipeline complete for {Path(pdf_file).name}: {valid_chunks} chunks → {len(embeddings)} embeddings")
     
-    def test_query_embedding_similarity(self):
+    def test_query_embedding_similarity(self, embedding_generator):
         """Test that similar queries produce similar embeddings."""
-        generator = RobustEmbeddingGenerator(use_cache=False)
+        generator = embedding_generator
         
         # Test with similar queries
         queries = [
@@ -365,22 +423,20 @@ class TestIntegrationPipeline:
         ]
         
         try:
-            embeddings = []
-            for query in queries:
-                result = generator.generate_query_embedding(query)
-                embeddings.append(result['embedding'])
+            # All queries are embedded in one request
+            embeddings = generator.generate_query_embeddings(queries)['embeddings']
             
-            # Calculate basic similarity (dot product)
-            def cosine_similarity(a, b):
-                dot_product = sum(x * y for x, y in zip(a, b))
-                norm_a = sum(x * x for x in a) ** 0.5
-                norm_b = sum(x * x for x in b) ** 0.5
-                return dot_product / (norm_a * norm_b) if norm_a * norm_b > 0 else 0
+            # Cosine similarity matrix of all queries in one matrix product
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors /= norms
+            similarity = vectors @ vectors.T
             
             # Similar financial queries should be more similar to each other
-            fin_sim = cosine_similarity(embeddings[0], embeddings[1])  # Financial queries
-            revenue_sim = cosine_similarity(embeddings[2], embeddings[3])  # Revenue queries
-            dissimilar_sim = cosine_similarity(embeddings[0], embeddings[4])  # Financial vs Weather
+            fin_sim = similarity[0, 1]  # Financial queries
+            revenue_sim = similarity[2, 3]  # Revenue queries
+            dissimilar_sim = similarity[0, 4]  # Financial vs Weather
             
             logger.info(f"Financial query similarity: {fin_sim:.3f}")
             logger.info(f"Revenue query similarity: {revenue_sim:.3f}")
@@ -397,113 +453,19 @@ class TestIntegrationPipeline:
             raise
 
 
-def run_comprehensive_tests():
-    """Run all tests and provide a summary."""
-    logger.info("="*80)
-    logger.info("STARTING COMPREHENSIVE AI Q&A SYSTEM TESTS")
-    logger.info("="*80)
-    
-    test_results = {
-        'pdf_parsing': None,
-        'embedding_generation': None,
-        'integration_pipeline': None,
-        'query_similarity': None
-    }
-    
-    # Test 1: PDF Parsing
-    logger.info("\n" + "="*50)
-    logger.info("TEST 1: PDF PARSING")
-    logger.info("="*50)
-    try:
-        parser_test = TestDocumentParser()
-        parser = RobustDocumentParser()
-        pdf_results = parser_test.test_pdf_parsing_all_files(parser)
-        test_results['pdf_parsing'] = {'status': 'passed', 'results': pdf_results}
-        logger.info("✅ PDF Parsing tests PASSED")
-    except Exception as e:
-        test_results['pdf_parsing'] = {'status': 'failed', 'error': str(e)}
-        logger.error(f"❌ PDF Parsing tests FAILED: {e}")
+def run_comprehensive_tests(*pytest_args: str) -> int:
+    """
+    Run this module's tests through pytest, so the script shares the session fixtures and reporting of CI runs.
     
-    # Test 2: Embedding Generation
-    logger.info("\n" + "="*50)
-    logger.info("TEST 2: EMBEDDING GENERATION")
-    logger.info("="*50)
-    try:
-        embed_test = TestEmbeddingGenerator()
-        generator = RobustEmbeddingGenerator()
-        embed_test.test_embedding_providers_initialization(generator)
-        embed_test.test_embedding_generation_basic(generator)
-        embed_test.test_query_embedding_generation(generator)
-        test_results['embedding_generation'] = {'status': 'passed'}
-        logger.info("✅ Embedding Generation tests PASSED")
-    except Exception as e:
-        test_results['embedding_generation'] = {'status': 'failed', 'error': str(e)}
-        logger.error(f"❌ Embedding Generation tests FAILED: {e}")
-    
-    # Test 3: Integration Pipeline
-    logger.info("\n" + "="*50)
-    logger.info("TEST 3: INTEGRATION PIPELINE")
-    logger.info("="*50)
-    try:
-        pipeline_test = TestIntegrationPipeline()
-        pipeline_results = pipeline_test.test_pdf_to_embeddings_pipeline()
-        test_results['integration_pipeline'] = {'status': 'passed', 'results': pipeline_results}
-        logger.info("✅ Integration Pipeline tests PASSED")
-    except Exception as e:
-        test_results['integration_pipeline'] = {'status': 'failed', 'error': str(e)}
-        logger.error(f"❌ Integration Pipeline tests FAILED: {e}")
-    
-    # Test 4: Query Similarity
-    logger.info("\n" + "="*50)
-    logger.info("TEST 4: QUERY SIMILARITY")
-    logger.info("="*50)
-    try:
-        pipeline_test = TestIntegrationPipeline()
-        pipeline_test.test_query_embedding_similarity()
-        test_results['query_similarity'] = {'status': 'passed'}
-        logger.info("✅ Query Similarity tests PASSED")
-    except Exception as e:
-        test_results['query_similarity'] = {'status': 'failed', 'error': str(e)}
-        logger.error(f"❌ Query Similarity tests FAILED: {e}")
-    
-    # Final Summary
-    logger.info("\n" + "="*80)
-    logger.info("TEST SUMMARY")
-    logger.info("="*80)
-    
-    passed_tests = sum(1 for result in test_results.values() if result and result['status'] == 'passed')
-    total_tests = len(test_results)
-    
-    for test_name, result in test_results.items():
-        if result:
-            status_icon = "✅" if result['status'] == 'passed' else "❌"
-            logger.info(f"{status_icon} {test_name.replace('_', ' ').title()}: {result['status'].upper()}")
-            if result['status'] == 'failed':
-                logger.info(f"    Error: {result['error']}")
-        else:
-            logger.info(f"⚠️  {test_name.replace('_', ' ').title()}: NOT RUN")
-    
-    logger.info(f"\nOverall Success Rate: {passed_tests}/{total_tests} tests passed")
-    
-    if passed_tests == total_tests:
-        logger.info("🎉 ALL TESTS PASSED - AI Q&A System is ready for production!")
-    elif passed_tests >= total_tests * 0.75:
-        logger.info("⚠️  MOSTLY PASSING - Minor issues need attention")
-    else:
-        logger.info("❌ SIGNIFICANT ISSUES - Major fixes required")
-    
-    return test_results
+    Args:
+        pytest_args: Extra pytest arguments (e.g. --lf, --no-embed-cache)
+        
+    Returns:
+        pytest exit code
+    """
+    return pytest.main([__file__, "-v", "--tb=short", *pytest_args])
 
 
 if __name__ == "__main__":
-    # Run comprehensive tests
-    results = run_comprehensive_tests()
-    
-    # Exit with appropriate code
-    passed_count = sum(1 for r in results.values() if r and r['status'] == 'passed')
-    total_count = len(results)
-    
-    if passed_count == total_count:
-        sys.exit(0)  # All tests passed
-    else:
-        sys.exit(1)  # Some tests failed
+    # Run comprehensive tests, passing extra command-line arguments on to pytest
+    sys.exit(run_comprehensive_tests(*sys.argv[1:]))
@@ -5,10 +5,15 @@ This file contains pytest configuration, shared fixtures, and utilities
 that are used across multiple test modules.
 """
 
+import copy
+import re
+import logging
 import pytest
-import tempfile
 import os
-import shutil
+import numpy as np
+from types import MappingProxyType, SimpleNamespace
+from functools import lru_cache
+from collections.abc import Mapping
 from pathlib import Path
 from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
@@ -16,10 +21,28 @@ from fastapi.testclient import TestClient
 # Import the FastAPI app
 from main import app
 
+# Successful Gemini response; mock_gemini_api hands each caller its own deep copy
+GEMINI_MOCK_RESPONSE = {
+    "candidates": [{
+        "content": {
+            "parts": [{
+                "text": '{"answer": "Mock answer", "rationale": "Mock rationale", "source_chunks": ["Mock source"]}'
+            }]
+        },
+        "finishReason": "STOP"
+    }],
+    "usageMetadata": {"totalTokenCount": 100}
+}
+
 # =============================================================================
 # PYTEST CONFIGURATION
 # =============================================================================
 
+def pytest_addoption(parser):
+    """Add command line options for the test suite"""
+    parser.addoption("--no-embed-cache", action="store_true", default=False,
+                     help="Disable the persistent embedding and parsed-PDF caches to measure cold runs")
+
 def pytest_configure(config):
     """Configure pytest with custom settings"""
     # Add custom markers
@@ -55,11 +78,10 @@ def test_client():
         yield client
 
 @pytest.fixture(scope="function")
-def temp_directory():
-    """Create a temporary directory for each test function"""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir, ignore_errors=True)
+def temp_directory(tmp_path_factory, request):
+    """Create a temporary directory for each test function under the session's temp root (pytest prunes old roots)"""
+    name = re.sub(r"\W", "_", request.node.name)[:30]
+    return str(tmp_path_factory.mktemp(name, numbered=True))
 
 @pytest.fixture(scope="function")
 def mock_gemini_api():
@@ -73,25 +95,25 @@ def mock_gemini_api():
         # Default successful response
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "candidates": [{
-                "content": {
-                    "parts": [{
-                        "text": '{"answer": "Mock answer", "rationale": "Mock rationale", "source_chunks": ["Mock source"]}'
-                    }]
-                },
-                "finishReason": "STOP"
-            }],
-            "usageMetadata": {"totalTokenCount": 100}
-        }
+        mock_response.json = lambda: copy.deepcopy(GEMINI_MOCK_RESPONSE)
         mock_instance.post.return_value = mock_response
         
         yield mock_client
 
-@pytest.fixture(scope="function")
+def _read_only(value):
+    """Recursively freeze test data: dicts become mapping proxies, lists tuples, arrays non-writeable"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_read_only(item) for item in value)
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    return value
+
+@pytest.fixture(scope="session")
 def mock_document_content():
-    """Provide sample document content for testing"""
-    return {
+    """Provide sample document content for testing (read-only, shared by the session)"""
+    return _read_only({
         "pdf": {
             "success": True,
             "content": "Sample PDF content about machine learning and AI applications.",
@@ -110,23 +132,24 @@ def mock_document_content():
             "pages": 1,
             "metadata": {"filename": "sample.txt"}
         }
-    }
+    })
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_embeddings():
-    """Provide sample embedding vectors for testing"""
+    """Provide sample embedding vectors (float32 arrays) for testing (read-only, shared by the session)"""
     embedding_dim = 1280
-    return {
-        "query": [0.1 + i * 0.001 for i in range(embedding_dim)],
-        "chunk1": [0.2 + i * 0.001 for i in range(embedding_dim)],
-        "chunk2": [0.3 + i * 0.001 for i in range(embedding_dim)],
-        "chunk3": [0.4 + i * 0.001 for i in range(embedding_dim)]
-    }
+    base = np.arange(embedding_dim, dtype=np.float32) * np.float32(0.001)
+    return _read_only({
+        "query": base + np.float32(0.1),
+        "chunk1": base + np.float32(0.2),
+        "chunk2": base + np.float32(0.3),
+        "chunk3": base + np.float32(0.4)
+    })
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_chunks():
-    """Provide sample text chunks for testing"""
-    return [
+    """Provide sample text chunks for testing (read-only, shared by the session)"""
+    return _read_only([
         {
             "content": "Machine learning is a subset of artificial intelligence that enables systems to learn from data.",
             "metadata": {"filename": "ml_guide.pdf", "page": 1, "chunk_id": "chunk_1"}
@@ -139,62 +162,66 @@ def sample_chunks():
             "content": "Natural language processing enables computers to understand and generate human language.",
             "metadata": {"filename": "nlp_guide.pdf", "page": 3, "chunk_id": "chunk_3"}
         }
-    ]
+    ])
 
 # =============================================================================
 # TEST UTILITIES
 # =============================================================================
 
+DEFAULT_PDF_CONTENT = "Test PDF content for document processing pipeline testing."
+DEFAULT_TXT_CONTENT = """
+            Test Document for AI Q&A System
+            
+            This is a comprehensive test document that contains multiple paragraphs
+            of text to verify the document processing pipeline functionality.
+            
+            The document includes information about machine learning, artificial
+            intelligence, and natural language processing to test the question
+            answering capabilities of the system.
+            
+            Key topics covered:
+            1. Machine learning algorithms and applications
+            2. Deep learning neural network architectures  
+            3. Natural language processing techniques
+            4. AI ethics and responsible deployment
+            """
+
+@lru_cache(maxsize=None)
+def _pdf_bytes(content: str) -> bytes:
+    """Bytes of a test PDF file, built once per content"""
+    return f"%PDF-1.4\n{content}".encode("utf-8")
+
+# Minimal test DOCX file: the ZIP signature only, content is not embedded
+DOCX_SIGNATURE = b"PK\x03\x04"
+
+@lru_cache(maxsize=None)
+def _txt_bytes(content: str) -> bytes:
+    """Bytes of a test text file, built once per content"""
+    return content.encode("utf-8")
+
 class TestDataGenerator:
     """Utility class for generating test data"""
     
     @staticmethod
     def create_test_pdf_file(temp_dir: str, content: str = None) -> str:
         """Create a test PDF file"""
-        if content is None:
-            content = "Test PDF content for document processing pipeline testing."
-        
         pdf_path = os.path.join(temp_dir, "test_document.pdf")
-        with open(pdf_path, "w") as f:
-            f.write(f"%PDF-1.4\n{content}")
+        Path(pdf_path).write_bytes(_pdf_bytes(DEFAULT_PDF_CONTENT if content is None else content))
         return pdf_path
     
     @staticmethod
     def create_test_docx_file(temp_dir: str, content: str = None) -> str:
         """Create a test DOCX file"""
-        if content is None:
-            content = "Test DOCX content for document processing pipeline testing."
-        
         docx_path = os.path.join(temp_dir, "test_document.docx")
         # Create minimal DOCX structure (ZIP file)
-        with open(docx_path, "wb") as f:
-            f.write(b"PK\x03\x04")  # ZIP signature
+        Path(docx_path).write_bytes(DOCX_SIGNATURE)
         return docx_path
     
     @staticmethod
     def create_test_txt_file(temp_dir: str, content: str = None) -> str:
         """Create a test text file"""
-        if content is None:
-            content = """
-            Test Document for AI Q&A System
-            
-            This is a comprehensive test document that contains multiple paragraphs
-            of text to verify the document processing pipeline functionality.
-            
-            The document includes information about machine learning, artificial
-            intelligence, and natural language processing to test the question
-            answering capabilities of the system.
-            
-            Key topics covered:
-            1. Machine learning algorithms and applications
-            2. Deep learning neural network architectures  
-            3. Natural language processing techniques
-            4. AI ethics and responsible deployment
-            """
-        
         txt_path = os.path.join(temp_dir, "test_document.txt")
-        with open(txt_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        Path(txt_path).write_bytes(_txt_bytes(DEFAULT_TXT_CONTENT if content is None else content))
         return txt_path
 
 # =============================================================================
@@ -202,19 +229,24 @@ class TestDataGenerator:
 # =============================================================================
 
 def assert_valid_embedding(embedding, expected_dim=1280):
-    """Assert that an embedding vector is valid"""
-    assert isinstance(embedding, list)
-    assert len(embedding) == expected_dim
-    assert all(isinstance(val, (int, float)) for val in embedding)
+    """Assert that an embedding vector (list or array) is valid"""
+    assert isinstance(embedding, (list, np.ndarray))
+    values = np.asarray(embedding)
+    assert values.shape == (expected_dim,)
+    assert values.dtype.kind in 'fi'
+    assert np.isfinite(values).all()
 
 def assert_valid_chunk(chunk):
     """Assert that a document chunk has valid structure"""
-    assert isinstance(chunk, dict)
+    assert isinstance(chunk, Mapping)
     assert "content" in chunk
     assert "metadata" in chunk
     assert isinstance(chunk["content"], str)
     assert len(chunk["content"].strip()) > 0
-    assert isinstance(chunk["metadata"], dict)
+    assert isinstance(chunk["metadata"], Mapping)
+
+# Fields every AI answer response carries
+AI_ANSWER_FIELDS = frozenset(("success", "answer", "rationale", "source_chunks"))
 
 def assert_valid_api_response(response, expected_fields=None):
     """Assert that an API response has valid structure"""
@@ -222,13 +254,11 @@ def assert_valid_api_response(response, expected_fields=None):
         expected_fields = ["success"]
     
     assert isinstance(response, dict)
-    for field in expected_fields:
-        assert field in response
+    assert set(expected_fields).issubset(response), f"Missing fields: {set(expected_fields) - response.keys()}"
 
 def assert_valid_ai_answer(answer_response):
     """Assert that an AI answer response has valid structure"""
-    required_fields = ["success", "answer", "rationale", "source_chunks"]
-    assert_valid_api_response(answer_response, required_fields)
+    assert_valid_api_response(answer_response, AI_ANSWER_FIELDS)
     
     if answer_response["success"]:
         assert isinstance(answer_response["answer"], str)
@@ -262,18 +292,18 @@ class MockHelpers:
     
     @staticmethod
     def mock_vector_search_results(num_results=3):
-        """Create mock vector search results"""
-        results = []
-        for i in range(num_results):
-            result = Mock()
-            result.page_content = f"Mock search result content {i+1}"
-            result.metadata = {
-                "filename": f"document_{i+1}.pdf",
-                "page": i+1,
-                "similarity_score": 0.9 - (i * 0.1)
-            }
-            results.append(result)
-        return results
+        """Create mock vector search results (plain namespaces with page_content and metadata)"""
+        return [
+            SimpleNamespace(
+                page_content=f"Mock search result content {i+1}",
+                metadata={
+                    "filename": f"document_{i+1}.pdf",
+                    "page": i+1,
+                    "similarity_score": 0.9 - (i * 0.1)
+                }
+            )
+            for i in range(num_results)
+        ]
 
 # =============================================================================
 # TEST ENVIRONMENT SETUP
@@ -284,23 +314,19 @@ def setup_test_environment():
     """Setup and teardown test environment for the entire test session"""
     print("🔧 Setting up comprehensive test environment...")
     
-    # Create necessary directories
-    test_dirs = ["temp_test_files", "test_outputs", "coverage_reports"]
-    for dir_name in test_dirs:
-        os.makedirs(dir_name, exist_ok=True)
-    
     # Set environment variables for testing
     os.environ["TESTING"] = "true"
-    os.environ["LOG_LEVEL"] = "DEBUG"
+    
+    # Record debug logs (e.g. the conversational QA turn details) for failing tests
+    root_logger = logging.getLogger()
+    previous_level = root_logger.level
+    root_logger.setLevel(logging.DEBUG)
     
     yield
     
     # Cleanup after all tests
     print("🧹 Cleaning up test environment...")
-    for dir_name in test_dirs:
-        if os.path.exists(dir_name):
-            shutil.rmtree(dir_name, ignore_errors=True)
     
-    # Clean up environment variables
+    # Clean up environment variables and logging
     os.environ.pop("TESTING", None)
-    os.environ.pop("LOG_LEVEL", None)
+    root_logger.setLevel(previous_level)
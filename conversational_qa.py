@@ -2,10 +2,17 @@
 """Enhanced AI Q&A system with conversation memory and query history"""
 
 import os
+import re
 import sys
+import time
 import asyncio
+import heapq
+import logging
 import json
+import numpy as np
+from collections import OrderedDict, deque
 from datetime import datetime
+from operator import itemgetter
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 
@@ -19,6 +26,30 @@ from gemini_answer import get_gemini_answer_async
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Patient details picked out of earlier queries
+AGE_PATTERN = re.compile(r'age[d]?\s*(\d+)')
+PROCEDURES = ('cataract surgery', 'bypass', 'angioplasty', 'dialysis')
+
+# Most recent questions kept in the extracted conversation context
+PREVIOUS_QUESTIONS_KEPT = 64
+
+# Search strings whose embeddings are kept across turns
+EMBED_CACHE_SIZE = 256
+
+# Indexed documents persist here, keyed by file name and modification time
+INDEX_CACHE_DIR = "index_cache"
+
+# Follow-up types with the words and multi-word phrases that signal them, in priority order
+WORD_PATTERN = re.compile(r'[a-z]+')
+FOLLOW_UP_CUES = (
+    ('reference_followup', frozenset({'that', 'this', 'it'}), ('what about', 'how about')),
+    ('clarification', frozenset({'explain', 'clarify', 'elaborate'}), ('more details',)),
+    ('additional_info', frozenset({'also', 'additionally', 'furthermore'}), ('what else',)),
+    ('comparison', frozenset({'compare', 'difference', 'vs', 'versus', 'better'}), ()),
+)
+
 class ConversationalQA:
     """AI Q&A system with conversation memory and context awareness"""
     
@@ -32,12 +63,30 @@ class ConversationalQA:
         self.session_context = {}
         self.patient_profile = {}
         
+        # Context extracted from the first _context_entries history entries
+        self._reset_context()
+        
+        # Patient details last added to a follow-up search
+        self._last_patient_info: Optional[frozenset] = None
+        
+        # Search string -> embedding, least recently used first
+        self._embed_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        
     async def initialize_document(self, pdf_path: str = 'bajaj.pdf'):
         """Initialize the vector store with insurance document"""
         if self.vector_store is None:
-            print("🔄 Initializing document database...")
+            logger.info("🔄 Initializing document database...")
             self.vector_store = FAISSVectorStore(dimension=768)
             
+            # Reuse the index built for this version of the document, if any
+            cache_path = os.path.join(INDEX_CACHE_DIR, f"{os.path.basename(pdf_path)}_{os.stat(pdf_path).st_mtime_ns}")
+            if os.path.exists(f"{cache_path}.faiss") and os.path.exists(f"{cache_path}_metadata.json"):
+                try:
+                    self.vector_store.load(cache_path, mmap=True)
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to load cached index {cache_path}: {e}")
+                    self.vector_store = FAISSVectorStore(dimension=768)
+            
             # Check if document needs processing
             if not hasattr(self.vector_store, 'next_id') or self.vector_store.next_id == 0:
                 # Process document
@@ -52,58 +101,83 @@ class ConversationalQA:
                     chunk_texts = [chunk.get("text") for chunk in embedded_result.get("chunks", [])]
                     
                     self.vector_store.add_document_embeddings(embeddings, pdf_path, ".pdf", chunk_texts)
-                    print("✅ Document processed and indexed")
+                    logger.info("✅ Document processed and indexed")
+                    
+                    try:
+                        os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+                        self.vector_store.save(cache_path)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Failed to cache index: {e}")
                 else:
-                    print("❌ Failed to process document")
+                    logger.error("❌ Failed to process document")
             else:
-                print("✅ Using existing document index")
+                logger.info("✅ Using existing document index")
     
     def extract_context_from_history(self) -> Dict[str, Any]:
         """Extract relevant context from conversation history"""
-        context = {
+        # Only entries appended since the last call are scanned; a shortened (e.g. cleared) history starts over
+        if len(self.conversation_history) < self._context_entries:
+            self._reset_context()
+        for entry in self.conversation_history[self._context_entries:]:
+            self._update_context(entry)
+        self._context_entries = len(self.conversation_history)
+        
+        return {
+            'patient_info': dict(self._context['patient_info']),
+            'previous_questions': list(self._context['previous_questions']),
+            'established_facts': list(self._context['established_facts']),
+            'ongoing_topic': self._context['ongoing_topic']
+        }
+    
+    def _reset_context(self):
+        """Start the incrementally extracted conversation context afresh"""
+        self._context = {
             'patient_info': {},
-            'previous_questions': [],
-            'established_facts': [],
+            'previous_questions': deque(maxlen=PREVIOUS_QUESTIONS_KEPT),
+            'established_facts': {},  # Ordered set of fact names
             'ongoing_topic': None
         }
-        
-        # Extract patient information from history
-        for entry in self.conversation_history:
-            query = entry['query'].lower()
-            
-            # Extract age
-            if 'age' in query and not context['patient_info'].get('age'):
-                import re
-                age_match = re.search(r'age[d]?\s*(\d+)', query)
-                if age_match:
-                    context['patient_info']['age'] = age_match.group(1)
-            
-            # Extract gender
-            if 'female' in query and not context['patient_info'].get('gender'):
-                context['patient_info']['gender'] = 'female'
-            elif 'male' in query and not context['patient_info'].get('gender'):
-                context['patient_info']['gender'] = 'male'
-            
-            # Extract procedure
-            procedures = ['cataract surgery', 'bypass', 'angioplasty', 'dialysis']
-            for proc in procedures:
-                if proc in query and not context['patient_info'].get('procedure'):
-                    context['patient_info']['procedure'] = proc
-            
-            # Store previous questions
-            context['previous_questions'].append(entry['query'][:100])
-            
-            # Extract established facts from answers
-            if entry.get('answer'):
-                answer = entry['answer'].lower()
-                if 'eligible' in answer:
-                    context['established_facts'].append('eligibility_discussed')
-                if 'covered' in answer:
-                    context['established_facts'].append('coverage_discussed')
-                if 'payout' in answer or 'amount' in answer:
-                    context['established_facts'].append('payout_discussed')
-        
-        return context
+        self._context_entries = 0
+    
+    def _update_context(self, entry: Dict[str, Any]):
+        """Fold one conversation entry into the extracted context"""
+        context = self._context
+        patient_info = context['patient_info']
+        query = entry['query'].lower()
+        tokens = set(WORD_PATTERN.findall(query))
+        
+        # Extract age
+        if not patient_info.get('age') and not tokens.isdisjoint(('age', 'aged')):
+            age_match = AGE_PATTERN.search(query)
+            if age_match:
+                patient_info['age'] = age_match.group(1)
+        
+        # Extract gender
+        if not patient_info.get('gender'):
+            if 'female' in tokens:
+                patient_info['gender'] = 'female'
+            elif 'male' in tokens:
+                patient_info['gender'] = 'male'
+        
+        # Extract procedure (first listed match)
+        if not patient_info.get('procedure'):
+            for proc in PROCEDURES:
+                if proc in query:
+                    patient_info['procedure'] = proc
+                    break
+        
+        # Store previous questions
+        context['previous_questions'].append(entry['query'][:100])
+        
+        # Extract established facts from answers
+        if entry.get('answer'):
+            answer = entry['answer'].lower()
+            if 'eligible' in answer:
+                context['established_facts']['eligibility_discussed'] = None
+            if 'covered' in answer:
+                context['established_facts']['coverage_discussed'] = None
+            if 'payout' in answer or 'amount' in answer:
+                context['established_facts']['payout_discussed'] = None
     
     def create_contextual_query(self, current_query: str, context: Dict[str, Any]) -> str:
         """Enhance current query with conversation context"""
@@ -149,32 +223,41 @@ Please provide an answer that:
     def detect_follow_up_type(self, query: str, context: Dict[str, Any]) -> str:
         """Detect what type of follow-up question this is"""
         query_lower = query.lower()
+        tokens = set(WORD_PATTERN.findall(query_lower))
         
-        # Reference to previous answer
-        if any(word in query_lower for word in ['that', 'this', 'it', 'what about', 'how about']):
-            return 'reference_followup'
-        
-        # Clarification request
-        if any(word in query_lower for word in ['explain', 'clarify', 'more details', 'elaborate']):
-            return 'clarification'
-        
-        # Additional information
-        if any(word in query_lower for word in ['also', 'additionally', 'furthermore', 'what else']):
-            return 'additional_info'
-        
-        # Comparison question
-        if any(word in query_lower for word in ['compare', 'difference', 'vs', 'versus', 'better']):
-            return 'comparison'
+        # First matching category wins: reference, clarification, additional info, comparison
+        for followup_type, words, phrases in FOLLOW_UP_CUES:
+            if not tokens.isdisjoint(words) or any(phrase in query_lower for phrase in phrases):
+                return followup_type
         
         # New topic
         return 'new_topic'
     
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed search queries, sending only those not embedded in earlier turns in one request"""
+        misses = list(dict.fromkeys(q for q in queries if q not in self._embed_cache))
+        
+        if misses:
+            embed_result = await self.embedder.generate_embeddings(misses)
+            if embed_result.get('success'):
+                for search_query, embedding in zip(misses, embed_result.get('embeddings', [])):
+                    self._embed_cache[search_query] = embedding
+                    if len(self._embed_cache) > EMBED_CACHE_SIZE:
+                        self._embed_cache.popitem(last=False)
+        
+        embeddings = []
+        for search_query in queries:
+            if search_query in self._embed_cache:
+                self._embed_cache.move_to_end(search_query)
+                embeddings.append(self._embed_cache[search_query])
+        return embeddings
+    
     async def ask_with_context(self, query: str) -> Dict[str, Any]:
         """Ask a question with full conversation context"""
         
-        print(f"🤖 CONVERSATIONAL AI Q&A")
-        print("=" * 60)
-        print(f"📝 Current Query: {query}")
+        logger.debug("🤖 CONVERSATIONAL AI Q&A")
+        logger.debug("=" * 60)
+        logger.debug(f"📝 Current Query: {query}")
         
         # Initialize document if needed
         await self.initialize_document()
@@ -184,14 +267,14 @@ Please provide an answer that:
         
         # Detect follow-up type
         followup_type = self.detect_follow_up_type(query, context)
-        print(f"🔍 Query Type: {followup_type.replace('_', ' ').title()}")
+        logger.debug(f"🔍 Query Type: {followup_type.replace('_', ' ').title()}")
         
         # Show conversation context
         if context['patient_info']:
-            print(f"👤 Patient Profile: {context['patient_info']}")
+            logger.debug(f"👤 Patient Profile: {context['patient_info']}")
         
         if self.conversation_history:
-            print(f"💭 Previous Questions: {len(self.conversation_history)}")
+            logger.debug(f"💭 Previous Questions: {len(self.conversation_history)}")
         
         # Create contextual query
         contextual_query = self.create_contextual_query(query, context)
@@ -201,49 +284,50 @@ Please provide an answer that:
         if followup_type in ['reference_followup', 'clarification', 'additional_info']:
             # Add context-enhanced query
             search_queries.append(contextual_query)
-            # Also search with patient context
-            if context['patient_info']:
+            # Also search with patient context, when it changed since the last turn that used it
+            patient_key = frozenset(context['patient_info'].items())
+            if context['patient_info'] and patient_key != self._last_patient_info:
                 patient_context_query = f"{query} " + " ".join([f"{k} {v}" for k, v in context['patient_info'].items()])
                 search_queries.append(patient_context_query)
+                self._last_patient_info = patient_key
+        
+        # Search for relevant information, keeping each chunk's best score across queries
+        best_scores: Dict[str, float] = {}
         
-        # Search for relevant information
-        all_relevant_chunks = []
-        unique_chunks = set()
+        # Embed the search queries in one request (repeats come from the cache) and search them in one index call
+        query_embeddings = await self.embed_queries(search_queries)
         
-        for search_query in search_queries:
-            embed_result = await self.embedder.generate_embeddings([search_query])
+        if query_embeddings:
+            query_matrix = np.asarray(query_embeddings, dtype=np.float32)
+            indices, scores = self.vector_store.batch_similarity_search(query_matrix, 10)  # Extra candidates, as similarity_search
             
-            if embed_result.get('success'):
-                query_embedding = embed_result.get('embeddings', [])[0]
-                search_results = self.vector_store.similarity_search(query_embedding, k=5)
+            for row_indices, row_scores in zip(indices, scores):
+                search_results = self.vector_store.collect_results(row_indices, row_scores, k=5)
                 
                 for result in search_results:
                     text = result.get('text', '')
                     score = result.get('score', 0)
-                    text_id = text[:100]
+                    if score <= 0.3:
+                        continue
                     
-                    if text_id not in unique_chunks and score > 0.3:
-                        unique_chunks.add(text_id)
-                        all_relevant_chunks.append({'text': text, 'score': score})
+                    # Keyed by the full text: str caches its hash, and chunks sharing a prefix stay distinct
+                    if score > best_scores.get(text, 0.0):
+                        best_scores[text] = score
         
-        # Sort and select top chunks
-        all_relevant_chunks.sort(key=lambda x: x['score'], reverse=True)
-        top_chunks = all_relevant_chunks[:8]
+        # Select top chunks
+        top_chunks = [{'text': text, 'score': score}
+                      for text, score in heapq.nlargest(8, best_scores.items(), key=itemgetter(1))]
         
-        print(f"✅ Found {len(top_chunks)} relevant chunks")
+        logger.debug(f"✅ Found {len(top_chunks)} relevant chunks")
         
         if not top_chunks:
             return {'success': False, 'error': 'No relevant information found'}
         
         # Create context with conversation history
-        context_sections = []
-        for chunk in top_chunks:
-            context_sections.append(f"[Relevance: {chunk['score']:.3f}]\n{chunk['text']}")
-        
-        combined_context = "\n\n".join(context_sections)
+        combined_context = "\n\n".join(f"[Relevance: {chunk['score']:.3f}]\n{chunk['text']}" for chunk in top_chunks)
         
         # Generate answer with conversation context
-        print("🤖 Generating contextual response...")
+        logger.debug("🤖 Generating contextual response...")
         answer_result = await get_gemini_answer_async(
             user_question=contextual_query,
             relevant_clauses=combined_context,
@@ -259,7 +343,7 @@ Please provide an answer that:
             
             # Store in conversation history
             conversation_entry = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': time.time(),
                 'query': query,
                 'contextual_query': contextual_query,
                 'followup_type': followup_type,
@@ -297,11 +381,16 @@ Please provide an answer that:
             
             print("\nConversation Flow:")
             for i, entry in enumerate(self.conversation_history, 1):
-                print(f"  {i}. [{entry['followup_type']}] {entry['query'][:80]}...")
+                asked_at = datetime.fromtimestamp(entry['timestamp']).isoformat(timespec='seconds')
+                print(f"  {i}. {asked_at} [{entry['followup_type']}] {entry['query'][:80]}...")
 
 async def main():
     """Interactive conversational Q&A session"""
     
+    # Show each turn's query analysis in the REPL; library modules stay at INFO
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger.setLevel(logging.DEBUG)
+    
     api_key = os.getenv('GEMINI_API_KEY')
     if not api_key:
         print("❌ GEMINI_API_KEY not found")
@@ -3,17 +3,30 @@ Simple demonstration of vector embeddings functionality.
 This shows the structure and workflow without making API calls.
 """
 
+import sys
+import json
+
+import numpy as np
+
+# Try to import orjson for faster pretty-printing of the example response
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def format_json(payload):
+    """Pretty-print a JSON payload with a two-space indent."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(payload, indent=2)
+
+def emit(*lines):
+    """Write a block of output lines with a single stdout write."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
 def demonstrate_embedding_concept():
     """Show what vector embeddings are and how they work."""
-    print("🔢 Vector Embeddings Explained")
-    print("=" * 40)
-    
-    print("\n1. What are vector embeddings?")
-    print("   - Numerical representations of text (lists of numbers)")
-    print("   - Capture semantic meaning and relationships")
-    print("   - Enable computers to understand text similarity")
-    
-    print("\n2. Example text chunks:")
     chunks = [
         "The cat sits on the mat",
         "A feline rests on a rug", 
@@ -21,10 +34,6 @@ def demonstrate_embedding_concept():
         "Cars need fuel to run"
     ]
     
-    for i, chunk in enumerate(chunks, 1):
-        print(f"   {i}. \"{chunk}\"")
-    
-    print("\n3. After embedding (simplified example):")
     # These are fake embeddings for demonstration
     fake_embeddings = [
         [0.8, 0.2, 0.1, 0.9],  # cat/mat
@@ -33,32 +42,29 @@ def demonstrate_embedding_concept():
         [0.0, 0.1, 0.9, 0.2],  # cars (different topic)
     ]
     
-    for i, (chunk, embedding) in enumerate(zip(chunks, fake_embeddings), 1):
-        print(f"   {i}. \"{chunk[:20]}...\" → {embedding}")
-    
-    print("\n4. Similarity analysis:")
-    print("   - Chunks 1 & 2 have similar vectors (both about cats/rugs)")
-    print("   - Chunks 3 & 4 are different (dogs vs cars)")
-    print("   - Real embeddings have 1536+ dimensions!")
+    # Cosine similarity of every pair: unit rows, then one matrix product
+    vectors = np.array(fake_embeddings, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarity = vectors @ vectors.T
+    
+    emit("🔢 Vector Embeddings Explained",
+         "=" * 40,
+         "\n1. What are vector embeddings?",
+         "   - Numerical representations of text (lists of numbers)",
+         "   - Capture semantic meaning and relationships",
+         "   - Enable computers to understand text similarity",
+         "\n2. Example text chunks:",
+         *(f"   {i}. \"{chunk}\"" for i, chunk in enumerate(chunks, 1)),
+         "\n3. After embedding (simplified example):",
+         *(f"   {i}. \"{chunk[:20]}...\" → {embedding}"
+           for i, (chunk, embedding) in enumerate(zip(chunks, fake_embeddings), 1)),
+         "\n4. Similarity analysis:",
+         f"   - Chunks 1 & 2 have similar vectors (both about cats/rugs): cosine {similarity[0, 1]:.2f}",
+         f"   - Chunks 3 & 4 are different (dogs vs cars): cosine {similarity[2, 3]:.2f}",
+         "   - Real embeddings have 1536+ dimensions!")
 
 def show_api_workflow():
     """Demonstrate the API workflow structure."""
-    print("\n\n🔄 API Workflow")
-    print("=" * 40)
-    
-    print("\nStep 1: Document Upload")
-    print("   POST /upload → Download files from URLs")
-    
-    print("\nStep 2: Document Parsing") 
-    print("   POST /parse → Extract text, create chunks")
-    
-    print("\nStep 3: Generate Embeddings")
-    print("   POST /embed → Convert chunks to vectors")
-    
-    print("\nStep 4: Combined Pipeline")
-    print("   POST /upload-parse-embed → All steps in one call")
-    
-    print("\n📊 Example Response Structure:")
     example_response = {
         "status": "success",
         "total_chunks": 5,
@@ -78,14 +84,21 @@ def show_api_workflow():
         }
     }
     
-    import json
-    print(json.dumps(example_response, indent=2))
+    emit("\n\n🔄 API Workflow",
+         "=" * 40,
+         "\nStep 1: Document Upload",
+         "   POST /upload → Download files from URLs",
+         "\nStep 2: Document Parsing",
+         "   POST /parse → Extract text, create chunks",
+         "\nStep 3: Generate Embeddings",
+         "   POST /embed → Convert chunks to vectors",
+         "\nStep 4: Combined Pipeline",
+         "   POST /upload-parse-embed → All steps in one call",
+         "\n📊 Example Response Structure:",
+         format_json(example_response))
 
 def show_embedding_models():
     """Show available OpenAI embedding models."""
-    print("\n\n🤖 Available OpenAI Models")
-    print("=" * 40)
-    
     models = [
         {
             "name": "text-embedding-3-small",
@@ -107,18 +120,17 @@ def show_embedding_models():
         }
     ]
     
+    lines = ["\n\n🤖 Available OpenAI Models", "=" * 40]
     for model in models:
         status = "✅ RECOMMENDED" if model["recommended"] else "⚪ Available"
-        print(f"\n{status}")
-        print(f"   Model: {model['name']}")
-        print(f"   Dimensions: {model['dimensions']}")
-        print(f"   Description: {model['description']}")
+        lines += [f"\n{status}",
+                  f"   Model: {model['name']}",
+                  f"   Dimensions: {model['dimensions']}",
+                  f"   Description: {model['description']}"]
+    emit(*lines)
 
 def show_use_cases():
     """Show practical use cases for embeddings."""
-    print("\n\n🎯 Practical Use Cases")
-    print("=" * 40)
-    
     use_cases = [
         {
             "name": "Semantic Search",
@@ -142,26 +154,27 @@ def show_use_cases():
         }
     ]
     
+    lines = ["\n\n🎯 Practical Use Cases", "=" * 40]
     for i, use_case in enumerate(use_cases, 1):
-        print(f"\n{i}. {use_case['name']}")
-        print(f"   {use_case['description']}")
-        print(f"   Example: {use_case['example']}")
+        lines += [f"\n{i}. {use_case['name']}",
+                  f"   {use_case['description']}",
+                  f"   Example: {use_case['example']}"]
+    emit(*lines)
 
 if __name__ == "__main__":
-    print("🚀 Vector Embeddings Demo")
-    print("This demo explains embeddings without requiring an API key")
+    emit("🚀 Vector Embeddings Demo",
+         "This demo explains embeddings without requiring an API key")
     
     demonstrate_embedding_concept()
     show_api_workflow()
     show_embedding_models()
     show_use_cases()
     
-    print("\n\n🔧 Next Steps:")
-    print("1. Get OpenAI API key: https://platform.openai.com/api-keys") 
-    print("2. Set environment: set OPENAI_API_KEY=your_key")
-    print("3. Install: pip install openai")
-    print("4. Test: python test_embeddings.py")
-    print("5. Start API: uvicorn main:app --reload")
-    print("6. Try endpoints at: http://localhost:8000/docs")
-    
-    print("\n✨ Ready to transform text into intelligent vectors! ✨")
+    emit("\n\n🔧 Next Steps:",
+         "1. Get OpenAI API key: https://platform.openai.com/api-keys",
+         "2. Set environment: set OPENAI_API_KEY=your_key",
+         "3. Install: pip install openai",
+         "4. Test: python test_embeddings.py",
+         "5. Start API: uvicorn main:app --reload",
+         "6. Try endpoints at: http://localhost:8000/docs",
+         "\n✨ Ready to transform text into intelligent vectors! ✨")
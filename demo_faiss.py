@@ -9,9 +9,15 @@ import os
 # Add current directory to path to import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Idle OpenMP threads sleep instead of spinning between the demo's small searches;
+# set before FAISS loads its OpenMP runtime
+os.environ.setdefault('OMP_WAIT_POLICY', 'PASSIVE')
+
 try:
-    from faiss_store import FAISSVectorStore, DocumentMetadata
+    import faiss
+    from faiss_store import FAISSVectorStore, DocumentMetadata, normalize_rows
     import numpy as np
+    faiss.omp_set_num_threads(min(4, os.cpu_count() or 1))
     print("✅ FAISS and numpy imported successfully!")
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -27,17 +33,14 @@ def demo_faiss_functionality():
     
     # Create vector store
     print("\n1️⃣ Creating FAISS vector store...")
-    vector_store = FAISSVectorStore(dimension=1536, index_type="flat")
+    vector_store = FAISSVectorStore(dimension=1536, index_type="auto")  # exact search, HNSW once the corpus grows
     print(f"   ✅ Created vector store with {vector_store.dimension} dimensions")
     
     # Create sample embeddings (1536 dimensions for OpenAI text-embedding-3-small)
     print("\n2️⃣ Creating sample embeddings...")
-    np.random.seed(42)  # For reproducible results
-    sample_embeddings = [
-        np.random.rand(1536).tolist(),
-        np.random.rand(1536).tolist(),
-        np.random.rand(1536).tolist()
-    ]
+    rng = np.random.default_rng(42)  # For reproducible results
+    # One contiguous float32 matrix, the layout the FAISS index stores
+    sample_embeddings = rng.random((3, 1536), dtype=np.float32)
     
     sample_texts = [
         "This is a document about machine learning and artificial intelligence.",
@@ -68,7 +71,7 @@ def demo_faiss_functionality():
     
     # Perform similarity search
     print("\n5️⃣ Performing similarity search...")
-    # Use the first embedding as a query (should find itself with score 0)
+    # Use the first embedding as a query (should find itself with cosine similarity 1.0)
     query_embedding = sample_embeddings[0]
     
     results = vector_store.similarity_search(
@@ -91,10 +94,7 @@ def demo_faiss_functionality():
     
     # Add another document
     print("\n7️⃣ Adding second document...")
-    more_embeddings = [
-        np.random.rand(1536).tolist(),
-        np.random.rand(1536).tolist()
-    ]
+    more_embeddings = rng.random((2, 1536), dtype=np.float32)
     
     more_texts = [
         "Python is a versatile programming language for data science and web development.",
@@ -126,6 +126,36 @@ def demo_faiss_functionality():
     )
     print(f"   🔍 Filtered search found {len(results)} results from demo-doc-2")
     
+    # Same vectors in scalar-quantized indexes
+    print("\n🔟 Comparing quantized index memory...")
+    all_embeddings = np.vstack([sample_embeddings, more_embeddings])
+    float32_bytes = final_stats['bytes_per_vector']
+    for index_type in ("fp16", "sq8"):
+        quantized_store = FAISSVectorStore(dimension=1536, index_type=index_type)
+        quantized_store.add_document_embeddings(all_embeddings, "quantized.txt", "txt", sample_texts + more_texts)
+        top_hit = quantized_store.similarity_search(sample_embeddings[0], k=1)[0]
+        bytes_per_vector = quantized_store.get_stats()['bytes_per_vector']
+        print(f"   📦 {index_type}: {bytes_per_vector} bytes/vector vs {float32_bytes} float32 "
+              f"({float32_bytes // bytes_per_vector}x smaller), self-match score {top_hit['score']:.4f}")
+    
+    # Opt-in GPU copy of the flat index; the CPU store stays the fallback
+    print("\n1️⃣1️⃣ Searching on GPU...")
+    num_gpus = faiss.get_num_gpus()
+    if num_gpus > 0:
+        cpu_indices, _ = vector_store.batch_similarity_search(all_embeddings, 3)
+        if num_gpus > 1:
+            cloner_options = faiss.GpuMultipleClonerOptions()
+            cloner_options.shard = True
+            gpu_index = faiss.index_cpu_to_all_gpus(vector_store.index, co=cloner_options)
+        else:
+            gpu_resources = faiss.StandardGpuResources()
+            gpu_index = faiss.index_cpu_to_gpu(gpu_resources, 0, vector_store.index)
+        # Stored rows are unit length, so queries are normalized the same way
+        _, gpu_indices = gpu_index.search(normalize_rows(all_embeddings), 3)
+        print(f"   🖥️ {num_gpus} GPU(s): top-3 results match CPU search: {np.array_equal(cpu_indices, gpu_indices)}")
+    else:
+        print("   ⏭️ No GPU available (faiss-gpu not installed or no device); using CPU search")
+    
     print("\n🎉 FAISS demo completed successfully!")
     return vector_store
 
@@ -58,28 +58,24 @@ try:
         print("\n🔢 STEP 2: GENERATING SAMPLE EMBEDDINGS")
         print("-" * 30)
         
-        embeddings = []
-        chunk_texts = []
-        
-        # Simulate embeddings with meaningful patterns
-        np.random.seed(42)  # For reproducible results
+        # Topic keywords and the block of dimensions each one boosts by 0.3;
+        # pattern row 0 is all zeros for content without a known topic
+        pattern_names = ("coverage", "claim", "contact", "premium")
+        patterns = np.zeros((len(pattern_names) + 1, 768), dtype=np.float32)
+        for pattern_id in range(1, len(pattern_names) + 1):
+            patterns[pattern_id, (pattern_id - 1) * 100:pattern_id * 100] = 0.3
+        
+        def pattern_id_for(topic):
+            """Row of patterns for the first keyword found in a topic"""
+            return next((i for i, name in enumerate(pattern_names, 1) if name in topic.lower()), 0)
+        
+        # Simulate embeddings with meaningful patterns: random rows plus their topic pattern in one broadcast add
+        rng = np.random.default_rng(42)  # For reproducible results
+        topic_ids = np.array([pattern_id_for(content["topic"]) for content in sample_bajaj_content])
+        embeddings = rng.random((len(sample_bajaj_content), 768), dtype=np.float32) + patterns[topic_ids]
+        chunk_texts = [content["text"] for content in sample_bajaj_content]
         
         for i, content in enumerate(sample_bajaj_content):
-            # Create embeddings with topic-based patterns
-            base_vector = np.random.rand(768).astype(np.float32)
-            
-            # Add topic-specific patterns
-            if "coverage" in content["topic"].lower():
-                base_vector[:100] += 0.3  # Coverage questions pattern
-            elif "claim" in content["topic"].lower():
-                base_vector[100:200] += 0.3  # Claim questions pattern  
-            elif "contact" in content["topic"].lower():
-                base_vector[200:300] += 0.3  # Contact questions pattern
-            elif "premium" in content["topic"].lower():
-                base_vector[300:400] += 0.3  # Premium questions pattern
-            
-            embeddings.append(base_vector.tolist())
-            chunk_texts.append(content["text"])
             print(f"   ✅ Chunk {i+1}: {content['topic']}")
         
         # Store in FAISS
@@ -128,28 +124,29 @@ try:
         
         successful_searches = 0
         
-        for i, query in enumerate(demo_queries, 1):
+        # Create all query embeddings with their question type's pattern at once
+        query_ids = np.array([pattern_id_for(query['pattern']) for query in demo_queries])
+        query_vectors = rng.random((len(demo_queries), 768), dtype=np.float32) + patterns[query_ids]
+        
+        # Search similar chunks for all questions in one batched FAISS call,
+        # with extra candidates per question for the threshold below
+        try:
+            candidate_indices, candidate_scores = vector_store.batch_similarity_search(query_vectors, 4)
+        except Exception as e:
+            print(f"\n❌ Search error: {e}")
+            candidate_indices = candidate_scores = [None] * len(demo_queries)
+        
+        for i, (query, row_indices, row_scores) in enumerate(zip(demo_queries, candidate_indices, candidate_scores), 1):
             print(f"\n❓ Question {i}: {query['question']}")
             
-            # Create query embedding with pattern matching
-            query_vector = np.random.rand(768).astype(np.float32)
-            
-            # Add pattern based on question type
-            if query['pattern'] == "coverage":
-                query_vector[:100] += 0.3
-            elif query['pattern'] == "claim":
-                query_vector[100:200] += 0.3
-            elif query['pattern'] == "contact":
-                query_vector[200:300] += 0.3
-            elif query['pattern'] == "premium":
-                query_vector[300:400] += 0.3
+            if row_indices is None:
+                continue
             
-            # Search similar chunks
             try:
-                search_results = vector_store.similarity_search(
-                    query_embedding=query_vector.tolist(),
+                search_results = vector_store.collect_results(
+                    row_indices, row_scores,
                     k=2,
-                    score_threshold=3.0  # L2 distance threshold
+                    score_threshold=0.5  # Minimum cosine similarity; higher is more similar
                 )
                 
                 if search_results:
@@ -192,7 +189,7 @@ try:
         print(f"\n🎊 FAISS VECTOR STORE CAPABILITIES DEMONSTRATED!")
         print(f"💡 System Features:")
         print(f"   • ✅ Document chunk storage with metadata")
-        print(f"   • ✅ Semantic similarity search (L2 distance)")
+        print(f"   • ✅ Semantic similarity search (cosine similarity)")
         print(f"   • ✅ Multiple document support")
         print(f"   • ✅ Efficient vector operations")
         print(f"   • ✅ Scalable to thousands of documents")
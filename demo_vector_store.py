@@ -33,12 +33,9 @@ async def quick_demo():
         # Test with sample data
         import numpy as np
         
-        # Create sample embeddings (768-dimensional vectors)
-        sample_embeddings = [
-            np.random.rand(768).tolist(),
-            np.random.rand(768).tolist(),
-            np.random.rand(768).tolist()
-        ]
+        # Create sample embeddings (768-dimensional float32 rows, passed to FAISS without list conversion)
+        rng = np.random.default_rng()
+        sample_embeddings = rng.random((3, 768), dtype=np.float32)
         
         sample_texts = [
             "This is the first test document about insurance policies.",
@@ -57,7 +54,7 @@ async def quick_demo():
         print(f"✅ Added {len(sample_embeddings)} embeddings with doc_id: {doc_id}")
         
         # Test similarity search
-        query_vector = np.random.rand(768).tolist()
+        query_vector = rng.random(768, dtype=np.float32)
         results = vector_store.similarity_search(
             query_embedding=query_vector,
             k=2
@@ -13,6 +13,42 @@ from typing import List, Dict, Any, Optional, Tuple, Union
 import uuid
 from datetime import datetime
 
+from simsimd_backend import SIMSIMD_AVAILABLE, quantize_int8
+
+# Sentinel epoch for chunks whose creation time cannot be parsed
+MISSING_TIMESTAMP = np.iinfo(np.int64).max
+
+# Fraction of the trained value range added on each side of the SQ8 quantizer ranges
+SQ8_RANGE_MARGIN = 0.2
+
+# Size at which an 'auto' store moves from exact search to HNSW; below it a flat scan is as fast
+HNSW_MIN_VECTORS = 20000
+# Candidate list size during HNSW search; FAISS's default of 16 misses many true neighbours
+HNSW_EF_SEARCH = 128
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale each row to unit L2 norm so inner product equals cosine similarity
+    
+    Args:
+        vectors: float32 array of shape (n, dimension)
+    
+    Returns:
+        Normalized array; all-zero rows are left unchanged
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _to_epoch_seconds(created_at: Optional[str]) -> int:
+    """Convert an ISO creation timestamp to epoch seconds, or MISSING_TIMESTAMP"""
+    try:
+        return int(datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp())
+    except (ValueError, TypeError, AttributeError):
+        return MISSING_TIMESTAMP
+
 
 class DocumentMetadata:
     """Metadata for stored documents"""
@@ -46,6 +82,10 @@ class DocumentMetadata:
 class FAISSVectorStore:
     """
     FAISS-based vector store for document embeddings with similarity search
+    
+    Embeddings are normalized to unit length on insert and queries are
+    normalized before searching, so scores are cosine similarities from an
+    inner-product index (higher is better, range [-1, 1]).
     """
     
     def __init__(self, dimension: int = 768, index_type: str = "flat"):
@@ -54,7 +94,9 @@ class FAISSVectorStore:
         
         Args:
             dimension: Vector dimension (768 for embedding-001, 1536 for text-embedding-3-small)
-            index_type: Type of FAISS index ('flat', 'ivf', 'hnsw')
+            index_type: Type of FAISS index ('flat', 'auto', 'sq8', 'fp16', 'ivf', 'hnsw');
+                'auto' searches exactly like 'flat' until HNSW_MIN_VECTORS
+                vectors are stored, then switches to 'hnsw'
         """
         self.dimension = dimension
         self.index_type = index_type
@@ -62,27 +104,51 @@ class FAISSVectorStore:
         self.metadata_store: Dict[int, DocumentMetadata] = {}
         self.doc_id_to_indices: Dict[str, List[int]] = {}
         self.next_id = 0
+        # int8 codes and per-row scales of the stored vectors for SimSIMD brute-force search (flat indexes only)
+        self.vector_codes: Optional[np.ndarray] = None
+        self.vector_scales: Optional[np.ndarray] = None
+        self._code_buffer: Optional[np.ndarray] = None
+        self._scale_buffer: Optional[np.ndarray] = None
+        # Column-wise chunk metadata indexed by vector id, for vectorized filtering
+        self.doc_id_to_code: Dict[str, int] = {}
+        self.file_type_to_code: Dict[str, int] = {}
+        self.doc_id_codes = np.empty(0, dtype=np.int32)
+        self.chunk_indices = np.empty(0, dtype=np.int32)
+        self.file_type_codes = np.empty(0, dtype=np.int16)
+        self.created_at_epoch = np.empty(0, dtype=np.int64)
         self._initialize_index()
     
     def _initialize_index(self):
         """Initialize the FAISS index based on the specified type"""
-        if self.index_type == "flat":
-            # Exact search using L2 distance
-            self.index = faiss.IndexFlatL2(self.dimension)
+        if self.index_type in ("flat", "auto"):
+            # Exact search using inner product on unit vectors (cosine similarity)
+            self.index = faiss.IndexFlatIP(self.dimension)
+        elif self.index_type == "sq8":
+            # Exact search over 8-bit scalar-quantized vectors (4x less memory than float32)
+            self.index = faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_8bit,
+                                                    faiss.METRIC_INNER_PRODUCT)
+            # Widen the per-dimension ranges learned from the first batch so later documents are rarely clipped
+            self.index.sq.rangestat_arg = SQ8_RANGE_MARGIN
+        elif self.index_type == "fp16":
+            # Exact search over half-precision vectors (2x less memory than float32, no training needed)
+            self.index = faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_fp16,
+                                                    faiss.METRIC_INNER_PRODUCT)
         elif self.index_type == "ivf":
             # Inverted file index for faster approximate search
             nlist = 100  # number of clusters
-            quantizer = faiss.IndexFlatL2(self.dimension)
-            self.index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist)
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            self.index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
         elif self.index_type == "hnsw":
-            # Hierarchical Navigable Small World for fast approximate search
-            self.index = faiss.IndexHNSWFlat(self.dimension, 32)
-            self.index.hnsw.efConstruction = 200
+            self.index = self._new_hnsw_index()
         else:
             raise ValueError(f"Unsupported index type: {self.index_type}")
+        
+        if SIMSIMD_AVAILABLE and self.index_type in ("flat", "auto"):
+            self.vector_codes = np.empty((0, self.dimension), dtype=np.int8)
+            self.vector_scales = np.empty(0, dtype=np.float32)
     
     def add_document_embeddings(self, 
-                              embeddings: List[List[float]], 
+                              embeddings: Union[List[List[float]], np.ndarray], 
                               file_path: str,
                               file_type: str,
                               chunk_texts: List[str],
@@ -91,7 +157,7 @@ class FAISSVectorStore:
         Add document embeddings to the FAISS index
         
         Args:
-            embeddings: List of embedding vectors
+            embeddings: List of embedding vectors or an (n, dimension) array
             file_path: Path to the source document
             file_type: Type of document (pdf, docx, eml)
             chunk_texts: List of text chunks corresponding to embeddings
@@ -100,7 +166,7 @@ class FAISSVectorStore:
         Returns:
             Document ID used for storage
         """
-        if not embeddings:
+        if len(embeddings) == 0:
             raise ValueError("No embeddings provided")
         
         if len(embeddings) != len(chunk_texts):
@@ -110,13 +176,16 @@ class FAISSVectorStore:
         if doc_id is None:
             doc_id = str(uuid.uuid4())
         
-        # Convert embeddings to numpy array
-        embeddings_array = np.array(embeddings, dtype=np.float32)
+        # float32 arrays are used as is; normalize_rows below returns a new array
+        embeddings_array = np.asarray(embeddings, dtype=np.float32)
         
         # Check dimension consistency
         if embeddings_array.shape[1] != self.dimension:
             raise ValueError(f"Embedding dimension {embeddings_array.shape[1]} doesn't match index dimension {self.dimension}")
         
+        # Normalize once at insert so searches are plain inner products
+        embeddings_array = normalize_rows(embeddings_array)
+        
         # Train index if needed (for IVF)
         if self.index_type == "ivf" and not self.index.is_trained:
             if embeddings_array.shape[0] >= 100:  # Need enough training data
@@ -127,9 +196,13 @@ class FAISSVectorStore:
                     print("IVF index already trained")
                 else:
                     # Create some dummy training data if we don't have enough
-                    dummy_data = np.random.random((100, self.dimension)).astype(np.float32)
+                    dummy_data = normalize_rows(np.random.random((100, self.dimension)).astype(np.float32))
                     self.index.train(dummy_data)
         
+        # Learn the quantizer ranges from the first document (for SQ8)
+        if self.index_type == "sq8" and not self.index.is_trained:
+            self.index.train(embeddings_array)
+        
         # Get starting index for this document
         start_idx = self.next_id
         indices_for_doc = []
@@ -155,6 +228,14 @@ class FAISSVectorStore:
         # Add all embeddings to index at once
         self.index.add(embeddings_array)
         
+        if self.vector_codes is not None:
+            self._append_vector_mirror(embeddings_array)
+        
+        if self.index_type == "auto" and self.index.ntotal >= HNSW_MIN_VECTORS:
+            self._promote_to_hnsw()
+        
+        self._append_metadata_arrays([self.metadata_store[idx] for idx in indices_for_doc])
+        
         # Track document ID to indices mapping
         if doc_id in self.doc_id_to_indices:
             self.doc_id_to_indices[doc_id].extend(indices_for_doc)
@@ -164,7 +245,7 @@ class FAISSVectorStore:
         return doc_id
     
     def similarity_search(self, 
-                         query_embedding: List[float], 
+                         query_embedding: Union[List[float], np.ndarray], 
                          k: int = 5,
                          score_threshold: Optional[float] = None,
                          filter_doc_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
@@ -174,7 +255,7 @@ class FAISSVectorStore:
         Args:
             query_embedding: Query vector for similarity search
             k: Number of results to return
-            score_threshold: Optional score threshold (lower is better for L2)
+            score_threshold: Optional minimum cosine similarity (higher is better)
             filter_doc_ids: Optional list of document IDs to filter results
         
         Returns:
@@ -183,36 +264,176 @@ class FAISSVectorStore:
         if self.index.ntotal == 0:
             return []
         
-        # Convert query to numpy array
-        query_vector = np.array([query_embedding], dtype=np.float32)
+        # Perform search
+        indices, scores = self.search_candidates(query_embedding, k * 2)  # Get extra results for filtering
+        
+        return self.collect_results(indices, scores, k, score_threshold, filter_doc_ids)
+    
+    def search_candidates(self, query_embedding: Union[List[float], np.ndarray], n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the raw nearest-neighbour candidates from the FAISS index
         
-        if query_vector.shape[1] != self.dimension:
-            raise ValueError(f"Query embedding dimension {query_vector.shape[1]} doesn't match index dimension {self.dimension}")
+        Args:
+            query_embedding: Query vector for similarity search
+            n: Number of candidates to retrieve
         
-        # Perform search
-        scores, indices = self.index.search(query_vector, min(k * 2, self.index.ntotal))  # Get extra results for filtering
+        Returns:
+            Tuple of (indices, scores) arrays, best first; empty slots are -1
+        """
+        indices, scores = self.batch_similarity_search(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1), n)
+        return indices[0], scores[0]
+    
+    def batch_similarity_search(self, query_matrix: np.ndarray, k: int,
+                                normalized: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search several queries against the FAISS index in a single call
+        
+        Args:
+            query_matrix: Query vectors of shape (n_queries, dimension)
+            k: Number of candidates per query
+            normalized: Whether the query rows are already unit length;
+                raw embeddings are normalized here
+        
+        Returns:
+            Tuple of (indices, scores) arrays of shape (n_queries, k), highest
+            cosine similarity first; empty slots are -1
+        """
+        query_matrix = np.ascontiguousarray(query_matrix, dtype=np.float32)
+        
+        if query_matrix.shape[1] != self.dimension:
+            raise ValueError(f"Query embedding dimension {query_matrix.shape[1]} doesn't match index dimension {self.dimension}")
+        
+        if self.index.ntotal == 0 or k <= 0:
+            empty = (query_matrix.shape[0], 0)
+            return np.empty(empty, dtype=np.int64), np.empty(empty, dtype=np.float32)
+        
+        if not normalized:
+            query_matrix = normalize_rows(query_matrix)
+        
+        scores, indices = self.index.search(query_matrix, min(k, self.index.ntotal))
+        return indices, scores
+    
+    def metadata_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Get chunk metadata as arrays indexed by vector id
+        
+        Removed documents keep their slots with a doc_id code of -1.
         
+        Returns:
+            Dictionary with doc_id_codes, chunk_indices, file_type_codes and
+            created_at_epoch arrays; unknown creation times are MISSING_TIMESTAMP
+        """
+        return {
+            "doc_id_codes": self.doc_id_codes,
+            "chunk_indices": self.chunk_indices,
+            "file_type_codes": self.file_type_codes,
+            "created_at_epoch": self.created_at_epoch
+        }
+    
+    def _append_metadata_arrays(self, metadatas: List[DocumentMetadata]):
+        """Append column metadata for newly added vectors"""
+        self.doc_id_codes = np.concatenate([self.doc_id_codes, np.array(
+            [self.doc_id_to_code.setdefault(m.doc_id, len(self.doc_id_to_code)) for m in metadatas], dtype=np.int32)])
+        self.chunk_indices = np.concatenate([self.chunk_indices, np.array(
+            [m.chunk_index for m in metadatas], dtype=np.int32)])
+        self.file_type_codes = np.concatenate([self.file_type_codes, np.array(
+            [self.file_type_to_code.setdefault(m.file_type.lower(), len(self.file_type_to_code)) for m in metadatas], dtype=np.int16)])
+        self.created_at_epoch = np.concatenate([self.created_at_epoch, np.array(
+            [_to_epoch_seconds(m.created_at) for m in metadatas], dtype=np.int64)])
+    
+    def _rebuild_metadata_arrays(self):
+        """Rebuild column metadata from the metadata store after loading"""
+        self.doc_id_to_code = {}
+        self.file_type_to_code = {}
+        self.doc_id_codes = np.full(self.next_id, -1, dtype=np.int32)
+        self.chunk_indices = np.zeros(self.next_id, dtype=np.int32)
+        self.file_type_codes = np.zeros(self.next_id, dtype=np.int16)
+        self.created_at_epoch = np.full(self.next_id, MISSING_TIMESTAMP, dtype=np.int64)
+        
+        for idx, metadata in self.metadata_store.items():
+            self.doc_id_codes[idx] = self.doc_id_to_code.setdefault(metadata.doc_id, len(self.doc_id_to_code))
+            self.chunk_indices[idx] = metadata.chunk_index
+            self.file_type_codes[idx] = self.file_type_to_code.setdefault(metadata.file_type.lower(), len(self.file_type_to_code))
+            self.created_at_epoch[idx] = _to_epoch_seconds(metadata.created_at)
+    
+    def quantized_vectors(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get the int8 codes of the stored unit vectors for batch similarity kernels
+        
+        Returns:
+            Tuple of (codes, scales) with shapes (total_vectors, dimension) and
+            (total_vectors,), or None if unavailable
+        """
+        if self.vector_codes is None:
+            return None
+        return self.vector_codes, self.vector_scales
+    
+    def rescore_candidates(self, query_embedding: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """
+        Compute exact float32 cosine similarities for a few candidate vectors
+        
+        A whole query batch is rescored with one reconstruction call and one
+        stacked matrix product.
+        
+        Args:
+            query_embedding: Unit-length float32 query vector of shape (dimension,),
+                or a query matrix of shape (n_queries, dimension)
+            indices: Candidate vector indices of shape (n_candidates,), or
+                (n_queries, n_candidates) for a query matrix
+        
+        Returns:
+            float32 scores aligned with indices
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size == 0:
+            return np.empty(indices.shape, dtype=np.float32)
+        
+        vectors = self.index.reconstruct_batch(indices.ravel()).reshape(*indices.shape, self.dimension)
+        return np.matmul(vectors, query_embedding[..., None])[..., 0]
+    
+    def collect_results(self,
+                        indices: np.ndarray,
+                        scores: np.ndarray,
+                        k: int = 5,
+                        score_threshold: Optional[float] = None,
+                        filter_doc_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Turn ranked candidate indices and scores into search results with metadata
+        
+        Args:
+            indices: Candidate vector indices, best first
+            scores: Cosine similarities aligned with indices (higher is better)
+            k: Number of results to return
+            score_threshold: Optional minimum cosine similarity
+            filter_doc_ids: Optional list of document IDs to filter results
+        
+        Returns:
+            List of search results with metadata and scores
+        """
         results = []
-        for score, idx in zip(scores[0], indices[0]):
+        allowed_doc_ids = frozenset(filter_doc_ids) if filter_doc_ids else None
+        
+        for score, idx in zip(scores, indices):
             if idx == -1:  # FAISS returns -1 for empty slots
                 continue
-                
+            
+            idx = int(idx)
             if idx not in self.metadata_store:
                 continue
                 
             metadata = self.metadata_store[idx]
             
             # Apply document ID filter if specified
-            if filter_doc_ids and metadata.doc_id not in filter_doc_ids:
+            if allowed_doc_ids is not None and metadata.doc_id not in allowed_doc_ids:
                 continue
             
             # Apply score threshold if specified
-            if score_threshold is not None and score > score_threshold:
+            if score_threshold is not None and score < score_threshold:
                 continue
             
             result = {
                 "score": float(score),
-                "index": int(idx),
+                "index": idx,
                 "metadata": metadata.to_dict(),
                 "text": metadata.chunk_text
             }
@@ -269,6 +490,7 @@ class FAISSVectorStore:
         for idx in indices_to_remove:
             if idx in self.metadata_store:
                 del self.metadata_store[idx]
+        self.doc_id_codes[indices_to_remove] = -1
         
         # Remove document ID mapping
         del self.doc_id_to_indices[doc_id]
@@ -288,7 +510,8 @@ class FAISSVectorStore:
             "index_type": self.index_type,
             "total_documents": len(self.doc_id_to_indices),
             "total_chunks": len(self.metadata_store),
-            "is_trained": getattr(self.index, 'is_trained', True)
+            "is_trained": getattr(self.index, 'is_trained', True),
+            "bytes_per_vector": self.index.sa_code_size() if self.index_type in ("flat", "auto", "sq8", "fp16") else None
         }
     
     def save(self, filepath: str):
@@ -313,17 +536,25 @@ class FAISSVectorStore:
         with open(f"{filepath}_metadata.json", 'w') as f:
             json.dump(metadata_dict, f, indent=2)
     
-    def load(self, filepath: str):
+    def load(self, filepath: str, mmap: bool = False):
         """
         Load the FAISS index and metadata from disk
         
         Args:
             filepath: Base filepath (without extension)
+            mmap: Memory-map the index file instead of reading it into memory;
+                the mapped index is read-only, so no vectors can be added to it,
+                and searches use FAISS directly rather than the int8 mirror
         """
+        # Drop the int8 mirror until the loaded index is known
+        self._clear_vector_mirror()
+        
         # Load FAISS index
         if os.path.exists(f"{filepath}.faiss"):
-            self.index = faiss.read_index(f"{filepath}.faiss")
-        
+            self.index = faiss.read_index(f"{filepath}.faiss", faiss.IO_FLAG_MMAP if mmap else 0)
+            if self.index.metric_type == faiss.METRIC_L2:
+                self._migrate_l2_index()
+
         # Load metadata and mappings
         if os.path.exists(f"{filepath}_metadata.json"):
             with open(f"{filepath}_metadata.json", 'r') as f:
@@ -344,12 +575,77 @@ class FAISSVectorStore:
             self.next_id = metadata_dict["next_id"]
             self.dimension = metadata_dict["dimension"]
             self.index_type = metadata_dict["index_type"]
+            self._rebuild_metadata_arrays()
+
+        # Rebuild the int8 mirror from whatever index is now loaded; a mapped
+        # index stays on disk, since rebuilding would read every vector into memory
+        if not mmap:
+            self._rebuild_vector_mirror()
+    
+    def _migrate_l2_index(self):
+        """Convert an index saved with L2 distance to a normalized inner-product index"""
+        if isinstance(self.index, faiss.IndexFlat):
+            vectors = normalize_rows(self.index.reconstruct_n(0, self.index.ntotal))
+            self.index = faiss.IndexFlatIP(self.index.d)
+            self.index.add(vectors)
+        else:
+            print("Warning: loaded index uses L2 distance; scores will not be cosine similarities until it is rebuilt")
+
+    def _new_hnsw_index(self):
+        """Create an empty inner-product HNSW index"""
+        # Hierarchical Navigable Small World for fast approximate search
+        index = faiss.IndexHNSWFlat(self.dimension, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+    
+    def _promote_to_hnsw(self):
+        """Move an 'auto' store's vectors from the flat index into a new HNSW index"""
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        self.index = self._new_hnsw_index()
+        self.index.add(vectors)
+        self.index_type = "hnsw"
+        self._clear_vector_mirror()
+    
+    def _append_vector_mirror(self, embeddings_array: np.ndarray):
+        """Append quantized vectors to the int8 mirror, growing its buffers geometrically"""
+        count = len(self.vector_codes)
+        needed = count + len(embeddings_array)
+        
+        if self._code_buffer is None or needed > len(self._code_buffer):
+            capacity = max(needed, 2 * count, 1024)
+            code_buffer = np.empty((capacity, self.dimension), dtype=np.int8)
+            scale_buffer = np.empty(capacity, dtype=np.float32)
+            code_buffer[:count] = self.vector_codes
+            scale_buffer[:count] = self.vector_scales
+            self._code_buffer, self._scale_buffer = code_buffer, scale_buffer
+        
+        codes, scales = quantize_int8(embeddings_array)
+        self._code_buffer[count:needed] = codes
+        self._scale_buffer[count:needed] = scales
+        self.vector_codes = self._code_buffer[:needed]
+        self.vector_scales = self._scale_buffer[:needed]
+    
+    def _clear_vector_mirror(self):
+        """Drop the int8 mirror and its buffers"""
+        self.vector_codes = None
+        self.vector_scales = None
+        self._code_buffer = None
+        self._scale_buffer = None
+    
+    def _rebuild_vector_mirror(self):
+        """Rebuild the int8 mirror so it matches the current flat index exactly"""
+        self._clear_vector_mirror()
+        if SIMSIMD_AVAILABLE and self.index_type in ("flat", "auto") and isinstance(self.index, faiss.IndexFlat):
+            self._code_buffer, self._scale_buffer = quantize_int8(
+                self.index.reconstruct_n(0, self.index.ntotal).reshape(-1, self.dimension))
+            self.vector_codes, self.vector_scales = self._code_buffer, self._scale_buffer
 
 
 # Global vector store instance
 vector_store = None
 
-def get_vector_store(dimension: int = 768, index_type: str = "flat") -> FAISSVectorStore:
+def get_vector_store(dimension: int = 768, index_type: str = "auto") -> FAISSVectorStore:
     """
     Get or create global vector store instance
     
@@ -51,9 +51,9 @@ def final_system_demo():
         vector_store = get_vector_store(dimension=768)
         stats = vector_store.get_stats()
         
-        print(f"✅ FAISS Vector Store: IndexFlatL2 - READY")
+        print(f"✅ FAISS Vector Store: IndexFlatIP - READY")
         print(f"✅ Dimension Support: {stats['dimension']}D (Gemini compatible) - READY")
-        print(f"✅ Similarity Search: L2 distance - READY")
+        print(f"✅ Similarity Search: Cosine similarity - READY")
         print(f"✅ Document Metadata: Full tracking - READY")
         vector_store_ready = True
         
@@ -130,7 +130,7 @@ def final_system_demo():
     test_results = [
         ("bajaj.pdf", "24 chunks", "75% Q&A success", True),
         ("chotgdp.pdf", "83 chunks (101 pages)", "Processing validated", True),
-        ("Vector Search", "L2 similarity", "Operational", vector_store_ready),
+        ("Vector Search", "Cosine similarity", "Operational", vector_store_ready),
         ("Model Integration", "Gemini API", "API configured" if api_key else "Needs API key", bool(api_key))
     ]
     
@@ -4,10 +4,11 @@ Refactored from OpenAI API to use Google Gemini with HTTP requests.
 """
 
 import os
+import random
 import asyncio
 import aiohttp
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 import logging
 from pydantic import BaseModel
 import json
@@ -16,6 +17,25 @@ import json
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Try to import orjson for faster encoding of requests and decoding of embedding responses
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson not available. Falling back to the json module. Install with: pip install orjson")
+
+
+def _encode_json(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request payload to a JSON body"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+# Decoder for API responses, which carry one float list per embedding
+_decode_json = orjson.loads if ORJSON_AVAILABLE else json.loads
+
 class EmbeddingRequest(BaseModel):
     """Request model for embedding generation."""
     text_chunks: List[str]
@@ -33,6 +53,15 @@ class EmbeddingResponse(BaseModel):
 class GeminiVectorEmbedder:
     """Class for generating vector embeddings using Google Gemini API."""
     
+    # batchEmbedContents accepts at most 100 requests per call
+    MAX_BATCH_SIZE = 100
+    # Batch calls allowed in flight at once during generate_embeddings
+    MAX_CONCURRENT_BATCHES = 4
+    # Pooled connections kept by the embedder's HTTP session
+    MAX_CONNECTIONS = 16
+    # Seconds a resolved API hostname is reused before looking it up again
+    DNS_CACHE_SECONDS = 300
+    
     def __init__(self, api_key: Optional[str] = None, model: str = "embedding-001"):
         """
         Initialize the Gemini vector embedder.
@@ -65,6 +94,43 @@ class GeminiVectorEmbedder:
         
         # Store whether to use query param or header auth (will be determined on first call)
         self._auth_method = None
+        
+        # HTTP session reused across calls so connections (TLS, DNS) are pooled
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the embedder's pooled HTTP session, creating it on first use.
+        
+        A session belongs to one event loop; a session left over from an
+        earlier loop is detached and replaced.
+        
+        Returns:
+            aiohttp session shared by all calls on the running loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+        
+        if self._session is not None and not self._session.closed:
+            # Its loop is gone, so it cannot be closed cleanly from here
+            self._session.detach()
+        
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+            limit=self.MAX_CONNECTIONS, ttl_dns_cache=self.DNS_CACHE_SECONDS))
+        self._session_loop = loop
+        return self._session
+    
+    async def close(self):
+        """Close the pooled HTTP session; a later call opens a new one"""
+        if self._session is not None and not self._session.closed:
+            if self._session_loop is asyncio.get_running_loop():
+                await self._session.close()
+            else:
+                self._session.detach()
+        self._session = None
+        self._session_loop = None
     
     async def generate_embeddings(self, text_chunks: List[str], batch_size: int = 100) -> Dict[str, Any]:
         """
@@ -95,30 +161,30 @@ class GeminiVectorEmbedder:
         # Preprocess text chunks
         processed_chunks = self._preprocess_chunks(text_chunks)
         
-        all_embeddings = []
+        batch_size = max(1, min(batch_size, self.MAX_BATCH_SIZE))
+        total_batches = (len(processed_chunks) + batch_size - 1) // batch_size
+        all_embeddings: List[Optional[List[float]]] = [None] * len(processed_chunks)
         total_tokens = 0
         
         try:
-            # Process chunks in batches
-            async with aiohttp.ClientSession() as session:
-                for i in range(0, len(processed_chunks), batch_size):
-                    batch = processed_chunks[i:i + batch_size]
-                    
-                    logger.info(f"Processing batch {i//batch_size + 1}/{(len(processed_chunks) + batch_size - 1)//batch_size}")
-                    
-                    # Process each chunk in the batch (Gemini typically processes one at a time)
-                    batch_embeddings = []
-                    for text in batch:
-                        embedding = await self._generate_single_embedding(session, text)
-                        if embedding:
-                            batch_embeddings.append(embedding)
-                            total_tokens += self._estimate_tokens(text)
-                    
-                    all_embeddings.extend(batch_embeddings)
-                    
-                    # Small delay to respect rate limits
-                    if i + batch_size < len(processed_chunks):
-                        await asyncio.sleep(0.1)
+            # Submit batches concurrently with a bounded number of requests in flight
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_BATCHES)
+            
+            async def embed_batch(start: int, session: aiohttp.ClientSession):
+                batch = processed_chunks[start:start + batch_size]
+                async with semaphore:
+                    # Jitter spreads request bursts to stay clear of rate limits
+                    await asyncio.sleep(random.uniform(0, 0.05))
+                    logger.info(f"Processing batch {start//batch_size + 1}/{total_batches}")
+                    all_embeddings[start:start + len(batch)] = await self._generate_batch_embeddings(session, batch)
+            
+            session = await self._get_session()
+            await asyncio.gather(*(
+                embed_batch(start, session)
+                for start in range(0, len(processed_chunks), batch_size)
+            ))
+            
+            total_tokens = sum(self._estimate_tokens(text) for text in processed_chunks)
             
             dimensions = len(all_embeddings[0]) if all_embeddings else 0
             
@@ -168,9 +234,9 @@ class GeminiVectorEmbedder:
         headers = {"Content-Type": "application/json"}
         
         try:
-            async with session.post(url, headers=headers, json=payload) as response:
+            async with session.post(url, headers=headers, data=_encode_json(payload)) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=_decode_json)
                     embedding = data.get("embedding", {}).get("values", [])
                     if embedding:
                         logger.info(f"Successfully generated embedding with {len(embedding)} dimensions")
@@ -198,6 +264,58 @@ class GeminiVectorEmbedder:
         
         return None
     
+    async def _generate_batch_embeddings(self, session: aiohttp.ClientSession, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in one batchEmbedContents call.
+        
+        Args:
+            session: aiohttp session
+            texts: Cleaned texts to embed (at most 100)
+            
+        Returns:
+            Embedding vectors aligned with texts
+        """
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{self.model}",
+                    "content": {"parts": [{"text": text}]},
+                    "taskType": "RETRIEVAL_DOCUMENT"
+                }
+                for text in texts
+            ]
+        }
+        
+        url = f"{self.base_url}/{self.model}:batchEmbedContents?key={self.api_key}"
+        headers = {"Content-Type": "application/json"}
+        
+        try:
+            async with session.post(url, headers=headers, data=_encode_json(payload)) as response:
+                if response.status == 200:
+                    data = await response.json(loads=_decode_json)
+                    embeddings = [item.get("values", []) for item in data.get("embeddings", [])]
+                    if len(embeddings) != len(texts) or not all(embeddings):
+                        raise Exception(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+                    logger.info(f"Successfully generated {len(embeddings)} embeddings in one batch")
+                    return embeddings
+                
+                error_text = await response.text()
+                logger.error(f"Gemini API error {response.status}: {error_text}")
+                
+                # Handle specific error cases
+                if response.status == 429:
+                    logger.warning("Rate limit exceeded, waiting before retry...")
+                    await asyncio.sleep(1)
+                    return await self._generate_batch_embeddings(session, texts)
+                elif response.status == 403:
+                    raise Exception("API access denied. Check your API key permissions and billing status.")
+                else:
+                    raise Exception(f"API error {response.status}: {error_text}")
+                    
+        except aiohttp.ClientError as e:
+            logger.error(f"Network error: {e}")
+            raise Exception(f"Network error: {e}")
+    
     def generate_embeddings_sync(self, text_chunks: List[str]) -> Dict[str, Any]:
         """
         Synchronous version of generate_embeddings using requests library.
@@ -481,6 +599,173 @@ class GeminiChunkEmbedder:
                 }
             }
 
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batched API calls.
+    
+    Requests arriving within a short window are sent together in one
+    batchEmbedContents call, and each caller receives its own result.
+    """
+    
+    MAX_BATCH_SIZE = GeminiVectorEmbedder.MAX_BATCH_SIZE
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "embedding-001",
+                 window_seconds: float = 0.008):
+        """
+        Initialize the batcher.
+        
+        Args:
+            api_key: Google Gemini API key. If not provided, will look for GEMINI_API_KEY env var
+            model: Gemini embedding model to use
+            window_seconds: How long to wait for more requests before flushing
+        """
+        self.embedder = get_embedder(api_key=api_key, model=model)
+        if self.embedder.model not in self.embedder.model_configs:
+            available_models = list(self.embedder.model_configs.keys())
+            raise ValueError(f"Unsupported model: {model}. Available models: {available_models}")
+        
+        self.window_seconds = window_seconds
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # The event loop only keeps weak references to tasks, so running flushes are held here
+        self._flush_tasks: Set[asyncio.Task] = set()
+    
+    async def embed(self, text: str) -> Dict[str, Any]:
+        """
+        Embed one text, sharing an API call with concurrent requests.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Dictionary in the generate_embeddings format with a single embedding
+        """
+        # Same cleaning and length limit as generate_embeddings; an over-long
+        # text is embedded by its first chunk, as single-text calls always were
+        processed = self.embedder._preprocess_chunks([text])
+        if not processed:
+            return self._result(text, error="No text chunks provided")
+        cleaned = processed[0]
+        
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Requests queued on a previous event loop can no longer be resolved
+            self._loop = loop
+            self._pending = []
+            self._flush_tasks = set()
+        
+        future = loop.create_future()
+        self._pending.append((cleaned, future))
+        if len(self._pending) == 1:
+            window = self._pending
+            task = loop.create_task(self._flush_after_window(window))
+            self._flush_tasks.add(task)
+            task.add_done_callback(lambda task: self._finish_window(task, window))
+        
+        return await future
+    
+    async def _flush_after_window(self, window: List[Tuple[str, asyncio.Future]]):
+        """Wait for the coalescing window, then send all of its requests"""
+        await asyncio.sleep(self.window_seconds)
+        
+        if self._pending is window:
+            self._pending = []
+        batches = [window[i:i + self.MAX_BATCH_SIZE] for i in range(0, len(window), self.MAX_BATCH_SIZE)]
+        await asyncio.gather(*(self._flush(batch) for batch in batches))
+    
+    def _finish_window(self, task: asyncio.Task, window: List[Tuple[str, asyncio.Future]]):
+        """Release a finished flush task and fail any request it left unresolved, e.g. when cancelled"""
+        self._flush_tasks.discard(task)
+        if self._pending is window:
+            self._pending = []
+        for text, future in window:
+            if not future.done():
+                future.set_result(self._result(text, error="Embedding request was cancelled"))
+    
+    async def _flush(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embed one batch of pending requests and resolve their futures"""
+        texts = [text for text, _ in batch]
+        
+        try:
+            session = await self.embedder._get_session()
+            embeddings = await self.embedder._generate_batch_embeddings(session, texts)
+            results = [self._result(text, embedding) for text, embedding in zip(texts, embeddings)]
+        except Exception as e:
+            logger.error(f"Error generating batched embeddings: {e}")
+            results = [self._result(text, error=str(e)) for text in texts]
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def _result(self, text: str, embedding: Optional[List[float]] = None,
+                error: Optional[str] = None) -> Dict[str, Any]:
+        """Build a single-text result in the generate_embeddings format"""
+        if error is not None:
+            return {
+                "embeddings": [],
+                "model": self.embedder.model,
+                "total_chunks": 1,
+                "dimensions": 0,
+                "total_tokens": 0,
+                "error": error,
+                "success": False
+            }
+        
+        return {
+            "embeddings": [embedding],
+            "model": self.embedder.model,
+            "total_chunks": 1,
+            "dimensions": len(embedding),
+            "total_tokens": self.embedder._estimate_tokens(text),
+            "processed_chunks": [text],
+            "success": True
+        }
+
+
+# Shared embedders, one per (api_key, model), so their HTTP sessions are pooled across calls
+_embedders: Dict[Tuple[Optional[str], str], GeminiVectorEmbedder] = {}
+
+def get_embedder(api_key: Optional[str] = None, model: str = "embedding-001") -> GeminiVectorEmbedder:
+    """
+    Get or create the shared embedder for an API key and model.
+    
+    Args:
+        api_key: Gemini API key (optional if set in environment)
+        model: Gemini embedding model to use
+        
+    Returns:
+        GeminiVectorEmbedder instance
+    """
+    key = (api_key, model)
+    if key not in _embedders:
+        _embedders[key] = GeminiVectorEmbedder(api_key=api_key, model=model)
+    return _embedders[key]
+
+async def close_embedders():
+    """Close the pooled HTTP sessions of all shared embedders"""
+    for embedder in _embedders.values():
+        await embedder.close()
+
+# Shared batchers, one per (api_key, model)
+_embedding_batchers: Dict[Tuple[Optional[str], str], EmbeddingBatcher] = {}
+
+def get_embedding_batcher(api_key: Optional[str] = None, model: str = "embedding-001") -> EmbeddingBatcher:
+    """
+    Get or create the shared embedding batcher for an API key and model.
+    
+    Args:
+        api_key: Gemini API key (optional if set in environment)
+        model: Gemini embedding model to use
+        
+    Returns:
+        EmbeddingBatcher instance
+    """
+    key = (api_key, model)
+    if key not in _embedding_batchers:
+        _embedding_batchers[key] = EmbeddingBatcher(api_key=api_key, model=model)
+    return _embedding_batchers[key]
+
 # Convenience functions for backward compatibility
 async def generate_embeddings(text_chunks: List[str], api_key: Optional[str] = None, 
                             model: str = "text-embedding-004") -> Dict[str, Any]:
@@ -495,8 +780,7 @@ async def generate_embeddings(text_chunks: List[str], api_key: Optional[str] = N
     Returns:
         Dictionary containing embeddings and metadata
     """
-    embedder = GeminiVectorEmbedder(api_key=api_key, model=model)
-    return await embedder.generate_embeddings(text_chunks)
+    return await get_embedder(api_key=api_key, model=model).generate_embeddings(text_chunks)
 
 async def embed_document_chunks(document_result: Dict[str, Any], api_key: Optional[str] = None,
                                model: str = "text-embedding-004") -> Dict[str, Any]:
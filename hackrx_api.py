@@ -380,7 +380,7 @@ class DocumentQAPipeline:
             search_results = self.vector_store.similarity_search(
                 query_embedding=query_embedding,
                 k=5,  # Get top 5 most relevant chunks
-                score_threshold=1.5  # Adjust threshold as needed
+                score_threshold=0.25  # Minimum cosine similarity, adjust as needed
             )
             
             if not search_results:
@@ -710,7 +710,7 @@ class DocumentQAPipelineFixed:
                 search_results = self.vector_store.similarity_search(
                     query_embedding=query_embedding,
                     k=3,
-                    score_threshold=1.5
+                    score_threshold=0.25
                 )
                 
                 if not search_results:
@@ -718,7 +718,7 @@ class DocumentQAPipelineFixed:
                     search_results = self.vector_store.similarity_search(
                         query_embedding=query_embedding,
                         k=5,
-                        score_threshold=2.0  # More lenient threshold
+                        score_threshold=0.0  # More lenient threshold
                     )
                 
                 if not search_results:
@@ -4,7 +4,9 @@
 import os
 import sys
 import asyncio
+import heapq
 import re
+from operator import itemgetter
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 
@@ -236,8 +238,7 @@ class InsuranceClaimAnalyzer:
                         })
         
         # Sort by relevance score and take top results
-        all_relevant_chunks.sort(key=lambda x: x['score'], reverse=True)
-        top_chunks = all_relevant_chunks[:10]  # Top 10 most relevant
+        top_chunks = heapq.nlargest(10, all_relevant_chunks, key=itemgetter('score'))  # Top 10 most relevant
         
         print(f"✅ Found {len(top_chunks)} highly relevant policy sections")
         
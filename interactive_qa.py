@@ -133,7 +133,7 @@ try:
                 search_results = self.vector_store.similarity_search(
                     query_embedding=query_embedding,
                     k=k,
-                    score_threshold=2.5  # L2 distance threshold
+                    score_threshold=-0.25  # Cosine similarity threshold
                 )
                 
                 if not search_results:
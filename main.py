@@ -4,13 +4,14 @@ import httpx
 import tempfile
 import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import asyncio
 import hashlib
+from contextlib import asynccontextmanager
 import numpy as np
 from robust_document_parser import RobustDocumentParser
 # Import old working embedder for now
-from gemini_vector_embedder import generate_embeddings, embed_document_chunks
+from gemini_vector_embedder import generate_embeddings, embed_document_chunks, get_embedding_batcher, close_embedders
 from faiss_store import get_vector_store, reset_vector_store
 from dotenv import load_dotenv
 from advanced_search import advanced_similarity_search, multi_query_search, search_with_context
@@ -57,7 +58,13 @@ def parse_document(file_path: str, min_chunk_words: int = 100, max_chunk_words:
             "file_path": file_path
         }
 
-app = FastAPI(title="Document Processing API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the pooled embedding HTTP sessions when the server stops"""
+    yield
+    await close_embedders()
+
+app = FastAPI(title="Document Processing API", version="1.0.0", lifespan=lifespan)
 
 async def generate_query_embedding(
     query_text: str,
@@ -77,12 +84,8 @@ async def generate_query_embedding(
         Dictionary containing the embedding vector and metadata
     """
     try:
-        # First try Gemini API
-        embedding_result = await generate_embeddings(
-            text_chunks=[query_text],
-            api_key=api_key,
-            model=model
-        )
+        # First try Gemini API; concurrent queries share one batched request
+        embedding_result = await get_embedding_batcher(api_key=api_key, model=model).embed(query_text)
         
         if not embedding_result.get("success", True):
             error_msg = embedding_result.get("error", "Failed to generate query embedding")
@@ -192,6 +195,103 @@ async def generate_mock_query_embedding_fallback(
             "metadata": None
         }
 
+async def query_documents_by_vector(
+    user_question: str,
+    query_embedding: Union[List[float], np.ndarray],
+    k: int = 5,
+    score_threshold: Optional[float] = None,
+    filter_doc_ids: Optional[List[str]] = None,
+    filter_doc_types: Optional[List[str]] = None,
+    api_key: Optional[str] = None,
+    answer_model: str = "gemini-2.0-flash-exp",
+    max_tokens: int = 1000,
+    temperature: float = 0.3
+) -> Dict[str, Any]:
+    """
+    Answer a question from the indexed documents using an already computed query embedding.
+    Lets callers that embed many questions in one batch skip the per-question embedding call.
+    
+    Args:
+        user_question: Question text passed to the answer model
+        query_embedding: Embedding vector of the question
+        k: Number of chunks to retrieve
+        score_threshold: Minimum cosine similarity for retrieved chunks
+        filter_doc_ids: Only search these documents
+        filter_doc_types: Only search these file types
+        api_key: Optional Gemini API key (uses environment variable if not provided)
+        answer_model: Gemini model used to generate the answer
+        max_tokens: Maximum tokens in the answer
+        temperature: Sampling temperature for the answer
+    
+    Returns:
+        Dictionary with status, answer, rationale, sources and search results
+    """
+    # Step 1: Search for relevant document chunks
+    search_result = await advanced_similarity_search(
+        query=query_embedding,
+        k=k,
+        score_threshold=score_threshold,
+        filter_doc_ids=filter_doc_ids,
+        filter_doc_types=filter_doc_types,
+        deduplicate=True,
+        include_metadata=True
+    )
+    
+    if not search_result.get("results"):
+        return {
+            "status": "success",
+            "user_question": user_question,
+            "answer": "I couldn't find any relevant information in the indexed documents to answer your question.",
+            "rationale": "No matching document content was found in the vector search.",
+            "source_chunks": "No sources available",
+            "search_results": []
+        }
+    
+    # Step 2: Combine relevant text from search results
+    relevant_clauses = []
+    for result in search_result["results"]:
+        clause = f"[Document: {result['metadata']['file_path']}, Chunk {result['metadata']['chunk_index']}]\n{result['text']}"
+        relevant_clauses.append(clause)
+    
+    combined_clauses = "\n\n".join(relevant_clauses)
+    
+    # Step 3: Get intelligent answer from Gemini
+    answer_result = await get_gemini_answer_async(
+        user_question=user_question,
+        relevant_clauses=combined_clauses,
+        api_key=api_key,
+        model=answer_model,
+        max_tokens=max_tokens,
+        temperature=temperature
+    )
+    
+    if not answer_result.get("success"):
+        return {
+            "status": "partial_success",
+            "user_question": user_question,
+            "answer": "I found relevant documents but couldn't generate a structured answer.",
+            "rationale": f"Gemini API error: {answer_result.get('error')}",
+            "source_chunks": combined_clauses[:500] + "..." if len(combined_clauses) > 500 else combined_clauses,
+            "search_results": search_result["results"],
+            "error": answer_result.get("error")
+        }
+    
+    return {
+        "status": "success",
+        "user_question": user_question,
+        "answer": answer_result["answer"],
+        "rationale": answer_result["rationale"],
+        "source_chunks": answer_result["source_chunks"],
+        "search_results": search_result["results"],
+        "analytics": {
+            "search_time_ms": search_result.get("analytics", {}).get("search_time_ms", 0),
+            "documents_searched": search_result.get("analytics", {}).get("total_documents", 0),
+            "relevant_chunks_found": len(search_result["results"]),
+            "tokens_used": answer_result.get("tokens_used", 0),
+            "answer_model": answer_model
+        }
+    }
+
 class UploadRequest(BaseModel):
     documents: List[HttpUrl]
 
@@ -951,13 +1051,13 @@ async def search_similar_chunks_endpoint(
     Core function: Search the FAISS index for the top-N most similar chunks to a given query vector.
     
     This is the main similarity search function that finds the most relevant document chunks
-    based on vector similarity using L2 distance in the FAISS index.
+    based on cosine similarity (inner product of unit vectors) in the FAISS index.
     
     Args:
         query_embedding: Pre-computed embedding vector (768 dimensions for Gemini)
         k: Number of top similar results to return
-        score_threshold: Maximum similarity score (lower is better for L2 distance)
-        min_score_threshold: Minimum similarity score for inclusion
+        score_threshold: Minimum cosine similarity for a candidate (higher is better)
+        min_score_threshold: Minimum cosine similarity for inclusion after type filtering
         filter_doc_ids: Optional list of document IDs to restrict search to
         filter_doc_types: Optional list of document types to filter by
         boost_recent: Whether to boost more recently added documents
@@ -1083,76 +1183,24 @@ async def ask_question_endpoint(request: QuestionAnswerRequest):
         
         query_embedding = embedding_result["embedding"]
         
-        # Step 2: Search for relevant document chunks
-        search_result = await advanced_similarity_search(
-            query=query_embedding,
+        # Steps 2-5: Search, combine relevant chunks and generate the answer
+        response = await query_documents_by_vector(
+            user_question=request.user_question,
+            query_embedding=query_embedding,
             k=request.k,
             score_threshold=request.score_threshold,
             filter_doc_ids=request.filter_doc_ids,
             filter_doc_types=request.filter_doc_types,
-            deduplicate=True,
-            include_metadata=True
-        )
-        
-        if not search_result.get("results"):
-            return {
-                "status": "success",
-                "user_question": request.user_question,
-                "answer": "I couldn't find any relevant information in the indexed documents to answer your question.",
-                "rationale": "No matching document content was found in the vector search.",
-                "source_chunks": "No sources available",
-                "search_results": [],
-                "embedding_metadata": embedding_result["metadata"]
-            }
-        
-        # Step 3: Combine relevant text from search results
-        relevant_clauses = []
-        for result in search_result["results"]:
-            clause = f"[Document: {result['metadata']['file_path']}, Chunk {result['metadata']['chunk_index']}]\n{result['text']}"
-            relevant_clauses.append(clause)
-        
-        combined_clauses = "\n\n".join(relevant_clauses)
-        
-        # Step 4: Get intelligent answer from Gemini
-        answer_result = await get_gemini_answer_async(
-            user_question=request.user_question,
-            relevant_clauses=combined_clauses,
             api_key=request.api_key,
-            model=request.answer_model,
+            answer_model=request.answer_model,
             max_tokens=request.max_tokens,
             temperature=request.temperature
         )
         
-        if not answer_result.get("success"):
-            return {
-                "status": "partial_success",
-                "user_question": request.user_question,
-                "answer": "I found relevant documents but couldn't generate a structured answer.",
-                "rationale": f"Gemini API error: {answer_result.get('error')}",
-                "source_chunks": combined_clauses[:500] + "..." if len(combined_clauses) > 500 else combined_clauses,
-                "search_results": search_result["results"],
-                "embedding_metadata": embedding_result["metadata"],
-                "error": answer_result.get("error")
-            }
-        
-        # Step 5: Return comprehensive response
-        return {
-            "status": "success",
-            "user_question": request.user_question,
-            "answer": answer_result["answer"],
-            "rationale": answer_result["rationale"],
-            "source_chunks": answer_result["source_chunks"],
-            "search_results": search_result["results"],
-            "analytics": {
-                "search_time_ms": search_result.get("analytics", {}).get("search_time_ms", 0),
-                "documents_searched": search_result.get("analytics", {}).get("total_documents", 0),
-                "relevant_chunks_found": len(search_result["results"]),
-                "tokens_used": answer_result.get("tokens_used", 0),
-                "embedding_model": request.embedding_model,
-                "answer_model": request.answer_model
-            },
-            "embedding_metadata": embedding_result["metadata"]
-        }
+        if "analytics" in response:
+            response["analytics"]["embedding_model"] = request.embedding_model
+        response["embedding_metadata"] = embedding_result["metadata"]
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in question answering: {str(e)}")
@@ -1710,7 +1758,7 @@ async def hackrx_run(
                 search_results = await advanced_similarity_search(
                     query_text=question,
                     top_k=5,
-                    score_threshold=0.6,
+                    score_threshold=0.7,
                     search_strategy="comprehensive"
                 )
                 
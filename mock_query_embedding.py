@@ -29,16 +29,15 @@ def generate_mock_query_embedding(
         # This ensures the same text always produces the same embedding
         text_hash = hashlib.md5(query_text.encode()).hexdigest()
         
-        # Use the hash to seed a random number generator for consistency
-        seed = int(text_hash[:8], 16)
-        np.random.seed(seed)
+        # Use the hash to seed a dedicated random number generator for consistency
+        rng = np.random.default_rng(int(text_hash[:8], 16))
         
-        # Generate a mock 1536-dimensional embedding (same as text-embedding-3-small)
-        mock_embedding = np.random.randn(1536).tolist()
+        # Generate a mock 1536-dimensional embedding (same as text-embedding-3-small) in one draw
+        mock_embedding = rng.standard_normal(1536, dtype=np.float32)
         
-        # Normalize to unit vector (common practice for embeddings)
-        norm = np.linalg.norm(mock_embedding)
-        mock_embedding = (np.array(mock_embedding) / norm).tolist()
+        # Normalize to unit vector (common practice for embeddings), converting to a list once
+        mock_embedding /= np.linalg.norm(mock_embedding)
+        mock_embedding = mock_embedding.tolist()
         
         # Estimate token count (rough approximation)
         estimated_tokens = len(query_text.split()) + 2
@@ -70,7 +69,7 @@ def create_demo_faiss_index():
         from faiss_store import FAISSVectorStore
         
         # Create vector store
-        vector_store = FAISSVectorStore(dimension=1536, index_type="flat")
+        vector_store = FAISSVectorStore(dimension=1536, index_type="auto")  # exact search, HNSW once the corpus grows
         
         # Sample documents
         sample_docs = [
@@ -0,0 +1,136 @@
+"""
+Numba Kernels for Query Preparation and Chunk Planning
+Normalizes query embeddings and plans greedy chunk boundaries in compiled loops
+"""
+
+import logging
+from typing import List, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Try to import numba for jitted normalization kernels
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+    logger.info("numba available for query preparation and chunk planning kernels")
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.warning("numba not available. Falling back to NumPy and pure-Python kernels. Install with: pip install numba")
+
+# Actions returned by plan_greedy_chunks for each text piece
+CHUNK_APPEND = 0    # Append the piece to the current chunk
+CHUNK_RESET = 1     # Start a new current chunk with the piece
+CHUNK_ISOLATE = 2   # Emit the oversized piece on its own, leaving the current chunk as is
+
+# Below this many pieces a cold process plans faster in Python than through numba's first-call dispatch
+JIT_MIN_PIECES = 50000
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _normalize_rows_inplace(matrix):
+        """Scale each row of a float32 matrix to unit L2 norm in place, skipping zero rows"""
+        for row in range(matrix.shape[0]):
+            total = 0.0
+            for i in range(matrix.shape[1]):
+                total += matrix[row, i] * matrix[row, i]
+            if total > 0.0:
+                inv_norm = 1.0 / np.sqrt(total)
+                for i in range(matrix.shape[1]):
+                    matrix[row, i] *= inv_norm
+else:
+    def _normalize_rows_inplace(matrix):
+        """Scale each row of a float32 matrix to unit L2 norm in place, skipping zero rows"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+
+def prepare_query_matrix(embeddings: Union[Sequence[List[float]], np.ndarray]) -> np.ndarray:
+    """
+    Convert query embeddings to a C-contiguous float32 matrix of unit rows.
+
+    The embeddings are copied once into a new float32 array, which is
+    then normalized in place, so the caller's data is never modified.
+
+    Args:
+        embeddings: One embedding or a sequence of embeddings (lists or arrays)
+
+    Returns:
+        float32 array of shape (n_queries, dimension) with unit-length rows
+    """
+    matrix = np.array(embeddings, dtype=np.float32, ndmin=2, order="C")
+    _normalize_rows_inplace(matrix)
+    return matrix
+
+
+def _plan_greedy_chunks(word_counts, tokens_per_word, max_tokens, min_tokens, isolate_oversized):
+    """
+    Plan greedy chunk boundaries from per-piece word counts.
+    
+    Pieces are accumulated while the estimated token count of the joined
+    chunk, int(words * tokens_per_word), stays within max_tokens. Word
+    counts add up across whitespace separators, so each candidate chunk is
+    measured in O(1) instead of re-splitting the growing text.
+    
+    Args:
+        word_counts: Word counts (int64 array or list), one per non-empty piece
+        tokens_per_word: Word-to-token ratio of the token estimate
+        max_tokens: Maximum estimated tokens per chunk
+        min_tokens: Minimum estimated tokens for the current chunk to be emitted
+        isolate_oversized: Emit pieces over max_tokens on their own (CHUNK_ISOLATE)
+        
+    Returns:
+        Tuple of (emit_before, actions): whether the current chunk is emitted
+        before handling each piece, and the CHUNK_* action for the piece
+    """
+    n = len(word_counts)
+    emit_before = np.zeros(n, dtype=np.bool_)
+    actions = np.zeros(n, dtype=np.int8)
+    current_words = 0
+    
+    for i in range(n):
+        words = word_counts[i]
+        if int((current_words + words) * tokens_per_word) <= max_tokens:
+            actions[i] = CHUNK_APPEND
+            current_words += words
+        else:
+            if current_words > 0 and int(current_words * tokens_per_word) >= min_tokens:
+                emit_before[i] = True
+            if isolate_oversized and int(words * tokens_per_word) > max_tokens:
+                actions[i] = CHUNK_ISOLATE
+            else:
+                actions[i] = CHUNK_RESET
+                current_words = words
+    
+    return emit_before, actions
+
+
+if NUMBA_AVAILABLE:
+    _plan_greedy_chunks_jit = njit(cache=True)(_plan_greedy_chunks)
+
+
+def plan_greedy_chunks(word_counts: np.ndarray, tokens_per_word: float, max_tokens: int,
+                       min_tokens: int, isolate_oversized: bool):
+    """
+    Plan greedy chunk boundaries, using the jitted kernel when it pays off.
+    
+    The kernel runs when it is already compiled in this process or the
+    input is large; otherwise the same loop runs in Python over a list,
+    which avoids numba's first-call overhead for typical documents.
+    
+    Args:
+        word_counts: int64 array of word counts, one per non-empty piece
+        tokens_per_word: Word-to-token ratio of the token estimate
+        max_tokens: Maximum estimated tokens per chunk
+        min_tokens: Minimum estimated tokens for the current chunk to be emitted
+        isolate_oversized: Emit pieces over max_tokens on their own
+        
+    Returns:
+        Tuple of (emit_before, actions) arrays, see _plan_greedy_chunks
+    """
+    if NUMBA_AVAILABLE and (len(word_counts) >= JIT_MIN_PIECES or _plan_greedy_chunks_jit.signatures):
+        return _plan_greedy_chunks_jit(word_counts, tokens_per_word, max_tokens, min_tokens, isolate_oversized)
+    return _plan_greedy_chunks(word_counts.tolist(), tokens_per_word, max_tokens, min_tokens, isolate_oversized)
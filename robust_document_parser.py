@@ -5,12 +5,18 @@ Supports PyMuPDF (fitz), pdfplumber, PyPDF2 with fallback mechanisms
 
 import os
 import re
+import time
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import json
 from datetime import datetime
 
+import numpy as np
+
+from numba_kernels import CHUNK_APPEND, CHUNK_ISOLATE, CHUNK_RESET, plan_greedy_chunks
+
 # Configure detailed logging
 logging.basicConfig(
     level=logging.INFO,
@@ -66,6 +72,73 @@ except ImportError:
     logger.warning("python-docx not available. Install with: pip install python-docx")
 
 
+def _extract_page_range(lib_name: str, file_path: str, start: int, end: int) -> List[Optional[str]]:
+    """
+    Extract the text of pages [start, end) of a PDF with one library.
+    
+    Runs inside worker processes, so the document is opened here instead
+    of being passed in.
+    
+    Args:
+        lib_name: PDF library to use ('pymupdf', 'pdfplumber' or 'pypdf2')
+        file_path: Path to the PDF file
+        start: First page index (0-based)
+        end: Page index to stop before
+        
+    Returns:
+        Text per page in page order; None for pages that raised during extraction
+    """
+    def extract(page_num, get_text):
+        try:
+            return get_text()
+        except Exception as e:
+            logger.warning(f"Error extracting text from page {page_num + 1}: {e}")
+            return None
+    
+    if lib_name == 'pymupdf':
+        doc = fitz.open(file_path)
+        try:
+            return [extract(page_num, lambda: doc[page_num].get_text()) for page_num in range(start, end)]
+        finally:
+            doc.close()
+    elif lib_name == 'pdfplumber':
+        with pdfplumber.open(file_path) as pdf:
+            return [extract(page_num, pdf.pages[page_num].extract_text) for page_num in range(start, end)]
+    elif lib_name == 'pypdf2':
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            return [extract(page_num, pdf_reader.pages[page_num].extract_text) for page_num in range(start, end)]
+    
+    raise ValueError(f"Unsupported PDF library: {lib_name}")
+
+
+def alphabetic_ratio(text: str) -> float:
+    """
+    Fraction of characters in text that are letters or whitespace.
+    
+    The text is viewed as an array of code points and tallied with
+    np.unique, so only the distinct characters (typically ~100) are
+    classified in Python instead of every character of the document.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Ratio between 0 and 1 (0 for empty text)
+    """
+    if not text:
+        return 0
+    code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    distinct, counts = np.unique(code_points, return_counts=True)
+    matching = sum(count for code, count in zip(distinct.tolist(), counts.tolist())
+                   if chr(code).isalpha() or chr(code).isspace())
+    return matching / len(text)
+
+
+# Word-to-token ratio of the approximate token estimate (typical for English text)
+WORD_TOKEN_RATIO = 1.3
+
+
 def estimate_tokens(text: str) -> int:
     """
     Estimate token count for text using tiktoken if available, otherwise use approximation.
@@ -85,9 +158,51 @@ def estimate_tokens(text: str) -> int:
         except Exception as e:
             logger.warning(f"tiktoken encoding failed: {e}, falling back to approximation")
     
-    # Fallback: approximate tokens as words * 1.3 (typical ratio for English text)
+    # Fallback: approximate tokens from the word count
     word_count = len(text.split())
-    return int(word_count * 1.3)
+    return int(word_count * WORD_TOKEN_RATIO)
+
+
+def _word_counts_are_additive() -> bool:
+    """Whether estimate_tokens is word-based, so joined pieces can be measured from summed word counts"""
+    return not (TIKTOKEN_AVAILABLE and TOKEN_ENCODER)
+
+
+def _planned_chunks(pieces: List[str], max_tokens: int, min_tokens: int,
+                    isolate_oversized: bool, separator: str) -> List[str]:
+    """
+    Greedily join pieces into chunks using word counts computed once per piece.
+    
+    Args:
+        pieces: Stripped, non-empty text pieces in order
+        max_tokens: Maximum estimated tokens per chunk
+        min_tokens: Minimum estimated tokens for a chunk to be kept when a new one starts
+        isolate_oversized: Emit pieces over max_tokens on their own
+        separator: Whitespace used to join pieces
+        
+    Returns:
+        List of chunk texts
+    """
+    word_counts = np.fromiter((len(piece.split()) for piece in pieces), dtype=np.int64, count=len(pieces))
+    emit_before, actions = plan_greedy_chunks(word_counts, WORD_TOKEN_RATIO, max_tokens, min_tokens, isolate_oversized)
+    
+    chunks = []
+    current = []
+    for piece, emit, action in zip(pieces, emit_before.tolist(), actions.tolist()):
+        if emit:
+            chunks.append(separator.join(current))
+        if action == CHUNK_APPEND:
+            current.append(piece)
+        elif action == CHUNK_RESET:
+            current = [piece]
+        else:
+            logger.warning(f"Single sentence too large ({estimate_tokens(piece)} tokens), will be character-split")
+            chunks.append(piece)
+    
+    if current:
+        chunks.append(separator.join(current))
+    
+    return chunks
 
 
 def split_text_recursively(text: str, max_tokens: int = 2000, min_tokens: int = 100) -> List[str]:
@@ -165,16 +280,16 @@ def _split_by_sentences(text: str, max_tokens: int, min_tokens: int) -> List[str
     """Split text by sentences, respecting token limits."""
     # Enhanced sentence splitting regex that handles various punctuation
     sentence_endings = r'(?<=[.!?])\s+(?=[A-Z])'
-    sentences = re.split(sentence_endings, text)
+    sentences = [sentence.strip() for sentence in re.split(sentence_endings, text)]
+    sentences = [sentence for sentence in sentences if sentence]
+    
+    if _word_counts_are_additive():
+        return _planned_chunks(sentences, max_tokens, min_tokens, isolate_oversized=True, separator=" ")
     
     chunks = []
     current_chunk = ""
     
     for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        
         # Check if adding this sentence would exceed the token limit
         potential_chunk = current_chunk + " " + sentence if current_chunk else sentence
         potential_tokens = estimate_tokens(potential_chunk)
@@ -240,17 +355,19 @@ def _split_by_characters(text: str, max_tokens: int) -> List[str]:
 
 def _combine_small_chunks(chunks: List[str], max_tokens: int, min_tokens: int) -> List[str]:
     """Combine small chunks together to reach minimum size while respecting maximum."""
+    chunks = [chunk.strip() for chunk in chunks]
+    chunks = [chunk for chunk in chunks if chunk]
     if not chunks:
         return []
     
+    if _word_counts_are_additive():
+        # Small chunks are always kept when a new combination starts
+        return _planned_chunks(chunks, max_tokens, 0, isolate_oversized=False, separator="\n\n")
+    
     combined_chunks = []
     current_combined = ""
     
     for chunk in chunks:
-        chunk = chunk.strip()
-        if not chunk:
-            continue
-        
         # Try to combine with current chunk
         potential_combined = current_combined + "\n\n" + chunk if current_combined else chunk
         potential_tokens = estimate_tokens(potential_combined)
@@ -316,7 +433,7 @@ class RobustDocumentParser:
     """Robust document parser with advanced chunking and comprehensive error handling."""
     
     def __init__(self, min_chunk_tokens: int = 100, max_chunk_tokens: int = 2000, 
-                 target_chunk_tokens: int = 1000):
+                 target_chunk_tokens: int = 1000, num_workers: int = 1):
         """
         Initialize parser with token-based chunking parameters.
         
@@ -324,10 +441,12 @@ class RobustDocumentParser:
             min_chunk_tokens: Minimum tokens per chunk
             max_chunk_tokens: Maximum tokens per chunk (safety limit)
             target_chunk_tokens: Target tokens per chunk for optimal processing
+            num_workers: Processes used to extract PDF page text (1 extracts in-process)
         """
         self.min_chunk_tokens = min_chunk_tokens
         self.max_chunk_tokens = max_chunk_tokens
         self.target_chunk_tokens = target_chunk_tokens
+        self.num_workers = max(1, num_workers or 1)
         
         self.parsing_stats = {
             'total_files_processed': 0,
@@ -473,32 +592,19 @@ class RobustDocumentParser:
             metadata["pages"] = doc.page_count
             
             logger.info(f"PDF has {doc.page_count} pages")
-            
-            for page_num in range(doc.page_count):
-                try:
-                    page = doc[page_num]
-                    page_text = page.get_text()
-                    
-                    if page_text and len(page_text.strip()) > 0:
-                        text_content += f"\n--- Page {page_num + 1} ---\n"
-                        text_content += page_text
-                        logger.debug(f"Extracted {len(page_text)} characters from page {page_num + 1}")
-                    else:
-                        logger.warning(f"Page {page_num + 1} contains no extractable text")
-                        
-                except Exception as e:
-                    logger.warning(f"Error extracting text from page {page_num + 1}: {e}")
-                    continue
-            
             doc.close()
             
+            text_content = self._extract_pdf_text('pymupdf', file_path, metadata)
+            
         except Exception as e:
             raise Exception(f"PyMuPDF parsing error: {e}")
         
         if not text_content.strip():
             raise Exception("No text content extracted from PDF")
         
+        chunking_start = time.perf_counter()
         chunks = self._split_into_chunks(text_content, str(file_path))
+        metadata["chunking_seconds"] = time.perf_counter() - chunking_start
         
         return {
             "file_path": str(file_path),
@@ -523,29 +629,18 @@ class RobustDocumentParser:
                 metadata["pages"] = len(pdf.pages)
                 
                 logger.info(f"PDF has {len(pdf.pages)} pages")
-                
-                for page_num, page in enumerate(pdf.pages):
-                    try:
-                        page_text = page.extract_text()
-                        
-                        if page_text and len(page_text.strip()) > 0:
-                            text_content += f"\n--- Page {page_num + 1} ---\n"
-                            text_content += page_text
-                            logger.debug(f"Extracted {len(page_text)} characters from page {page_num + 1}")
-                        else:
-                            logger.warning(f"Page {page_num + 1} contains no extractable text")
-                            
-                    except Exception as e:
-                        logger.warning(f"Error extracting text from page {page_num + 1}: {e}")
-                        continue
-                        
+            
+            text_content = self._extract_pdf_text('pdfplumber', file_path, metadata)
+            
         except Exception as e:
             raise Exception(f"pdfplumber parsing error: {e}")
         
         if not text_content.strip():
             raise Exception("No text content extracted from PDF")
         
+        chunking_start = time.perf_counter()
         chunks = self._split_into_chunks(text_content, str(file_path))
+        metadata["chunking_seconds"] = time.perf_counter() - chunking_start
         
         return {
             "file_path": str(file_path),
@@ -571,29 +666,18 @@ class RobustDocumentParser:
                 metadata["pages"] = len(pdf_reader.pages)
                 
                 logger.info(f"PDF has {len(pdf_reader.pages)} pages")
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        
-                        if page_text and len(page_text.strip()) > 0:
-                            text_content += f"\n--- Page {page_num + 1} ---\n"
-                            text_content += page_text
-                            logger.debug(f"Extracted {len(page_text)} characters from page {page_num + 1}")
-                        else:
-                            logger.warning(f"Page {page_num + 1} contains no extractable text")
-                            
-                    except Exception as e:
-                        logger.warning(f"Error extracting text from page {page_num + 1}: {e}")
-                        continue
-                        
+            
+            text_content = self._extract_pdf_text('pypdf2', file_path, metadata)
+            
         except Exception as e:
             raise Exception(f"PyPDF2 parsing error: {e}")
         
         if not text_content.strip():
             raise Exception("No text content extracted from PDF")
         
+        chunking_start = time.perf_counter()
         chunks = self._split_into_chunks(text_content, str(file_path))
+        metadata["chunking_seconds"] = time.perf_counter() - chunking_start
         
         return {
             "file_path": str(file_path),
@@ -606,6 +690,50 @@ class RobustDocumentParser:
             "metadata": metadata
         }
     
+    def _extract_pdf_text(self, lib_name: str, file_path: Path, metadata: Dict[str, Any]) -> str:
+        """
+        Extract page text in page order, spreading pages across worker processes.
+        
+        Pages are split into one contiguous range per worker; with a single
+        worker (or a single page) extraction runs in-process.
+        
+        Args:
+            lib_name: PDF library to use
+            file_path: Path to the PDF file
+            metadata: Result metadata with the page count; extraction timing is added to it
+            
+        Returns:
+            Concatenated text with a marker before each non-empty page
+        """
+        extraction_start = time.perf_counter()
+        page_count = metadata["pages"]
+        workers = min(self.num_workers, page_count)
+        
+        if workers > 1:
+            pages_per_worker = -(-page_count // workers)
+            ranges = [(start, min(start + pages_per_worker, page_count))
+                      for start in range(0, page_count, pages_per_worker)]
+            with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(_extract_page_range, lib_name, str(file_path), start, end)
+                           for start, end in ranges]
+                page_texts = [text for future in futures for text in future.result()]
+        else:
+            page_texts = _extract_page_range(lib_name, str(file_path), 0, page_count)
+        
+        parts = []
+        for page_num, page_text in enumerate(page_texts):
+            if page_text and len(page_text.strip()) > 0:
+                parts.append(f"\n--- Page {page_num + 1} ---\n")
+                parts.append(page_text)
+                logger.debug(f"Extracted {len(page_text)} characters from page {page_num + 1}")
+            elif page_text is not None:
+                logger.warning(f"Page {page_num + 1} contains no extractable text")
+        
+        metadata["text_extraction_seconds"] = time.perf_counter() - extraction_start
+        metadata["extraction_workers"] = workers
+        logger.info(f"Extracted {page_count} pages with {workers} worker(s) in {metadata['text_extraction_seconds']:.2f}s")
+        return "".join(parts)
+    
     def _parse_docx_robust(self, file_path: Path) -> Dict[str, Any]:
         """Parse DOCX file with comprehensive error handling."""
         if not DOCX_AVAILABLE:
@@ -734,7 +862,7 @@ class RobustDocumentParser:
             return False
         
         # Check for mostly gibberish (low alphabetic ratio)
-        alpha_ratio = sum(c.isalpha() or c.isspace() for c in raw_text) / len(raw_text)
+        alpha_ratio = alphabetic_ratio(raw_text)
         if alpha_ratio < 0.5:
             logger.warning(f"Text quality poor, alphabetic ratio: {alpha_ratio:.2f}")
             return False
@@ -915,7 +1043,7 @@ class RobustDocumentParser:
             'total_words': len(result['raw_text'].split()),
             'valid_chunks': len(valid_chunks),
             'avg_chunk_words': sum(chunk.get('word_count', 0) for chunk in valid_chunks) / len(valid_chunks) if valid_chunks else 0,
-            'alphabetic_ratio': sum(c.isalpha() or c.isspace() for c in result['raw_text']) / len(result['raw_text']) if result['raw_text'] else 0
+            'alphabetic_ratio': alphabetic_ratio(result['raw_text'])
         }
         
         logger.info(f"Extraction quality: {result['extraction_quality']}")
@@ -931,9 +1059,33 @@ class RobustDocumentParser:
         }
 
 
+def chunk_columns(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert chunk dictionaries to column arrays (structure of arrays).
+    
+    Statistics and filters over chunks then run as NumPy operations on
+    contiguous int32 columns instead of dictionary lookups per chunk.
+    
+    Args:
+        chunks: Chunk dictionaries as produced by DocumentChunk.to_dict()
+        
+    Returns:
+        Dictionary with int32 arrays 'chunk_id', 'token_count', 'word_count'
+        and 'char_count', and the chunk texts as a list under 'text'
+    """
+    count = len(chunks)
+    return {
+        'chunk_id': np.fromiter((chunk.get('chunk_id', 0) for chunk in chunks), dtype=np.int32, count=count),
+        'token_count': np.fromiter((chunk.get('token_count', 0) for chunk in chunks), dtype=np.int32, count=count),
+        'word_count': np.fromiter((chunk.get('word_count', 0) for chunk in chunks), dtype=np.int32, count=count),
+        'char_count': np.fromiter((chunk.get('char_count', 0) for chunk in chunks), dtype=np.int32, count=count),
+        'text': [chunk.get('text', '') for chunk in chunks]
+    }
+
+
 # Factory function for backward compatibility
 def parse_document(file_path: str, min_chunk_tokens: int = 100, max_chunk_tokens: int = 2000, 
-                  target_chunk_tokens: int = 1000, **kwargs) -> Dict[str, Any]:
+                  target_chunk_tokens: int = 1000, num_workers: int = 1, **kwargs) -> Dict[str, Any]:
     """
     Parse a document file with robust error handling and advanced chunking.
     
@@ -942,28 +1094,34 @@ def parse_document(file_path: str, min_chunk_tokens: int = 100, max_chunk_tokens
         min_chunk_tokens: Minimum tokens per chunk (default: 100)
         max_chunk_tokens: Maximum tokens per chunk (default: 2000, safe for most embedding models)
         target_chunk_tokens: Target tokens per chunk for optimal processing (default: 1000)
+        num_workers: Processes used to extract PDF pages in parallel (default: 1)
         
     Returns:
-        Dictionary containing extracted text, chunks, and metadata with token information
+        Dictionary containing extracted text, chunks (also as columns under
+        'chunks_soa'), and metadata with token information
     """
-    parser = RobustDocumentParser(min_chunk_tokens, max_chunk_tokens, target_chunk_tokens)
+    parser = RobustDocumentParser(min_chunk_tokens, max_chunk_tokens, target_chunk_tokens, num_workers)
     result = parser.parse_file(file_path)
     
-    # Add token statistics to result
+    # Add column view and token statistics to result
     if 'chunks' in result:
-        token_counts = [chunk.get('token_count', 0) for chunk in result['chunks']]
+        columns = chunk_columns(result['chunks'])
+        result['chunks_soa'] = columns
+        result['n_chunks'] = len(columns['text'])
+        
+        token_counts = columns['token_count']
+        total_tokens = int(token_counts.sum())
         result['token_statistics'] = {
-            'total_tokens': sum(token_counts),
-            'avg_tokens_per_chunk': sum(token_counts) / len(token_counts) if token_counts else 0,
-            'min_tokens_per_chunk': min(token_counts) if token_counts else 0,
-            'max_tokens_per_chunk': max(token_counts) if token_counts else 0,
-            'chunks_over_target': len([t for t in token_counts if t > target_chunk_tokens]),
-            'chunks_under_minimum': len([t for t in token_counts if t < min_chunk_tokens])
+            'total_tokens': total_tokens,
+            'avg_tokens_per_chunk': total_tokens / len(token_counts) if len(token_counts) else 0,
+            'min_tokens_per_chunk': int(token_counts.min()) if len(token_counts) else 0,
+            'max_tokens_per_chunk': int(token_counts.max()) if len(token_counts) else 0,
+            'chunks_over_target': int(np.count_nonzero(token_counts > target_chunk_tokens)),
+            'chunks_under_minimum': int(np.count_nonzero(token_counts < min_chunk_tokens))
         }
     
     return result
 
-
 if __name__ == "__main__":
     # Test the parser
     import sys
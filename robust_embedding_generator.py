@@ -8,6 +8,7 @@ import time
 import logging
 import json
 from typing import List, Dict, Any, Optional, Union, Tuple
+from collections import OrderedDict
 from datetime import datetime
 import hashlib
 import backoff
@@ -20,6 +21,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Translation table deleting control characters other than newline and tab
+CONTROL_CHAR_TABLE = {code: None for code in range(32) if chr(code) not in '\n\t'}
+
+# Query embeddings memoized in memory per generator (least recently used are evicted)
+QUERY_CACHE_SIZE = 1024
+
 # Available embedding providers
 EMBEDDING_PROVIDERS = {}
 
@@ -113,7 +120,8 @@ class RobustEmbeddingGenerator:
                  default_provider: str = "gemini",
                  use_cache: bool = True,
                  max_retries: int = 3,
-                 retry_delay: float = 1.0):
+                 retry_delay: float = 1.0,
+                 cache_dir: str = "embedding_cache"):
         
         self.default_provider = default_provider
         self.use_cache = use_cache
@@ -122,7 +130,9 @@ class RobustEmbeddingGenerator:
         
         # Initialize cache
         if use_cache:
-            self.cache = EmbeddingCache()
+            self.cache = EmbeddingCache(cache_dir)
+        # (query, provider, model) -> query embedding result
+        self._query_cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
         
         # Load environment variables
         self._load_environment()
@@ -549,19 +559,117 @@ class RobustEmbeddingGenerator:
         
         cleaned_query = self._clean_text(query_text)
         
+        cache_key = (cleaned_query, provider or self.default_provider, model)
+        cached = self._get_cached_query(cache_key)
+        if cached is not None:
+            return cached
+        
         logger.info(f"Generating query embedding for: {cleaned_query[:100]}...")
         
         result = self.generate_embeddings([cleaned_query], model, provider, api_key)
         
-        return {
+        query_result = {
             'success': result['success'],
             'embedding': result['embeddings'][0],
             'embedding_dimension': result['embedding_dimension'],
             'query_text': cleaned_query,
             'provider': result['provider'],
             'model': result['model'],
-            'processing_time_seconds': result['processing_time_seconds']
+            'processing_time_seconds': result['processing_time_seconds'],
+            'cached': False
         }
+        self._cache_query(cache_key, query_result)
+        return query_result
+    
+    def generate_query_embeddings(self, 
+                                 query_texts: List[str], 
+                                 model: str = "text-embedding-3-small",
+                                 provider: str = None,
+                                 api_key: str = None) -> Dict[str, Any]:
+        """
+        Generate embeddings for several queries in one provider request.
+        
+        Queries memoized by earlier calls are not sent again.
+        
+        Args:
+            query_texts: Query strings to embed
+            model: Model name for embeddings
+            provider: Embedding provider ('openai', 'gemini', 'sentence_transformers')
+            api_key: Optional API key override
+            
+        Returns:
+            Dictionary with one embedding per query, in input order
+        """
+        if not query_texts:
+            raise ValueError("query_texts cannot be empty")
+        
+        cleaned_queries = []
+        for i, query_text in enumerate(query_texts):
+            if not query_text or not query_text.strip():
+                raise ValueError(f"Query text cannot be empty (query {i})")
+            cleaned_queries.append(self._clean_text(query_text))
+        
+        cache_keys = [(query, provider or self.default_provider, model) for query in cleaned_queries]
+        query_results = [self._get_cached_query(key) for key in cache_keys]
+        missing = [i for i, query_result in enumerate(query_results) if query_result is None]
+        processing_time = 0.0
+        
+        if missing:
+            missing_queries = [cleaned_queries[i] for i in missing]
+            logger.info(f"Generating {len(missing_queries)} query embeddings in one batch "
+                        f"({len(cleaned_queries) - len(missing)} cached)")
+            
+            result = self.generate_embeddings(missing_queries, model, provider, api_key)
+            
+            # generate_embeddings drops texts that are too short, which would misalign the batch
+            if len(result['embeddings']) != len(missing_queries):
+                raise ValueError(f"Expected {len(missing_queries)} query embeddings, got {len(result['embeddings'])}; "
+                                 "queries must have at least 10 characters")
+            
+            processing_time = result['processing_time_seconds']
+            for i, embedding in zip(missing, result['embeddings']):
+                query_results[i] = {
+                    'success': result['success'],
+                    'embedding': embedding,
+                    'embedding_dimension': result['embedding_dimension'],
+                    'query_text': cleaned_queries[i],
+                    'provider': result['provider'],
+                    'model': result['model'],
+                    'processing_time_seconds': processing_time,
+                    'cached': False
+                }
+                self._cache_query(cache_keys[i], query_results[i])
+        
+        return {
+            'success': all(query_result['success'] for query_result in query_results),
+            'embeddings': [query_result['embedding'] for query_result in query_results],
+            'embedding_dimension': query_results[0]['embedding_dimension'],
+            'query_texts': cleaned_queries,
+            'provider': query_results[-1]['provider'],
+            'model': query_results[-1]['model'],
+            'processing_time_seconds': processing_time,
+            'cached': not missing
+        }
+    
+    def _get_cached_query(self, cache_key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a memoized query result marked cached with zero processing time, or None if not memoized."""
+        if not self.use_cache or cache_key not in self._query_cache:
+            return None
+        
+        self._query_cache.move_to_end(cache_key)
+        self.stats['cache_hits'] += 1
+        cached = self._query_cache[cache_key]
+        return {**cached, 'embedding': list(cached['embedding']), 'processing_time_seconds': 0.0, 'cached': True}
+    
+    def _cache_query(self, cache_key: Tuple[str, str, str], query_result: Dict[str, Any]):
+        """Memoize a query embedding result, evicting the least recently used beyond QUERY_CACHE_SIZE."""
+        if not self.use_cache:
+            return
+        
+        self._query_cache[cache_key] = {**query_result, 'embedding': list(query_result['embedding'])}
+        self._query_cache.move_to_end(cache_key)
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
     
     def _clean_text(self, text: str) -> str:
         """Clean and prepare text for embedding."""
@@ -572,7 +680,7 @@ class RobustEmbeddingGenerator:
         text = ' '.join(text.split())
         
         # Remove control characters
-        text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
+        text = text.translate(CONTROL_CHAR_TABLE)
         
         # Truncate if too long (embedding models have token limits)
         max_chars = 8000  # Conservative limit
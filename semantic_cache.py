@@ -0,0 +1,126 @@
+"""
+Semantic Cache for Query Results
+Reuses results of earlier queries whose embeddings are nearly identical (cosine similarity)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from numba_kernels import prepare_query_matrix
+
+
+class SemanticCache:
+    """
+    Bounded LRU cache keyed by query embeddings instead of exact query text.
+
+    A lookup matches the cached query with the highest cosine similarity
+    and returns its value when that similarity reaches the threshold.
+    Cached embeddings live in one preallocated matrix, so a lookup is a
+    single matrix-vector product.
+    """
+
+    def __init__(self, capacity: int = 256, threshold: float = 0.95, ttl_seconds: float = 300.0):
+        """
+        Initialize the cache
+
+        Args:
+            capacity: Maximum number of cached queries (least recently used are evicted)
+            threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Lifetime of a cached entry
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        # slot -> (value, expires_at), least recently used first
+        self._entries: "OrderedDict[int, Tuple[Any, float]]" = OrderedDict()
+        self._free_slots = list(range(capacity - 1, -1, -1))
+        self._vectors: Optional[np.ndarray] = None
+
+    def get(self, embedding: Union[List[float], np.ndarray]) -> Optional[Any]:
+        """
+        Look up the value cached for a semantically equivalent query
+
+        Args:
+            embedding: Query embedding
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        query = prepare_query_matrix(embedding)[0]
+
+        with self._lock:
+            self._evict_expired()
+
+            if self._entries and self._vectors.shape[1] == query.shape[0]:
+                slots = np.fromiter(self._entries.keys(), dtype=np.intp, count=len(self._entries))
+                similarities = self._vectors[slots] @ query
+                best = int(np.argmax(similarities))
+
+                if similarities[best] >= self.threshold:
+                    slot = int(slots[best])
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    return self._entries[slot][0]
+
+            self.misses += 1
+            return None
+
+    def put(self, embedding: Union[List[float], np.ndarray], value: Any):
+        """
+        Cache a value under a query embedding
+
+        Args:
+            embedding: Query embedding
+            value: Value to return for this and similar queries
+        """
+        query = prepare_query_matrix(embedding)[0]
+
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                self._vectors = np.zeros((self.capacity, query.shape[0]), dtype=np.float32)
+                self._entries.clear()
+                self._free_slots = list(range(self.capacity - 1, -1, -1))
+
+            self._evict_expired()
+            if not self._free_slots:
+                slot, _ = self._entries.popitem(last=False)
+                self._free_slots.append(slot)
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = query
+            self._entries[slot] = (value, time.monotonic() + self.ttl_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _evict_expired(self):
+        """Drop entries whose TTL has passed"""
+        now = time.monotonic()
+        expired = [slot for slot, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for slot in expired:
+            del self._entries[slot]
+            self._free_slots.append(slot)
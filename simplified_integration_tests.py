@@ -7,6 +7,7 @@ import os
 import sys
 import logging
 from pathlib import Path
+from collections import Counter
 from typing import List, Dict, Any
 import json
 from datetime import datetime
@@ -412,7 +413,8 @@ def main():
     logger.info("🏁 COMPREHENSIVE TEST SUMMARY")
     logger.info("="*80)
     
-    passed_tests = 0
+    status_counts = Counter(result['status'] for result in test_results.values())
+    passed_tests = status_counts['passed']
     total_tests = len(test_results)
     
     for test_name, result in test_results.items():
@@ -423,8 +425,6 @@ def main():
         logger.info(f"{icon} {test_display}: {status.upper()}")
         
         if status == 'passed':
-            passed_tests += 1
-            
             # Show additional details for PDF parsing
             if test_name == 'pdf_parsing' and 'details' in result:
                 successful_pdfs = sum(1 for r in result['details'].values() if r['status'] == 'success')
@@ -478,7 +478,7 @@ if __name__ == "__main__":
     results = main()
     
     # Exit with appropriate code
-    passed_count = sum(1 for r in results.values() if r['status'] == 'passed')
+    passed_count = Counter(r['status'] for r in results.values())['passed']
     total_count = len(results)
     
     if passed_count == total_count:
@@ -0,0 +1,108 @@
+"""
+SimSIMD Batch Similarity Backend for Brute-Force Vector Search
+Computes query-vs-corpus inner products on int8-quantized vectors with SIMD kernels
+"""
+
+import logging
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Try to import simsimd for hardware-accelerated similarity kernels
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+    logger.info("simsimd available for batch similarity computation")
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+    logger.warning("simsimd not available. Falling back to FAISS float32 search. Install with: pip install simsimd")
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize vectors to int8 codes with one float32 scale per row.
+
+    Each row is divided by max(|x|) / 127 and rounded, so
+    codes[i] * scales[i] approximates vectors[i].
+
+    Args:
+        vectors: Array of shape (n, dimension)
+
+    Returns:
+        Tuple of (codes, scales): C-contiguous int8 array of shape (n, dimension)
+        and float32 array of shape (n,); all-zero rows get a scale of 1
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return np.ascontiguousarray(codes), scales.astype(np.float32)
+
+
+def quantized_similarities(query_codes: np.ndarray, query_scales: np.ndarray,
+                           corpus_codes: np.ndarray, corpus_scales: np.ndarray) -> np.ndarray:
+    """
+    Approximate inner products between int8-quantized queries and corpus vectors.
+
+    SimSIMD computes the exact int8 x int8 dot products (VNNI where the
+    CPU has it), which are then rescaled by the per-row scales.
+
+    Args:
+        query_codes: int8 query codes of shape (n_queries, dimension)
+        query_scales: float32 query scales of shape (n_queries,)
+        corpus_codes: int8 corpus codes of shape (n_vectors, dimension)
+        corpus_scales: float32 corpus scales of shape (n_vectors,)
+
+    Returns:
+        float32 score matrix of shape (n_queries, n_vectors)
+    """
+    if not SIMSIMD_AVAILABLE:
+        raise RuntimeError("simsimd is not installed")
+
+    dots = simsimd.cdist(query_codes, corpus_codes, metric="dot")
+    dots = np.asarray(dots, dtype=np.float32).reshape(query_codes.shape[0], corpus_codes.shape[0])
+    return dots * query_scales[:, None] * corpus_scales[None, :]
+
+
+def top_k_candidates(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores without fully sorting the row.
+
+    Args:
+        scores: 1-D similarity array for a single query
+        k: Number of candidates to keep
+
+    Returns:
+        Tuple of (indices, scores) ordered from best to worst
+    """
+    indices, top_scores = top_k_rows(scores[None, :], k)
+    return indices[0], top_scores[0]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores of every row without fully sorting the rows.
+
+    Args:
+        scores: Similarity matrix of shape (n_queries, n_candidates)
+        k: Number of candidates to keep per row
+
+    Returns:
+        Tuple of (indices, scores) arrays of shape (n_queries, k), each row
+        ordered from best to worst
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = (scores.shape[0], 0)
+        return np.empty(empty, dtype=np.int64), np.empty(empty, dtype=np.float32)
+
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(scores, indices, axis=1)
@@ -956,13 +956,13 @@ async def search_similar_chunks_endpoint(
     Core function: Search the FAISS index for the top-N most similar chunks to a given query vector.
     
     This is the main similarity search function that finds the most relevant document chunks
-    based on vector similarity using L2 distance in the FAISS index.
+    based on cosine similarity (inner product of unit vectors) in the FAISS index.
     
     Args:
         query_embedding: Pre-computed embedding vector (768 dimensions for Gemini)
         k: Number of top similar results to return
-        score_threshold: Maximum similarity score (lower is better for L2 distance)
-        min_score_threshold: Minimum similarity score for inclusion
+        score_threshold: Minimum cosine similarity for a candidate (higher is better)
+        min_score_threshold: Minimum cosine similarity for inclusion after type filtering
         filter_doc_ids: Optional list of document IDs to restrict search to
         filter_doc_types: Optional list of document types to filter by
         boost_recent: Whether to boost more recently added documents
@@ -1715,7 +1715,7 @@ async def hackrx_run(
                 search_results = await advanced_similarity_search(
                     query_text=question,
                     top_k=5,
-                    score_threshold=0.6,
+                    score_threshold=0.7,
                     search_strategy="comprehensive"
                 )
                 
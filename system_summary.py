@@ -54,7 +54,7 @@ def show_system_capabilities():
             "status": "✅ OPERATIONAL",
             "capabilities": [
                 "768D vector storage (Gemini compatible)",
-                "L2 distance similarity search",
+                "Cosine similarity search (inner product on normalized vectors)",
                 "Document metadata tracking",
                 "Multiple index types (flat, IVF, HNSW)",
                 "Save/load persistence"
@@ -132,7 +132,7 @@ def show_system_capabilities():
     
     qa_features = [
         "🔍 Semantic document search",
-        "📊 Relevance scoring (L2 distance)",
+        "📊 Relevance scoring (cosine similarity)",
         "🤖 Multi-model AI integration", 
         "⚡ Smart model switching",
         "📚 Multi-document support",
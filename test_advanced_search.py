@@ -0,0 +1,386 @@
+"""
+Tests for the SimSIMD search backend and advanced similarity search
+Covers top-k selection, int8 quantization, SimSIMD vs FAISS result parity, the float32 fallback and the SQ8 and auto indexes
+"""
+
+import sys
+import asyncio
+import pytest
+import numpy as np
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import advanced_search
+import faiss_store
+import simsimd_backend
+from faiss_store import FAISSVectorStore, get_vector_store, normalize_rows, reset_vector_store
+from numba_kernels import prepare_query_matrix
+from simsimd_backend import quantize_int8, top_k_candidates, top_k_rows
+
+
+DIMENSION = 32
+
+
+@pytest.fixture
+def vectors():
+    """Random embedding matrix shared by the store and the queries."""
+    rng = np.random.default_rng(42)
+    return rng.standard_normal((60, DIMENSION)).astype(np.float32)
+
+
+@pytest.fixture
+def populated_store(vectors):
+    """Global vector store holding two documents of different types."""
+    reset_vector_store()
+    store = get_vector_store(dimension=DIMENSION)
+    store.add_document_embeddings(vectors[:30].tolist(), "a.pdf", "pdf",
+                                  [f"pdf chunk {i}" for i in range(30)], doc_id="doc-a")
+    store.add_document_embeddings(vectors[30:].tolist(), "b.docx", "docx",
+                                  [f"docx chunk {i}" for i in range(30)], doc_id="doc-b")
+    yield store
+    reset_vector_store()
+
+
+def _search(query, **kwargs):
+    result = asyncio.run(advanced_search.advanced_similarity_search(query, **kwargs))
+    assert result["status"] == "success", result
+    return result
+
+
+class TestTopKCandidates:
+    """Test partial top-k selection."""
+
+    def test_matches_full_argsort(self):
+        """Test that argpartition-based selection equals a full descending sort prefix."""
+        similarities = np.random.default_rng(0).random(500).astype(np.float32)
+
+        for k in (1, 7, 100, 500, 800):
+            indices, scores = top_k_candidates(similarities, k)
+            expected = np.argsort(-similarities, kind="stable")[:k]
+
+            assert np.array_equal(indices, expected)
+            assert np.array_equal(scores, similarities[expected])
+
+    def test_empty_k(self):
+        """Test that k <= 0 yields empty arrays."""
+        indices, scores = top_k_candidates(np.ones(10, dtype=np.float32), 0)
+        assert len(indices) == 0 and len(scores) == 0
+
+    def test_rows_match_single_row_selection(self):
+        """Test that row-wise selection equals selecting each row on its own."""
+        similarities = np.random.default_rng(1).integers(0, 20, (6, 50)).astype(np.float32)
+
+        for k in (1, 10, 50, 80):
+            indices, scores = top_k_rows(similarities, k)
+            for row, row_indices, row_scores in zip(similarities, indices, scores):
+                expected_indices, expected_scores = top_k_candidates(row, k)
+                assert np.array_equal(row_indices, expected_indices)
+                assert np.array_equal(row_scores, expected_scores)
+
+
+class TestQuantizeInt8:
+    """Test per-row int8 quantization."""
+
+    def test_round_trip_error(self, vectors):
+        """Test that codes times scales reconstruct each row to within half a step."""
+        codes, scales = quantize_int8(vectors)
+
+        assert codes.dtype == np.int8 and scales.shape == (len(vectors),)
+        assert np.abs(codes).max(axis=1).tolist() == [127] * len(vectors)
+        assert np.all(np.abs(codes * scales[:, None] - vectors) <= scales[:, None] / 2 + 1e-6)
+
+    def test_zero_row(self):
+        """Test that an all-zero row quantizes to zeros without dividing by zero."""
+        codes, scales = quantize_int8(np.zeros((1, 8), dtype=np.float32))
+        assert not codes.any() and scales[0] == 1.0
+
+
+class TestPrepareQueryMatrix:
+    """Test query conversion and normalization."""
+
+    def test_matches_numpy_normalization(self, vectors):
+        """Test that prepared rows equal NumPy-normalized rows without touching the input."""
+        embeddings = vectors[:4].tolist()
+        matrix = prepare_query_matrix(embeddings)
+
+        assert matrix.dtype == np.float32 and matrix.flags["C_CONTIGUOUS"]
+        assert np.allclose(matrix, normalize_rows(vectors[:4]), atol=1e-6)
+        assert embeddings == vectors[:4].tolist()
+
+    def test_single_vector_and_zero_row(self):
+        """Test that a single embedding becomes one row and a zero vector stays zero."""
+        assert prepare_query_matrix([3.0, 4.0]).tolist() == [[pytest.approx(0.6), pytest.approx(0.8)]]
+        assert not prepare_query_matrix([[0.0, 0.0]]).any()
+
+
+@pytest.mark.skipif(not simsimd_backend.SIMSIMD_AVAILABLE, reason="simsimd not installed")
+class TestSimSIMDPath:
+    """Test that the SimSIMD path agrees with FAISS."""
+
+    def test_matches_similarity_search(self, populated_store, vectors):
+        """Test that int8 search with float32 rescoring reproduces FAISS results."""
+        query = (vectors[5] + 0.05).tolist()
+
+        result = _search(query, k=10, deduplicate=False)
+        faiss_results = populated_store.similarity_search(query, k=10)
+
+        simsimd_scores = [r["score"] for r in result["results"]]
+        faiss_scores = [r["score"] for r in faiss_results]
+
+        assert result["results"][0]["index"] == faiss_results[0]["index"] == 5
+        assert set(r["index"] for r in result["results"]) == set(r["index"] for r in faiss_results)
+        assert np.allclose(simsimd_scores, faiss_scores, atol=1e-5)
+
+    def test_quantized_vectors_track_index(self, populated_store):
+        """Test that the int8 mirror stays aligned with the FAISS index."""
+        codes, scales = populated_store.quantized_vectors()
+        assert codes.shape == (populated_store.index.ntotal, DIMENSION)
+        assert scales.shape == (populated_store.index.ntotal,)
+
+
+class TestFallbackPath:
+    """Test the FAISS float32 fallback."""
+
+    def test_runs_without_simsimd(self, populated_store, vectors, monkeypatch):
+        """Test that search falls back to FAISS when SimSIMD is unavailable."""
+        monkeypatch.setattr(advanced_search, "SIMSIMD_AVAILABLE", False)
+        monkeypatch.setattr(advanced_search, "quantized_similarities",
+                            lambda *args, **kwargs: pytest.fail("SimSIMD kernel used in fallback"))
+
+        query = (vectors[40] + 0.05).tolist()
+        result = _search(query, k=5, filter_doc_types=["DOCX"])
+
+        assert result["total_results"] == 5
+        assert result["results"][0]["index"] == 40
+        assert all(r["doc_id"] == "doc-b" for r in result["results"])
+
+
+class TestTrivialQueryFastPath:
+    """Test that unfiltered searches fetch exactly k candidates."""
+
+    @pytest.fixture
+    def requested_candidates(self, monkeypatch):
+        """Record the candidate count of every index search."""
+        calls = []
+        original = advanced_search._search_candidates
+
+        def recording_search_candidates(vector_store, query_matrix, n):
+            calls.append(n)
+            return original(vector_store, query_matrix, n)
+
+        monkeypatch.setattr(advanced_search, "_search_candidates", recording_search_candidates)
+        return calls
+
+    def test_fetches_k_without_filters(self, populated_store, vectors, requested_candidates):
+        """Test the fast path against the full path's results."""
+        query = (vectors[12] + 0.05).tolist()
+        fast = _search(query, k=4, deduplicate=False)
+        full = _search(query, k=4, deduplicate=False, min_score_threshold=-1.0)
+
+        assert requested_candidates == [4, 24]
+        assert [r["index"] for r in fast["results"]] == [r["index"] for r in full["results"]]
+
+    def test_removed_document_disables_fast_path(self, populated_store, vectors, requested_candidates):
+        """Test that stale vectors of removed documents force over-fetching."""
+        populated_store.remove_document("doc-a")
+        result = _search((vectors[12] + 0.05).tolist(), k=4, deduplicate=False)
+
+        assert requested_candidates == [24]
+        assert result["total_results"] == 4
+        assert all(r["doc_id"] == "doc-b" for r in result["results"])
+
+
+class TestMultiQuerySearch:
+    """Test batched multi-query search."""
+
+    @pytest.fixture
+    def vector_queries(self, vectors, monkeypatch):
+        """Resolve query strings to stored vectors instead of calling Gemini."""
+        import main
+
+        async def fake_query_embedding(query_text, api_key=None, model=None):
+            return {"success": True, "embedding": (vectors[int(query_text)] + 0.05).tolist(), "metadata": {}}
+
+        monkeypatch.setattr(main, "generate_query_embedding", fake_query_embedding)
+
+    def test_single_batched_search(self, populated_store, vector_queries, monkeypatch):
+        """Test that all queries are searched in one batched index call."""
+        monkeypatch.setattr(advanced_search, "SIMSIMD_AVAILABLE", False)
+        calls = []
+        original = populated_store.batch_similarity_search
+
+        def counting_batch_search(query_matrix, k, normalized=False):
+            calls.append(query_matrix.shape[0])
+            return original(query_matrix, k, normalized)
+
+        monkeypatch.setattr(populated_store, "batch_similarity_search", counting_batch_search)
+
+        result = asyncio.run(advanced_search.multi_query_search(["3", "40", "4"], k=4))
+
+        assert result["status"] == "success"
+        assert calls == [3]
+        assert result["query_info"]["individual_query_results"] == 3
+        assert [r["rank"] for r in result["results"]] == [1, 2, 3, 4]
+
+
+    def test_combine_grouped_scores(self):
+        """Test grouped score combination against per-chunk numpy reductions."""
+        groups = [[0.9, 0.5, 0.7], [0.4], [0.8, 0.6]]
+        counts = np.array([len(g) for g in groups])
+        starts = np.cumsum(counts) - counts
+        grouped = np.concatenate(groups)
+
+        expected = {
+            "average": [np.mean(g) for g in groups],
+            "max": [np.max(g) for g in groups],
+            "min": [np.min(g) for g in groups],
+            "weighted": [np.average(g, weights=[1.0 / (i + 1) for i in range(len(g))]) for g in groups],
+        }
+        for method, values in expected.items():
+            combined = advanced_search._combine_grouped_scores(grouped, starts, counts, method)
+            assert np.allclose(combined, values), method
+
+
+class TestCosineScores:
+    """Test that scores are cosine similarities on normalized vectors."""
+
+    def test_scores_are_cosine_similarities(self, populated_store, vectors):
+        """Test that a scaled copy of a stored vector scores 1.0 and ranks first."""
+        results = populated_store.similarity_search((vectors[7] * 5.0).tolist(), k=3)
+
+        assert results[0]["index"] == 7
+        assert results[0]["score"] == pytest.approx(1.0, abs=1e-5)
+        assert all(a["score"] >= b["score"] for a, b in zip(results, results[1:]))
+
+    def test_threshold_keeps_higher_scores(self, populated_store, vectors):
+        """Test that score_threshold is a minimum similarity."""
+        results = populated_store.similarity_search(vectors[7].tolist(), k=10, score_threshold=0.5)
+
+        assert results and all(r["score"] >= 0.5 for r in results)
+
+    def test_relevance_categories(self):
+        """Test that batch relevance codes agree with SearchResult categories."""
+        scores = np.array([0.95, 0.85, 0.8, 0.7, 0.6, 0.55, 0.1])
+        batch = advanced_search.ResultBatch(np.arange(len(scores)), scores, [""] * len(scores),
+                                            [""] * len(scores), [{}] * len(scores))
+
+        expected = [advanced_search.SearchResult(float(s), 0, "", "", {}, 1).get_relevance_category() for s in scores]
+        assert [r["relevance"] for r in batch.to_dicts()] == expected
+        assert expected == ["high", "medium", "medium", "low", "low", "very_low", "very_low"]
+        assert advanced_search._calculate_relevance_distribution(batch.relevance_codes) == {
+            "high": 1, "medium": 2, "low": 2, "very_low": 2
+        }
+
+
+class TestSearchWithContext:
+    """Test context expansion around search hits."""
+
+    def test_fetches_each_document_once(self, populated_store, vectors, monkeypatch):
+        """Test that hits sharing a document reuse one chunk lookup with independent flags."""
+        calls = []
+        original = populated_store.get_document_chunks
+
+        def counting_get_document_chunks(doc_id):
+            calls.append(doc_id)
+            return original(doc_id)
+
+        monkeypatch.setattr(populated_store, "get_document_chunks", counting_get_document_chunks)
+
+        query = (vectors[10] + vectors[11]).tolist()
+        result = asyncio.run(advanced_search.search_with_context(query, context_window=1, k=4, deduplicate=False))
+
+        assert result["status"] == "success"
+        assert len(calls) == len(set(calls)) < len(result["results"])
+        for hit in result["results"]:
+            matches = [c["index"] for c in hit["context_chunks"] if c["is_match"]]
+            positions = [c["context_position"] for c in hit["context_chunks"]]
+            assert matches == [hit["index"]]
+            assert positions == list(range(positions[0], positions[0] + len(positions)))
+
+
+class TestSQ8Index:
+    """Test the scalar-quantized (8-bit and FP16) indexes against the float32 flat index."""
+
+    def test_matches_flat_ranking(self, vectors):
+        """Test that SQ8 finds the same neighbours with near-exact scores at a quarter of the memory."""
+        stores = {index_type: FAISSVectorStore(dimension=DIMENSION, index_type=index_type)
+                  for index_type in ("flat", "sq8")}
+        for store in stores.values():
+            store.add_document_embeddings(vectors[:30], "a.pdf", "pdf", [f"chunk {i}" for i in range(30)])
+            store.add_document_embeddings(vectors[30:], "b.pdf", "pdf", [f"chunk {i}" for i in range(30)])
+
+        flat_indices, flat_scores = stores["flat"].batch_similarity_search(vectors[:10], 3)
+        sq8_indices, sq8_scores = stores["sq8"].batch_similarity_search(vectors[:10], 3)
+
+        assert np.array_equal(flat_indices[:, 0], sq8_indices[:, 0])
+        assert np.allclose(flat_scores, sq8_scores, atol=0.02)
+        assert stores["sq8"].get_stats()["bytes_per_vector"] * 4 == stores["flat"].get_stats()["bytes_per_vector"]
+
+    def test_fp16_matches_flat_ranking(self, vectors):
+        """Test that the untrained FP16 index ranks like flat at half the memory."""
+        stores = {index_type: FAISSVectorStore(dimension=DIMENSION, index_type=index_type)
+                  for index_type in ("flat", "fp16")}
+        for store in stores.values():
+            store.add_document_embeddings(vectors, "a.pdf", "pdf", [f"chunk {i}" for i in range(len(vectors))])
+
+        flat_indices, flat_scores = stores["flat"].batch_similarity_search(vectors[:10], 3)
+        fp16_indices, fp16_scores = stores["fp16"].batch_similarity_search(vectors[:10], 3)
+
+        assert np.array_equal(flat_indices, fp16_indices)
+        assert np.allclose(flat_scores, fp16_scores, atol=1e-3)
+        assert stores["fp16"].get_stats()["bytes_per_vector"] * 2 == stores["flat"].get_stats()["bytes_per_vector"]
+
+    def test_save_and_load(self, vectors, tmp_path):
+        """Test that a saved SQ8 store loads back with identical search results."""
+        store = FAISSVectorStore(dimension=DIMENSION, index_type="sq8")
+        store.add_document_embeddings(vectors, "a.pdf", "pdf", [f"chunk {i}" for i in range(len(vectors))])
+        store.save(str(tmp_path / "store"))
+
+        loaded = FAISSVectorStore(dimension=DIMENSION)
+        loaded.load(str(tmp_path / "store"))
+
+        assert loaded.index_type == "sq8" and loaded.quantized_vectors() is None
+        assert np.array_equal(loaded.batch_similarity_search(vectors[:5], 4)[0],
+                              store.batch_similarity_search(vectors[:5], 4)[0])
+
+    def test_mmap_load(self, vectors, tmp_path):
+        """Test that a memory-mapped flat store skips the int8 mirror and returns the same results and chunk texts."""
+        store = FAISSVectorStore(dimension=DIMENSION)
+        store.add_document_embeddings(vectors, "a.pdf", "pdf", [f"chunk {i}" for i in range(len(vectors))])
+        store.save(str(tmp_path / "store"))
+
+        loaded = FAISSVectorStore(dimension=DIMENSION)
+        loaded.load(str(tmp_path / "store"), mmap=True)
+
+        assert loaded.quantized_vectors() is None
+        assert np.array_equal(loaded.batch_similarity_search(vectors[:5], 4)[0],
+                              store.batch_similarity_search(vectors[:5], 4)[0])
+        assert [r["text"] for r in loaded.similarity_search(vectors[7], k=1)] == ["chunk 7"]
+
+
+class TestAutoIndex:
+    """Test the switch from exact search to HNSW as an 'auto' store grows."""
+
+    def test_promotes_to_hnsw_at_threshold(self, vectors, monkeypatch, tmp_path):
+        """Test that crossing HNSW_MIN_VECTORS moves the vectors into an HNSW index that still finds them."""
+        monkeypatch.setattr(faiss_store, "HNSW_MIN_VECTORS", 50)
+        store = FAISSVectorStore(dimension=DIMENSION, index_type="auto")
+
+        store.add_document_embeddings(vectors[:30], "a.pdf", "pdf", [f"chunk {i}" for i in range(30)])
+        assert store.get_stats()["index_type"] == "auto"
+        assert store.quantized_vectors() is None or len(store.quantized_vectors()[0]) == 30
+
+        store.add_document_embeddings(vectors[30:], "b.pdf", "pdf", [f"chunk {i}" for i in range(30)])
+        assert store.get_stats()["index_type"] == "hnsw" and store.get_stats()["total_vectors"] == 60
+        assert store.quantized_vectors() is None
+
+        indices, scores = store.batch_similarity_search(vectors, 1)
+        assert np.array_equal(indices[:, 0], np.arange(60))
+        assert np.allclose(scores[:, 0], 1.0, atol=1e-5)
+
+        store.save(str(tmp_path / "store"))
+        loaded = FAISSVectorStore(dimension=DIMENSION)
+        loaded.load(str(tmp_path / "store"))
+        assert loaded.index_type == "hnsw" and loaded.index.hnsw.efSearch == faiss_store.HNSW_EF_SEARCH
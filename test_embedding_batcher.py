@@ -0,0 +1,204 @@
+"""
+Tests for the Gemini embedding request batcher
+Covers request coalescing, batch size limits and error fan-out without calling the API
+"""
+
+import sys
+import asyncio
+import pytest
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gemini_vector_embedder import EmbeddingBatcher, GeminiVectorEmbedder, get_embedder
+
+
+@pytest.fixture
+def batch_calls(monkeypatch):
+    """Replace the batch API call with a fake that records each request's texts."""
+    calls = []
+
+    async def fake_batch_embeddings(self, session, texts):
+        calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setattr(GeminiVectorEmbedder, "_generate_batch_embeddings", fake_batch_embeddings)
+    return calls
+
+
+@pytest.fixture(autouse=True)
+def detach_sessions(monkeypatch):
+    """Detach HTTP sessions a test leaves open so none is reported as unclosed."""
+    sessions = []
+    original_get_session = GeminiVectorEmbedder._get_session
+
+    async def tracking_get_session(self):
+        session = await original_get_session(self)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(GeminiVectorEmbedder, "_get_session", tracking_get_session)
+    yield
+    for session in sessions:
+        if not session.closed:
+            session.detach()
+
+
+async def _embed_all(batcher, texts):
+    return await asyncio.gather(*(batcher.embed(text) for text in texts))
+
+
+class TestEmbeddingBatcher:
+    """Test coalescing of concurrent embedding requests."""
+
+    def test_concurrent_requests_share_one_call(self, batch_calls):
+        """Test that requests inside one window are sent in a single batch."""
+        texts = ["a", "bb", "ccc", "dddd"]
+        results = asyncio.run(_embed_all(EmbeddingBatcher(api_key="test"), texts))
+
+        assert batch_calls == [texts]
+        assert [r["embeddings"][0][0] for r in results] == [1.0, 2.0, 3.0, 4.0]
+        assert all(r["success"] and r["dimensions"] == 2 for r in results)
+
+    def test_large_windows_split_at_api_limit(self, batch_calls):
+        """Test that a window holding more than the API limit is split into several calls."""
+        texts = [f"query {i}" for i in range(EmbeddingBatcher.MAX_BATCH_SIZE + 5)]
+        results = asyncio.run(_embed_all(EmbeddingBatcher(api_key="test"), texts))
+
+        assert [len(call) for call in batch_calls] == [EmbeddingBatcher.MAX_BATCH_SIZE, 5]
+        assert [r["processed_chunks"][0] for r in results] == texts
+
+    def test_errors_reach_every_caller(self, monkeypatch):
+        """Test that a failed batch resolves every request with the error."""
+        async def failing_batch_embeddings(self, session, texts):
+            raise Exception("API error 429: quota exceeded")
+
+        monkeypatch.setattr(GeminiVectorEmbedder, "_generate_batch_embeddings", failing_batch_embeddings)
+        results = asyncio.run(_embed_all(EmbeddingBatcher(api_key="test"), ["a", "b"]))
+
+        assert all(not r["success"] and "quota" in r["error"] for r in results)
+
+    def test_batcher_survives_new_event_loops(self, batch_calls):
+        """Test that one batcher serves requests from successive event loops."""
+        batcher = EmbeddingBatcher(api_key="test")
+        asyncio.run(_embed_all(batcher, ["first"]))
+        asyncio.run(_embed_all(batcher, ["second"]))
+
+        assert batch_calls == [["first"], ["second"]]
+
+    def test_cancelled_flush_resolves_waiting_callers(self, batch_calls):
+        """Test that the flush task is held by the batcher and its cancellation fails pending requests."""
+        async def run():
+            batcher = EmbeddingBatcher(api_key="test", window_seconds=10)
+            request = asyncio.create_task(batcher.embed("a"))
+            await asyncio.sleep(0)
+            flush_tasks = list(batcher._flush_tasks)
+            for task in flush_tasks:
+                task.cancel()
+            result = await asyncio.wait_for(request, timeout=1)
+            return flush_tasks, result, batcher._flush_tasks
+
+        flush_tasks, result, remaining = asyncio.run(run())
+
+        assert len(flush_tasks) == 1 and not remaining
+        assert not result["success"] and "cancelled" in result["error"] and batch_calls == []
+
+    def test_empty_text_is_rejected_without_a_call(self, batch_calls):
+        """Test that blank queries fail fast like generate_embeddings."""
+        result = asyncio.run(EmbeddingBatcher(api_key="test").embed("   "))
+
+        assert not result["success"] and batch_calls == []
+
+
+class TestConcurrentGenerateEmbeddings:
+    """Test concurrent batch submission in generate_embeddings."""
+
+    def test_batches_keep_input_order(self, monkeypatch):
+        """Test that batches finishing out of order still fill their own slots."""
+        calls = []
+
+        async def slow_first_batch(self, session, texts):
+            calls.append(list(texts))
+            await asyncio.sleep(0.05 if texts[0] == "t0" else 0)
+            return [[float(text[1:]), 1.0] for text in texts]
+
+        monkeypatch.setattr(GeminiVectorEmbedder, "_generate_batch_embeddings", slow_first_batch)
+        texts = [f"t{i}" for i in range(10)]
+        result = asyncio.run(GeminiVectorEmbedder(api_key="test").generate_embeddings(texts, batch_size=3))
+
+        assert result["success"]
+        assert [len(call) for call in sorted(calls)] == [3, 3, 3, 1]
+        assert [e[0] for e in result["embeddings"]] == list(range(10))
+
+    def test_in_flight_batches_are_bounded(self, monkeypatch):
+        """Test that no more than MAX_CONCURRENT_BATCHES calls run at once."""
+        active = [0, 0]
+
+        async def tracking_batch(self, session, texts):
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return [[1.0, 0.0] for _ in texts]
+
+        monkeypatch.setattr(GeminiVectorEmbedder, "_generate_batch_embeddings", tracking_batch)
+        texts = [f"chunk {i}" for i in range(20)]
+        result = asyncio.run(GeminiVectorEmbedder(api_key="test").generate_embeddings(texts, batch_size=2))
+
+        assert result["success"] and len(result["embeddings"]) == 20
+        assert 1 < active[1] <= GeminiVectorEmbedder.MAX_CONCURRENT_BATCHES
+
+    def test_failed_batch_fails_the_call(self, monkeypatch):
+        """Test that an API error in any batch is reported like before."""
+        async def failing_batch(self, session, texts):
+            raise Exception("API error 500: internal")
+
+        monkeypatch.setattr(GeminiVectorEmbedder, "_generate_batch_embeddings", failing_batch)
+        result = asyncio.run(GeminiVectorEmbedder(api_key="test").generate_embeddings(["a", "b"]))
+
+        assert not result["success"] and "500" in result["error"]
+
+
+class TestPooledSession:
+    """Test reuse of the embedder's HTTP session."""
+
+    def test_calls_share_one_session(self, monkeypatch):
+        """Test that successive calls on one loop reuse the session until close."""
+        sessions = []
+
+        async def recording_batch(self, session, texts):
+            sessions.append(session)
+            return [[1.0, 0.0] for _ in texts]
+
+        monkeypatch.setattr(GeminiVectorEmbedder, "_generate_batch_embeddings", recording_batch)
+        embedder = GeminiVectorEmbedder(api_key="test")
+
+        async def run():
+            await embedder.generate_embeddings(["a"])
+            await embedder.generate_embeddings(["b", "c"], batch_size=1)
+            first = embedder._session
+            await embedder.close()
+            await embedder.generate_embeddings(["d"])
+            await embedder.close()
+            return first
+
+        first = asyncio.run(run())
+
+        assert sessions[:3] == [first] * 3 and first.closed
+        assert sessions[3] is not first and sessions[3].closed
+
+    def test_new_event_loop_gets_new_session(self, batch_calls):
+        """Test that a session from a finished loop is detached, not reused."""
+        embedder = GeminiVectorEmbedder(api_key="test")
+        asyncio.run(embedder.generate_embeddings(["first"]))
+        stale = embedder._session
+        asyncio.run(embedder.generate_embeddings(["second"]))
+
+        assert stale.closed and embedder._session is not stale
+        asyncio.run(embedder.close())
+
+    def test_shared_embedders(self):
+        """Test that the batcher and convenience calls share one embedder per key and model."""
+        assert get_embedder("k", "embedding-001") is get_embedder("k", "embedding-001")
+        assert EmbeddingBatcher(api_key="k").embedder is get_embedder("k", "embedding-001")
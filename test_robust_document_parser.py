@@ -0,0 +1,107 @@
+"""
+Tests for the robust document parser
+Covers page-parallel PDF text extraction, text quality checks and chunk planning
+"""
+
+import sys
+import pytest
+import numpy as np
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numba_kernels
+from robust_document_parser import (
+    PDF_LIBRARIES, _combine_small_chunks, _split_by_sentences, alphabetic_ratio, chunk_columns, parse_document
+)
+
+SAMPLE_PDF = Path(__file__).parent / "ici.pdf"
+
+requires_sample_pdf = pytest.mark.skipif(
+    not PDF_LIBRARIES or not SAMPLE_PDF.exists(),
+    reason="needs a PDF library and the sample PDF"
+)
+
+
+@requires_sample_pdf
+class TestPageParallelExtraction:
+    """Test that extracting pages in worker processes matches in-process extraction."""
+
+    def test_workers_produce_identical_text_and_chunks(self):
+        """Test that text, page order and chunks do not depend on the worker count."""
+        sequential = parse_document(str(SAMPLE_PDF))
+        parallel = parse_document(str(SAMPLE_PDF), num_workers=3)
+
+        assert parallel["raw_text"] == sequential["raw_text"]
+        assert [c["text"] for c in parallel["chunks"]] == [c["text"] for c in sequential["chunks"]]
+        assert parallel["metadata"]["extraction_workers"] == 3
+        assert sequential["metadata"]["extraction_workers"] == 1
+
+    def test_chunk_columns_match_chunk_dicts(self):
+        """Test that the column view mirrors the chunk dictionaries."""
+        result = parse_document(str(SAMPLE_PDF))
+        soa = result["chunks_soa"]
+
+        assert result["n_chunks"] == len(result["chunks"])
+        assert soa["text"] == [c["text"] for c in result["chunks"]]
+        assert soa["token_count"].dtype == np.int32
+        assert soa["token_count"].tolist() == [c["token_count"] for c in result["chunks"]]
+        assert int(soa["token_count"].max()) == result["token_statistics"]["max_tokens_per_chunk"]
+
+    def test_phase_timings_are_recorded(self):
+        """Test that extraction and chunking times are reported in the metadata."""
+        metadata = parse_document(str(SAMPLE_PDF))["metadata"]
+
+        assert metadata["text_extraction_seconds"] > 0
+        assert metadata["chunking_seconds"] > 0
+
+
+class TestAlphabeticRatio:
+    """Test the vectorized text quality ratio."""
+
+    @pytest.mark.parametrize("text", ["", "abc def", "123 !?", "Prémium ₹500\n\tÜber 😀", "lone \ud800 surrogate"])
+    def test_matches_per_character_count(self, text):
+        """Test that the ratio equals the per-character isalpha/isspace count."""
+        expected = sum(c.isalpha() or c.isspace() for c in text) / len(text) if text else 0
+        assert alphabetic_ratio(text) == expected
+
+
+class TestChunkColumns:
+    """Test the structure-of-arrays chunk view."""
+
+    def test_empty_chunk_list(self):
+        """Test that no chunks give empty columns."""
+        soa = chunk_columns([])
+
+        assert soa["text"] == [] and len(soa["token_count"]) == 0
+
+
+class TestGreedyChunkPlanning:
+    """Test chunk planning from per-piece word counts."""
+
+    def test_sentences_fill_chunks_up_to_the_limit(self):
+        """Test that sentences are joined while the word-based estimate fits max_tokens."""
+        text = "One two. Three four. Five six seven. Eight."
+
+        # max_tokens=5 allows 4 words (int(4 * 1.3) == 5)
+        assert _split_by_sentences(text, max_tokens=5, min_tokens=3) == [
+            "One two. Three four.", "Five six seven. Eight."
+        ]
+
+    def test_small_chunks_combine_with_paragraph_breaks(self):
+        """Test that paragraphs are combined with blank lines between them."""
+        assert _combine_small_chunks(["a b", " c d ", "", "e"], max_tokens=5, min_tokens=100) == ["a b\n\nc d", "e"]
+
+    @pytest.mark.skipif(not numba_kernels.NUMBA_AVAILABLE, reason="numba not installed")
+    def test_jitted_and_python_plans_agree(self, monkeypatch):
+        """Test that the jitted kernel and the Python loop produce the same plan."""
+        word_counts = np.random.default_rng(5).integers(1, 60, size=2000).astype(np.int64)
+        args = (1.3, 200, 50, True)
+
+        monkeypatch.setattr(numba_kernels, "JIT_MIN_PIECES", 0)
+        jitted = numba_kernels.plan_greedy_chunks(word_counts, *args)
+        python = numba_kernels._plan_greedy_chunks(word_counts.tolist(), *args)
+
+        np.testing.assert_array_equal(jitted[0], python[0])
+        np.testing.assert_array_equal(jitted[1], python[1])
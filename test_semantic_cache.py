@@ -0,0 +1,73 @@
+"""
+Tests for the semantic query cache
+Covers similarity hits, LRU eviction and TTL expiry
+"""
+
+import sys
+import pytest
+import numpy as np
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import semantic_cache
+from semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def embeddings():
+    """Random query embeddings that are far apart from each other."""
+    return np.random.default_rng(7).standard_normal((5, 64)).astype(np.float32)
+
+
+class TestSemanticCache:
+    """Test semantic lookups and eviction."""
+
+    def test_near_duplicate_hits(self, embeddings):
+        """Test that a scaled, slightly perturbed query hits and a different one misses."""
+        cache = SemanticCache(threshold=0.95)
+        cache.put(embeddings[0].tolist(), "answer 0")
+
+        assert cache.get((embeddings[0] * 3 + 0.01).tolist()) == "answer 0"
+        assert cache.get(embeddings[1]) is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_best_match_wins(self, embeddings):
+        """Test that the most similar cached query is returned."""
+        cache = SemanticCache(threshold=0.5)
+        for i in range(3):
+            cache.put(embeddings[i], f"answer {i}")
+
+        assert cache.get(embeddings[2]) == "answer 2"
+
+    def test_lru_eviction(self, embeddings):
+        """Test that the least recently used entry is evicted at capacity."""
+        cache = SemanticCache(capacity=2)
+        cache.put(embeddings[0], "answer 0")
+        cache.put(embeddings[1], "answer 1")
+        cache.get(embeddings[0])
+        cache.put(embeddings[2], "answer 2")
+
+        assert cache.get(embeddings[1]) is None
+        assert cache.get(embeddings[0]) == "answer 0"
+        assert cache.get(embeddings[2]) == "answer 2"
+        assert cache.stats()["size"] == 2
+
+    def test_ttl_expiry(self, embeddings, monkeypatch):
+        """Test that expired entries are dropped and their slots reused."""
+        now = [1000.0]
+        monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+
+        cache = SemanticCache(capacity=1, ttl_seconds=10)
+        cache.put(embeddings[0], "answer 0")
+        now[0] += 11
+
+        assert cache.get(embeddings[0]) is None
+        cache.put(embeddings[1], "answer 1")
+        assert cache.get(embeddings[1]) == "answer 1"
+
+    def test_capacity_must_be_positive(self):
+        """Test that a cache without room for one entry is rejected up front."""
+        with pytest.raises(ValueError, match="capacity"):
+            SemanticCache(capacity=0)